@@ -0,0 +1,18 @@
+"""Recompute Course.teacher_count and Course.teacher_id from the course_teacher rows.
+
+Usage: python -m app.commands.repair_course_staffing
+"""
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.services.course_teacher_service import CourseTeacherService
+
+
+def main() -> None:
+    with Session(engine) as session:
+        repaired = CourseTeacherService.repair_course_staffing(session)
+    print(f"Repaired staffing on {repaired} course(s)")
+
+
+if __name__ == "__main__":
+    main()
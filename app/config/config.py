@@ -1,4 +1,4 @@
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import (
     AnyUrl,
@@ -51,6 +51,15 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_NAME: str = ""
 
+    # Read replicas, comma separated DSNs. GET routes using ReadSessionDep are
+    # spread across them; clients that just wrote stick to the primary for
+    # READ_YOUR_WRITES_SECONDS.
+    REPLICA_DATABASE_URIS: Annotated[
+        list[str] | str, BeforeValidator(parse_cors)
+    ] = []
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    READ_YOUR_WRITES_SECONDS: int = 5
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -89,6 +98,118 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
 
+    # Concurrency limiting / load shedding, per route class (read, write, auth)
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_LIMIT_READ: int = 64
+    CONCURRENCY_LIMIT_WRITE: int = 16
+    CONCURRENCY_LIMIT_AUTH: int = 4
+    CONCURRENCY_QUEUE_SIZE: int = 32
+    CONCURRENCY_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 1
+    # Adaptive mode moves each limit between MIN and MAX based on observed latency
+    CONCURRENCY_ADAPTIVE: bool = False
+    CONCURRENCY_MIN_LIMIT: int = 1
+    CONCURRENCY_MAX_LIMIT: int = 256
+
+    # Per-client rate limits, written as "<requests>/<second|minute|hour>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOGIN: str = "10/minute"
+    RATE_LIMIT_REGISTER: str = "5/minute"
+    RATE_LIMIT_AUTH_IP: str = "30/minute"
+    RATE_LIMIT_WRITE: str = "120/minute"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Request deadlines in seconds; REQUEST_DEADLINES overrides per route name,
+    # e.g. REQUEST_DEADLINES='{"list_courses": 2.0}'
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    REQUEST_DEADLINES: dict[str, float] = {}
+
+    # Largest id list accepted by the course batch lookups
+    COURSE_BATCH_MAX_IDS: int = 100
+
+    # Largest id list accepted by POST /courses/bulk-delete
+    COURSE_BULK_DELETE_MAX_IDS: int = 1000
+
+    # How often the stats counters are checked against the tables
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 3600.0
+
+    # Date driven course status transitions
+    COURSE_SCHEDULE_INTERVAL_SECONDS: float = 60.0
+    COURSE_SCHEDULE_BATCH_SIZE: int = 500
+
+    # Moving archived courses to archival storage in the background
+    COURSE_ARCHIVAL_ENABLED: bool = False
+    COURSE_ARCHIVAL_INTERVAL_SECONDS: float = 3600.0
+    COURSE_ARCHIVAL_BATCH_SIZE: int = 500
+
+    # What assigning a teacher to a course overlapping another of their courses does:
+    # allow it, allow it but report the conflicts, or reject it with 409.
+    # Concurrent assignments are serialized on Postgres, on SQLite the check is best-effort
+    TEACHER_OVERLAP_POLICY: Literal["allow", "warn", "reject"] = "allow"
+
+    # Largest page of GET /users/{id}/courses
+    TEACHER_COURSES_MAX_LIMIT: int = 100
+
+    # Course search: text search configuration of the Postgres index and page bounds
+    SEARCH_TEXT_CONFIG: str = "simple"
+    SEARCH_MAX_LIMIT: int = 100
+    SEARCH_MAX_OFFSET: int = 1000
+
+    # Most sub-requests accepted by one POST /batch
+    BATCH_MAX_OPERATIONS: int = 20
+
+    # Course change feed
+    CHANGE_FEED_MAX_LIMIT: int = 1000
+    CHANGE_LOG_RETENTION_DAYS: int = 7
+    CHANGE_LOG_COMPACT_INTERVAL_SECONDS: float = 3600.0
+
+    # Server-sent course events
+    SSE_QUEUE_SIZE: int = 256
+    SSE_MAX_SUBSCRIBERS: int = 10_000
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    # Changes replayed for a reconnecting client before it is told to resync
+    SSE_REPLAY_LIMIT: int = 500
+
+    # Domain event bus between worker processes: memory (single process),
+    # socket (Unix datagram sockets in EVENT_BUS_SOCKET_DIR) or postgres (LISTEN/NOTIFY)
+    EVENT_BUS_BACKEND: Literal["memory", "socket", "postgres"] = "memory"
+    EVENT_BUS_SOCKET_DIR: str = "/tmp/radegast-events"
+    EVENT_BUS_CHANNEL: str = "radegast_events"
+
+    # Idempotency-Key support for POST endpoints
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_STORE: Literal["memory", "database"] = "memory"
+    IDEMPOTENCY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_MAX_KEYS: int = 10_000
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 256 * 1024
+    # A claimed key whose request never finished is released after this long
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: int = 60
+    # How long a duplicate waits for the original request before getting 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_POLL_SECONDS: float = 0.05
+
+    # Background jobs
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 100
+    # Running jobs whose heartbeat is older than this are requeued
+    JOB_STALE_SECONDS: int = 300
+    JOB_RECOVERY_SECONDS: float = 60.0
+
+    # Audit log, written in batches off the request path
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Public course list served from pre-rendered files in CATALOG_SNAPSHOT_DIR.
+    # Rebuilt once changes stop for the debounce, at most MAX_DELAY after a change
+    # and at least every MAX_AGE (teacher names change without a course event).
+    # Other clients may see the list that far behind; clients that just wrote get
+    # the read-your-writes cookie for as long and read the database
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_DIR: str = "/tmp/radegast-catalog"
+    CATALOG_SNAPSHOT_DEBOUNCE_SECONDS: float = 2.0
+    CATALOG_SNAPSHOT_MAX_DELAY_SECONDS: float = 30.0
+    CATALOG_SNAPSHOT_MAX_AGE_SECONDS: float = 300.0
 
 
 
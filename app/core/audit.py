@@ -0,0 +1,175 @@
+# app/core/audit.py
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session
+
+from app.config.config import settings
+from app.core.db import SharedSession, engine
+from app.core.metrics import audit_events, audit_queue_depth
+from app.models.audit import AuditEvent
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "audit_pending"
+_WAKE = object()
+
+
+class AuditLog:
+    """Audit trail written off the request path.
+
+    Handlers enqueue events without touching the database; a flush thread
+    writes them with one multi-row INSERT per batch, whenever ``batch_size``
+    events are waiting or ``flush_interval`` has passed. The queue is bounded:
+    when the database falls behind, new events are dropped and counted.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            max_queue: int,
+            batch_size: int,
+            flush_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record(
+            self,
+            actor: User,
+            action: str,
+            entity: str,
+            entity_id: Optional[int] = None,
+            course_id: Optional[int] = None,
+            details: Optional[dict[str, Any]] = None,
+            session: Optional[Session] = None,
+    ) -> None:
+        """Queue an event for a change that was committed.
+
+        Pass the request session: inside an atomic batch the event is held
+        until the batch commits, and dropped if it rolls back.
+        """
+        row = {
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "course_id": course_id,
+            "actor_id": actor.id,
+            "actor_email": actor.email,
+            "details": jsonable_encoder(details) if details is not None else None,
+            "created_at": datetime.utcnow(),
+        }
+        if isinstance(session, SharedSession):
+            session.info.setdefault(_PENDING, []).append((self, row))
+            return
+        self._enqueue(row)
+
+    def _enqueue(self, row: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            audit_events.labels(outcome='dropped').inc()
+            logger.warning("Audit queue is full, dropping %s event", row["action"])
+            return
+        audit_events.labels(outcome='queued').inc()
+        audit_queue_depth.set(self._queue.qsize())
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write everything still queued, then stop the flush thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self) -> None:
+        """Write every queued event now, on the calling thread."""
+        while batch := self._take_batch(wait=False):
+            self._write(batch)
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stop.is_set()
+            batch = self._take_batch(wait=not stopping)
+            if batch:
+                self._write(batch)
+            elif stopping:
+                return
+
+    def _take_batch(self, wait: bool) -> list[dict[str, Any]]:
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                if not wait:
+                    item = self._queue.get_nowait()
+                elif deadline is None:
+                    # Sleep until the first event, then give the batch flush_interval to fill
+                    item = self._queue.get(timeout=self.flush_interval)
+                    deadline = time.monotonic() + self.flush_interval
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _WAKE:
+                break
+            batch.append(item)
+        audit_queue_depth.set(self._queue.qsize())
+        return batch
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            with self.session_factory() as session:
+                session.execute(insert(AuditEvent), batch)
+                session.commit()
+        except Exception:
+            audit_events.labels(outcome='failed').inc(len(batch))
+            logger.exception("Failed to write %d audit events", len(batch))
+            return
+        audit_events.labels(outcome='written').inc(len(batch))
+
+
+audit_log = AuditLog(
+    session_factory=lambda: Session(engine),
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _release_deferred_events(session) -> None:
+    for log, row in session.info.pop(_PENDING, ()):
+        log._enqueue(row)
+
+
+@event.listens_for(ORMSession, "after_transaction_end")
+def _discard_deferred_events(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
@@ -0,0 +1,106 @@
+# app/core/broadcast.py
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any
+
+from app.config.config import settings
+from app.core.metrics import sse_subscribers, sse_dropped_subscribers
+
+Event = dict[str, Any]
+
+
+class Subscription:
+    """One listener's bounded event queue. ``None`` in the queue marks the end of the stream."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int, course_id: int | None = None):
+        self.loop = loop
+        self.course_id = course_id
+        self.queue: asyncio.Queue[Event | None] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def matches(self, event: Event) -> bool:
+        return self.course_id is None or event.get("course_id") == self.course_id
+
+
+class Broadcaster:
+    """In-process fan-out of events to async subscribers.
+
+    Publishing is thread-safe and never blocks: events are handed to each
+    subscriber's event loop, and a subscriber whose queue is full is dropped
+    instead of buffering without bound.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, course_id: int | None = None) -> Subscription | None:
+        """Register a listener on the running loop, None when the server is at capacity."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(loop, self.queue_size, course_id)
+            self._subscribers.add(subscription)
+        sse_subscribers.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.remove(subscription)
+        sse_subscribers.dec()
+
+    def publish(self, event: Event) -> None:
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.matches(event)]
+
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, targets, event)
+            except RuntimeError:
+                # The subscriber's loop is gone
+                for subscription in targets:
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, targets: list[Subscription], event: Event) -> None:
+        for subscription in targets:
+            if subscription.dropped:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        subscription.dropped = True
+        self.unsubscribe(subscription)
+        sse_dropped_subscribers.inc()
+        # Discard the backlog so the end-of-stream marker fits
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+def format_sse(data: Any, event: str | None = None, event_id: Any = None) -> str:
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+broadcaster = Broadcaster(settings.SSE_QUEUE_SIZE, settings.SSE_MAX_SUBSCRIBERS)
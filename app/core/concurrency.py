@@ -0,0 +1,211 @@
+# app/core/concurrency.py
+import asyncio
+import math
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config.config import settings
+from app.core.metrics import (
+    concurrency_shed,
+    concurrency_queued,
+    concurrency_in_flight,
+    concurrency_limit,
+)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Long-lived streams would hold a slot for their whole lifetime
+UNLIMITED_PATHS = {f"{settings.API_V1_STR}/courses/events"}
+
+
+class GradientLimit:
+    """Adjusts a concurrency limit from the ratio of long-term to short-term latency."""
+
+    def __init__(
+            self,
+            initial: int,
+            min_limit: int,
+            max_limit: int,
+            smoothing: float = 0.2,
+            long_window: int = 600,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self._long_decay = 2 / (long_window + 1)
+        self._long_rtt: float | None = None
+
+    def update(self, rtt: float, in_flight: int) -> int:
+        if self._long_rtt is None:
+            self._long_rtt = rtt
+        else:
+            self._long_rtt += (rtt - self._long_rtt) * self._long_decay
+
+        # Don't grow the limit while the service is app-limited
+        if in_flight < self.limit / 2:
+            return int(self.limit)
+
+        gradient = max(0.5, min(1.0, self._long_rtt / max(rtt, 1e-6)))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+        return int(self.limit)
+
+
+class ConcurrencyLimiter:
+    """Bounded in-flight counter with a bounded FIFO wait queue."""
+
+    def __init__(
+            self,
+            name: str,
+            limit: int,
+            queue_size: int,
+            queue_timeout: float,
+            adaptive: GradientLimit | None = None,
+    ):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        concurrency_limit.labels(route_class=name).set(limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed. Returns False when shed."""
+        if self.in_flight < self.limit and not self._waiters:
+            self._take()
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            concurrency_shed.labels(route_class=self.name, reason='queue_full').inc()
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        concurrency_queued.labels(route_class=self.name).inc()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        finally:
+            concurrency_queued.labels(route_class=self.name).dec()
+
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over by release()
+            return True
+
+        self._abandon(waiter)
+        concurrency_shed.labels(route_class=self.name, reason='queue_timeout').inc()
+        return False
+
+    def release(self, rtt: float | None = None) -> None:
+        self.in_flight -= 1
+        concurrency_in_flight.labels(route_class=self.name).dec()
+
+        if self.adaptive is not None and rtt is not None:
+            self.limit = self.adaptive.update(rtt, self.in_flight + 1)
+            concurrency_limit.labels(route_class=self.name).set(self.limit)
+
+        self._wake()
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # A slot was handed over just as the waiter gave up on it
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        concurrency_in_flight.labels(route_class=self.name).inc()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+
+def classify_request(method: str, path: str) -> str | None:
+    """Map a request onto a route class, or None when it is not limited."""
+    if not path.startswith(settings.API_V1_STR) or path in UNLIMITED_PATHS:
+        return None
+    if path.startswith(f"{settings.API_V1_STR}/auth"):
+        return "auth"
+    if method in SAFE_METHODS:
+        return "read"
+    return "write"
+
+
+def build_limiters() -> dict[str, ConcurrencyLimiter]:
+    limits = {
+        "read": settings.CONCURRENCY_LIMIT_READ,
+        "write": settings.CONCURRENCY_LIMIT_WRITE,
+        "auth": settings.CONCURRENCY_LIMIT_AUTH,
+    }
+    limiters = {}
+    for name, limit in limits.items():
+        adaptive = None
+        if settings.CONCURRENCY_ADAPTIVE:
+            adaptive = GradientLimit(
+                initial=limit,
+                min_limit=settings.CONCURRENCY_MIN_LIMIT,
+                max_limit=settings.CONCURRENCY_MAX_LIMIT,
+            )
+        limiters[name] = ConcurrencyLimiter(
+            name=name,
+            limit=limit,
+            queue_size=settings.CONCURRENCY_QUEUE_SIZE,
+            queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT_SECONDS,
+            adaptive=adaptive,
+        )
+    return limiters
+
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware that sheds load with 503 once a route class is saturated."""
+
+    def __init__(self, app: ASGIApp, limiters: dict[str, ConcurrencyLimiter] | None = None):
+        self.app = app
+        self.limiters = limiters if limiters is not None else build_limiters()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        limiter = self.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry later"},
+                headers={"Retry-After": str(settings.CONCURRENCY_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start_time)
@@ -1,18 +1,94 @@
+import sqlite3
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy import Engine, event, inspect, text
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import Session as ORMSession
 from sqlmodel import Session, SQLModel, create_engine, select
 
 from app.config.config import settings
+from app.core import deadline
+from app.core.metrics import db_read_routing
+from app.core.replicas import READ_YOUR_WRITES_COOKIE, replicas
 from app.models.user import UserCreate, User
 from app.services.user_services import UserService
 
 engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
 
+@event.listens_for(ORMSession, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    """Bound every transaction by what is left of the request deadline."""
+    remaining = deadline.remaining()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise deadline.DeadlineExceeded("database")
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}")
+
+
+@event.listens_for(Engine, "connect")
+def _install_sqlite_interrupt(dbapi_connection, connection_record) -> None:
+    # SQLite has no statement_timeout; abort running statements from the progress handler
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.set_progress_handler(lambda: int(deadline.expired()), 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _map_deadline_errors(context):
+    error = context.original_exception
+    cancelled = getattr(error, "pgcode", None) == "57014" or "interrupted" in str(error)
+    if cancelled and deadline.expired():
+        return deadline.DeadlineExceeded("database")
+
+
+# (table, column) pairs the last create_all added to existing tables, for backfills
+added_columns: set[tuple[str, str]] = set()
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _add_missing_columns(metadata, connection, **kw) -> None:
+    """create_all never alters existing tables; add the columns and indexes introduced since they were created.
+
+    Only additive changes: a NOT NULL column needs a server default to fill the
+    existing rows, and changed constraints still need a migration.
+    """
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(
+                    f"Column {table.name}.{column.name} is NOT NULL without a server default, "
+                    f"the existing table needs a migration"
+                )
+            # Without constraints, which SQLite cannot add to an existing table
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+            added_columns.add((table.name, column.name))
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(connection)
+
+
 def init_db() -> None:
+    added_columns.clear()
     SQLModel.metadata.create_all(engine)
 
     with Session(engine) as session:
+        if ("course", "teacher_count") in added_columns:
+            # Imported here, the service depends on this module through the change log
+            from app.services.course_teacher_service import CourseTeacherService
+
+            # Existing courses got the default, count their assignments
+            CourseTeacherService.repair_course_staffing(session)
+
         user = session.exec(
             select(User).where(User.email == settings.FIRST_SUPERUSER)
         ).first()
@@ -26,9 +102,71 @@ def init_db() -> None:
             UserService.create_user(session=session, user=user_in)
 
 
+class LazySession(Session):
+    """Request session that holds a pooled connection only while it is in use.
+
+    Like any Session it checks out a connection on the first statement. Objects
+    are not expired on commit, so the connection goes back to the pool at commit
+    and serializing the response does not check it out again. ``release()``
+    hands it back once a read-only handler is done.
+    """
+
+    def __init__(self, bind=None, **kwargs):
+        kwargs.setdefault("expire_on_commit", False)
+        super().__init__(bind, **kwargs)
+
+    def release(self) -> None:
+        """End the unit of work and return the connection, keeping loaded objects readable."""
+        if self.in_transaction():
+            self.close()
+
+
+class SharedSession(LazySession):
+    """One transaction for every operation of an all-or-nothing batch.
+
+    Handlers commit as usual, which here only flushes; the batch decides at the
+    end whether everything is committed or rolled back.
+    """
+
+    def commit(self) -> None:
+        self.flush()
+
+    def release(self) -> None:
+        # Held for the whole batch, not for a single handler
+        pass
+
+    def finish(self, success: bool) -> None:
+        if success:
+            super().commit()
+        else:
+            self.rollback()
+
+
 def get_session() -> Session:
-    with Session(engine) as session:
+    with LazySession(engine) as session:
         yield session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+def get_read_session(request: Request) -> Session:
+    """Session for read-only routes, served by a replica when one is available."""
+    replica = None
+    if not request.cookies.get(READ_YOUR_WRITES_COOKIE):
+        replica = replicas.choose()
+    db_read_routing.labels(target='replica' if replica else 'primary').inc()
+
+    with LazySession(replica or engine) as session:
+        yield session
+
+
+def _batch_session_or(dependency):
+    """Use the session of an atomic batch (``request.state.batch_session``) when there is one."""
+
+    def resolve(request: Request, session: Session = Depends(dependency)) -> Session:
+        shared = getattr(request.state, "batch_session", None)
+        return shared if shared is not None else session
+
+    return resolve
+
+
+SessionDep = Annotated[Session, Depends(_batch_session_or(get_session))]
+ReadSessionDep = Annotated[Session, Depends(_batch_session_or(get_read_session))]
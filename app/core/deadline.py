@@ -0,0 +1,63 @@
+# app/core/deadline.py
+import time
+from contextvars import ContextVar
+
+from fastapi import HTTPException, Request, status
+
+from app.config.config import settings
+from app.core.metrics import request_deadline_exceeded
+
+# Monotonic timestamp after which the current request should give up
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, stage: str = "service"):
+        request_deadline_exceeded.labels(stage=stage).inc()
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request deadline exceeded",
+        )
+
+
+def set_deadline(seconds: float | None):
+    """Start a deadline in the current context. Returns a token for ``reset_deadline``."""
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline, or None when no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline(stage: str = "service") -> None:
+    """Raise 504 when the current request has used up its time budget."""
+    if expired():
+        raise DeadlineExceeded(stage)
+
+
+async def request_deadline(request: Request) -> None:
+    """Router dependency starting the deadline configured for the matched route.
+
+    Must stay async: it sets the context that the threadpool handlers copy.
+    Sub-requests of a batch never get more time than the batch has left.
+    """
+    route = request.scope.get("route")
+    name = getattr(route, "name", None)
+    seconds = settings.REQUEST_DEADLINES.get(name, settings.REQUEST_DEADLINE_SECONDS)
+    left = remaining()
+    if left is not None:
+        seconds = min(seconds, left)
+    set_deadline(seconds)
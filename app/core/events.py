@@ -0,0 +1,266 @@
+# app/core/events.py
+import json
+import logging
+import os
+import re
+import select
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Callable
+
+from sqlalchemy import Connection, Engine, text
+
+from app.config.config import settings
+from app.core.metrics import event_bus_messages
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any]], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+
+
+class EventBus(ABC):
+    """Publish/subscribe for domain events across worker processes.
+
+    Handlers are plain functions taking the event payload. Depending on the
+    backend they run on the publishing thread or on the bus listener thread,
+    so they must be quick and thread-safe.
+    """
+
+    name = "base"
+    # Whether publish_in_transaction() delivers with the caller's commit
+    transactional = False
+
+    def __init__(self):
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers[topic].append(handler)
+
+    def unsubscribe(self, topic: str, handler: Handler) -> None:
+        if handler in self._handlers[topic]:
+            self._handlers[topic].remove(handler)
+
+    @abstractmethod
+    def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        """Deliver payload to the topic's handlers in every process."""
+
+    def publish_in_transaction(self, connection: Connection, topic: str, payload: dict[str, Any]) -> None:
+        """Publish on connection, delivered once its transaction commits. Only for transactional backends."""
+        raise NotImplementedError(f"The {self.name} event bus cannot publish in a transaction")
+
+    def start(self) -> None:
+        """Start listening for events from other processes."""
+
+    def stop(self) -> None:
+        pass
+
+    def _dispatch(self, topic: str, payload: dict[str, Any]) -> None:
+        event_bus_messages.labels(backend=self.name, direction='received').inc()
+        for handler in list(self._handlers.get(topic, ())):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Event handler %r failed for %s", handler, topic)
+
+    def _dispatch_message(self, message: bytes | str) -> None:
+        try:
+            event = json.loads(message)
+            topic, payload = event["topic"], event["payload"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Dropping malformed event bus message")
+            return
+        self._dispatch(topic, payload)
+
+    @staticmethod
+    def _encode(topic: str, payload: dict[str, Any]) -> str:
+        return json.dumps({"topic": topic, "payload": payload}, separators=(",", ":"))
+
+
+class InMemoryEventBus(EventBus):
+    """Single process: handlers run synchronously on the publishing thread."""
+
+    name = "memory"
+
+    def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        event_bus_messages.labels(backend=self.name, direction='published').inc()
+        self._dispatch(topic, payload)
+
+
+class UnixSocketEventBus(EventBus):
+    """Processes on one host, without a broker.
+
+    Every process binds a datagram socket in a shared directory and publishing
+    sends the event to all of them, the publisher included.
+    """
+
+    name = "socket"
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._send_lock = threading.Lock()
+        self._receiver: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._receiver.settimeout(0.5)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="event-bus-socket", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(2.0)
+        self._thread = None
+        self._receiver.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        event_bus_messages.labels(backend=self.name, direction='published').inc()
+        message = self._encode(topic, payload).encode()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        with self._send_lock:
+            for name in names:
+                if not name.endswith(".sock"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    self._sender.sendto(message, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a process that exited without stopping its bus
+                    if path != self.path:
+                        self._unlink_stale(path)
+                except BlockingIOError:
+                    logger.warning("Event bus receiver %s is not keeping up, event dropped", name)
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                message = self._receiver.recv(1 << 20)
+            except socket.timeout:
+                continue
+            except OSError:
+                if not self._stop.is_set():
+                    logger.exception("Event bus socket failed")
+                return
+            self._dispatch_message(message)
+
+    @staticmethod
+    def _unlink_stale(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class PostgresEventBus(EventBus):
+    """All workers sharing the database, over LISTEN/NOTIFY.
+
+    Notifications are delivered to every listening connection, the publisher's
+    own included. NOTIFY is transactional: published in a transaction, an event
+    goes out when it commits and never if it rolls back.
+    """
+
+    name = "postgres"
+    transactional = True
+
+    def __init__(self, engine: Engine, channel: str):
+        super().__init__()
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", channel):
+            raise ValueError(f"Invalid event bus channel name: {channel}")
+        self.engine = engine
+        self.channel = channel
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-bus-postgres", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(2.0)
+        self._thread = None
+
+    def publish(self, topic: str, payload: dict[str, Any]) -> None:
+        with self.engine.connect() as connection:
+            self.publish_in_transaction(connection, topic, payload)
+            connection.commit()
+
+    def publish_in_transaction(self, connection: Connection, topic: str, payload: dict[str, Any]) -> None:
+        event_bus_messages.labels(backend=self.name, direction='published').inc()
+        message = self._encode(topic, payload)
+        if len(message.encode()) > MAX_NOTIFY_BYTES and "data" in payload:
+            # Too big for NOTIFY, subscribers reload the row when they need it
+            message = self._encode(topic, {**payload, "data": None, "truncated": True})
+        connection.execute(text("SELECT pg_notify(:channel, :message)"),
+                           {"channel": self.channel, "message": message})
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Event bus listener lost its connection, reconnecting")
+                self._stop.wait(1.0)
+
+    def _listen(self) -> None:
+        # A dedicated connection outside the pool, it stays in LISTEN for the process lifetime
+        pooled = self.engine.raw_connection()
+        connection = pooled.dbapi_connection
+        pooled.detach()
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            while not self._stop.is_set():
+                if select.select([connection], [], [], 1.0) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._dispatch_message(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+
+def build_event_bus() -> EventBus:
+    backend = settings.EVENT_BUS_BACKEND
+    if backend == "memory":
+        return InMemoryEventBus()
+    if backend == "socket":
+        return UnixSocketEventBus(settings.EVENT_BUS_SOCKET_DIR)
+    if backend == "postgres":
+        from app.core.db import engine
+        return PostgresEventBus(engine, settings.EVENT_BUS_CHANNEL)
+    raise ValueError(f"Unknown event bus backend: {backend}")
+
+
+event_bus = build_event_bus()
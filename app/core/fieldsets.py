@@ -0,0 +1,62 @@
+# app/core/fieldsets.py
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+from sqlmodel import SQLModel
+
+
+class FieldSet:
+    """Sparse fieldsets for a read model.
+
+    Maps every field of the read model onto the column that loads it, so a
+    ``fields=`` query parameter narrows both the SQL projection and the
+    serialized output. Statements are cached per field set.
+    """
+
+    def __init__(
+            self,
+            read_model: type[SQLModel],
+            columns: dict[str, Any],
+            select_from: Optional[Callable[[Select, tuple[str, ...]], Select]] = None,
+    ):
+        self.allowed = tuple(read_model.model_fields)
+        missing = set(self.allowed) - set(columns)
+        if missing:
+            raise ValueError(f"No column for fields: {', '.join(sorted(missing))}")
+        self.columns = columns
+        self.select_from = select_from
+        self.statement = lru_cache(maxsize=256)(self._build_statement)
+
+    def parse(self, raw: Optional[str]) -> Optional[tuple[str, ...]]:
+        """Validate a comma separated ``fields`` parameter, None when it was not given."""
+        if raw is None:
+            return None
+        requested = {field.strip() for field in raw.split(",") if field.strip()}
+        unknown = requested - set(self.allowed)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown)) or '(none given)'}. "
+                       f"Allowed: {', '.join(self.allowed)}",
+            )
+        return self.normalize(requested)
+
+    def normalize(self, fields: Iterable[str]) -> tuple[str, ...]:
+        """Canonical (model) order, so equal field sets share one cached statement."""
+        fields = set(fields)
+        return tuple(field for field in self.allowed if field in fields)
+
+    def all(self) -> tuple[str, ...]:
+        return self.allowed
+
+    def _build_statement(self, fields: tuple[str, ...]) -> Select:
+        statement = select(*[self.columns[field].label(field) for field in fields])
+        if self.select_from is not None:
+            statement = self.select_from(statement, fields)
+        return statement
+
+
+def rows_as_dicts(result) -> list[dict[str, Any]]:
+    return [dict(row._mapping) for row in result]
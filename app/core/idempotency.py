@@ -0,0 +1,365 @@
+# app/core/idempotency.py
+import asyncio
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import settings
+from app.core.metrics import idempotency_requests
+from app.models.idempotency import IdempotencyRecord
+from app.services.auth_services import AuthService
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+# Errors a retry would get again. Others (rate limits, auth, conflicts, server
+# errors) depend on the moment, so the key is released and a retry runs again
+STORED_ERRORS = {400, 404, 422}
+
+
+class KeyState(Enum):
+    NEW = "new"            # the caller owns the key and runs the request
+    PENDING = "pending"    # another request with the key is still running
+    DONE = "done"          # a stored response can be replayed
+    MISMATCH = "mismatch"  # the key was used for a different request
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    response: StoredResponse | None = None
+
+
+class IdempotencyStore(ABC):
+    """Remembers the first response for each idempotency key."""
+
+    # Whether calls do I/O and must run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: str) -> tuple[KeyState, StoredResponse | None]:
+        """Claim key for a new request, or report what is already known about it."""
+
+    @abstractmethod
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Store the response of a claimed key."""
+
+    @abstractmethod
+    def abandon(self, key: str) -> None:
+        """Release a claimed key without a response, so a retry runs again."""
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store, bounded in entries, least recently used evicted first."""
+
+    def __init__(self, max_keys: int, ttl: float, pending_timeout: float):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.pending_timeout = pending_timeout
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin(self, key: str, fingerprint: str) -> tuple[KeyState, StoredResponse | None]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                while len(self._entries) >= self.max_keys:
+                    self._entries.popitem(last=False)
+                self._entries[key] = _Entry(fingerprint, now + self.pending_timeout)
+                return KeyState.NEW, None
+
+            self._entries.move_to_end(key)
+            if entry.fingerprint != fingerprint:
+                return KeyState.MISMATCH, None
+            if entry.response is None:
+                return KeyState.PENDING, None
+            return KeyState.DONE, entry.response
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.response = response
+                entry.expires_at = time.monotonic() + self.ttl
+
+    def abandon(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Store shared by every worker, one row per key. The primary key arbitrates claims."""
+
+    blocking = True
+
+    def __init__(self, engine: Engine, ttl: float, pending_timeout: float):
+        self.engine = engine
+        self.ttl = ttl
+        self.pending_timeout = pending_timeout
+
+    def begin(self, key: str, fingerprint: str) -> tuple[KeyState, StoredResponse | None]:
+        with Session(self.engine) as session:
+            record = session.get(IdempotencyRecord, key)
+            if record is not None and record.expires_at <= datetime.utcnow():
+                session.delete(record)
+                session.commit()
+                record = None
+
+            if record is None:
+                session.add(IdempotencyRecord(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self.pending_timeout),
+                ))
+                try:
+                    session.commit()
+                    return KeyState.NEW, None
+                except IntegrityError:
+                    # Claimed by another worker in the meantime
+                    session.rollback()
+                    record = session.get(IdempotencyRecord, key)
+                    if record is None:
+                        return KeyState.PENDING, None
+
+            if record.fingerprint != fingerprint:
+                return KeyState.MISMATCH, None
+            if record.status_code is None:
+                return KeyState.PENDING, None
+            return KeyState.DONE, StoredResponse(
+                status_code=record.status_code,
+                headers=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers],
+                body=record.body,
+            )
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with Session(self.engine) as session:
+            record = session.get(IdempotencyRecord, key)
+            if record is None:
+                return
+            record.status_code = response.status_code
+            record.headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers]
+            record.body = response.body
+            record.expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+            session.add(record)
+            session.commit()
+
+    def abandon(self, key: str) -> None:
+        with Session(self.engine) as session:
+            session.exec(delete(IdempotencyRecord).where(IdempotencyRecord.key == key))
+            session.commit()
+
+    def purge_expired(self) -> None:
+        with Session(self.engine) as session:
+            session.exec(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.utcnow()))
+            session.commit()
+
+
+def build_store() -> IdempotencyStore:
+    if settings.IDEMPOTENCY_STORE == "database":
+        from app.core.db import engine
+        return DatabaseIdempotencyStore(
+            engine, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS
+        )
+    return InMemoryIdempotencyStore(
+        settings.IDEMPOTENCY_MAX_KEYS, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS
+    )
+
+
+idempotency_store = build_store()
+
+
+def _applies(scope: Scope) -> bool:
+    return (
+        scope["method"] == "POST"
+        and scope["path"].startswith(settings.API_V1_STR)
+        and not scope["path"].startswith(f"{settings.API_V1_STR}/auth")
+    )
+
+
+def _header(scope: Scope, name: bytes) -> bytes | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _subject(scope: Scope) -> str | None:
+    scheme, _, token = (_header(scope, b"authorization") or b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return AuthService.decode_token_subject(token)
+
+
+def _stored(status_code: int) -> bool:
+    return 200 <= status_code < 300 or status_code in STORED_ERRORS
+
+
+@dataclass
+class _Captured:
+    status_code: int = 500
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytearray = field(default_factory=bytearray)
+    too_large: bool = False
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated Idempotency-Key instead of running the handler.
+
+    Keys are scoped to the authenticated user. A duplicate arriving while the
+    first request is still running waits for it. Only successes and validation
+    errors are stored, anything else can be retried with the same key.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore | None = None):
+        self.app = app
+        self.store = store if store is not None else idempotency_store
+        self._in_flight: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        raw_key = _header(scope, IDEMPOTENCY_HEADER)
+        subject = _subject(scope) if raw_key else None
+        if subject is None:
+            await self.app(scope, receive, send)
+            return
+
+        if len(raw_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(status_code=400, content={"detail": "Idempotency-Key is too long"})
+            await response(scope, receive, send)
+            return
+
+        body, more_messages = await self._read_body(receive)
+        key = f"{subject}:{raw_key.decode('latin-1')}"
+        fingerprint = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), scope["query_string"], body])
+        ).hexdigest()
+
+        state, stored = await self._wait_for_key(key, fingerprint)
+        idempotency_requests.labels(outcome=state.value).inc()
+        if state is KeyState.DONE:
+            await self._replay(stored, send)
+            return
+        if state is not KeyState.NEW:
+            detail, code = (
+                ("Idempotency-Key was already used for a different request", 422)
+                if state is KeyState.MISMATCH
+                else ("A request with this Idempotency-Key is still in progress", 409)
+            )
+            response = JSONResponse(status_code=code, content={"detail": detail})
+            await response(scope, receive, send)
+            return
+
+        await self._run(key, scope, self._replay_receive(body, more_messages, receive), send)
+
+    async def _call_store(self, method, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def _wait_for_key(self, key: str, fingerprint: str) -> tuple[KeyState, StoredResponse | None]:
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            state, stored = await self._call_store(self.store.begin, key, fingerprint)
+            remaining = deadline - time.monotonic()
+            if state is not KeyState.PENDING or remaining <= 0:
+                return state, stored
+
+            in_flight = self._in_flight.get(key)
+            try:
+                if in_flight is not None:
+                    await asyncio.wait_for(in_flight.wait(), remaining)
+                else:
+                    # Running in another worker, only the store can tell when it is done
+                    await asyncio.sleep(min(settings.IDEMPOTENCY_POLL_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, key: str, scope: Scope, receive: Receive, send: Send) -> None:
+        finished = asyncio.Event()
+        self._in_flight[key] = finished
+        captured = _Captured()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                captured.status_code = message["status"]
+                captured.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body" and not captured.too_large:
+                captured.body += message.get("body", b"")
+                captured.too_large = len(captured.body) > settings.IDEMPOTENCY_MAX_BODY_BYTES
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if _stored(captured.status_code) and not captured.too_large:
+                await self._call_store(self.store.complete, key, StoredResponse(
+                    captured.status_code, captured.headers, bytes(captured.body)
+                ))
+                stored = True
+        finally:
+            if not stored:
+                await self._call_store(self.store.abandon, key)
+            self._in_flight.pop(key, None)
+            finished.set()
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> tuple[bytes, list[Message]]:
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return bytes(body), [message]
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                return bytes(body), []
+
+    @staticmethod
+    def _replay_receive(body: bytes, pending: list[Message], receive: Receive) -> Receive:
+        messages = [{"type": "http.request", "body": body, "more_body": False}, *pending]
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return replay
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status_code,
+            "headers": [*stored.headers, REPLAYED_HEADER],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
@@ -0,0 +1,219 @@
+# app/core/jobs.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlmodel import Session, select, update
+
+from app.core.metrics import jobs_finished, jobs_running
+from app.enum.job_status_enum import JobStatus
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[["JobContext", dict[str, Any]], Optional[dict[str, Any]]]
+
+# kind -> function running the job, filled by @register_job
+job_kinds: dict[str, JobFunc] = {}
+
+
+def register_job(kind: str) -> Callable[[JobFunc], JobFunc]:
+    def decorator(func: JobFunc) -> JobFunc:
+        job_kinds[kind] = func
+        return func
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once an admin asked to cancel it."""
+
+
+class JobInterrupted(Exception):
+    """Raised inside a job when the process shuts down; the job is requeued."""
+
+
+class JobContext:
+    """Handed to a running job for progress reporting and cancellation checks."""
+
+    def __init__(self, runner: "JobRunner", job_id: int):
+        self.runner = runner
+        self.job_id = job_id
+
+    def session(self) -> Session:
+        return self.runner.session_factory()
+
+    def report(self, progress: float, message: str | None = None) -> None:
+        """Record progress (0..1). Raises JobCancelled/JobInterrupted when the job should stop."""
+        with self.session() as session:
+            job = session.get(Job, self.job_id)
+            job.progress = max(0.0, min(1.0, progress))
+            job.message = message
+            job.heartbeat_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+            cancelled = job.cancel_requested
+        self._raise_if_stopping(cancelled)
+
+    def check_cancelled(self) -> None:
+        with self.session() as session:
+            cancelled = session.exec(select(Job.cancel_requested).where(Job.id == self.job_id)).one()
+        self._raise_if_stopping(cancelled)
+
+    def _raise_if_stopping(self, cancelled: bool) -> None:
+        if cancelled:
+            raise JobCancelled()
+        if self.runner.stopping:
+            raise JobInterrupted()
+
+
+class JobRunner:
+    """Bounded thread pool running jobs persisted in the job table.
+
+    Jobs are claimed with a conditional UPDATE, so every worker process may
+    run a runner: a job only ever runs once at a time. ``recover()`` picks up
+    queued jobs nobody is running and requeues jobs whose worker died.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int, max_queued: int, stale_seconds: int):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.stale_seconds = stale_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._local: set[int] = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def has_capacity(self) -> bool:
+        return len(self._local) < self.max_queued
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+        self.recover()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask running jobs to stop at their next report, and wait for them."""
+        if self._executor is None:
+            return
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        deadline = time.monotonic() + timeout
+        while self._local and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._executor = None
+
+    def enqueue(self, job_id: int) -> None:
+        """Schedule a queued job here. Without a started runner it waits for recover()."""
+        with self._lock:
+            if self._executor is None or job_id in self._local:
+                return
+            self._local.add(job_id)
+        future = self._executor.submit(self._run, job_id)
+        # Cancelled by stop() before it ran, _run never gets to release the id
+        future.add_done_callback(lambda done: done.cancelled() and self._release(job_id))
+
+    def recover(self) -> None:
+        with self.session_factory() as session:
+            now = datetime.utcnow()
+            if self._local:
+                # Our own running jobs are alive
+                session.exec(
+                    update(Job)
+                    .where(Job.id.in_(list(self._local)), Job.status == JobStatus.RUNNING)
+                    .values(heartbeat_at=now)
+                )
+            session.exec(
+                update(Job)
+                .where(Job.status == JobStatus.RUNNING)
+                .where(Job.heartbeat_at < now - timedelta(seconds=self.stale_seconds))
+                .values(status=JobStatus.QUEUED)
+            )
+            session.commit()
+            queued = session.exec(
+                select(Job.id).where(Job.status == JobStatus.QUEUED).order_by(Job.id)
+            ).all()
+        for job_id in queued:
+            if not self.has_capacity():
+                break
+            self.enqueue(job_id)
+
+    def run(self, job_id: int) -> None:
+        """Claim and run a job on the calling thread."""
+        with self._lock:
+            self._local.add(job_id)
+        self._run(job_id)
+
+    def _claim(self, job_id: int) -> Job | None:
+        with self.session_factory() as session:
+            now = datetime.utcnow()
+            claimed = session.exec(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now)
+            ).rowcount
+            session.commit()
+            return session.get(Job, job_id) if claimed else None
+
+    def _finish(self, job_id: int, status: JobStatus, **values) -> None:
+        with self.session_factory() as session:
+            # Only while this runner still holds the claim
+            session.exec(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+                .values(status=status, finished_at=None if status == JobStatus.QUEUED else datetime.utcnow(), **values)
+            )
+            session.commit()
+
+    def _run(self, job_id: int) -> None:
+        try:
+            if self.stopping:
+                return
+            job = self._claim(job_id)
+            if job is None:
+                return
+            func = job_kinds.get(job.kind)
+            if func is None:
+                self._finish(job_id, JobStatus.FAILED, error=f"Unknown job kind: {job.kind}")
+                jobs_finished.labels(kind=job.kind, status='failed').inc()
+                return
+
+            jobs_running.labels(kind=job.kind).inc()
+            try:
+                result = func(JobContext(self, job_id), dict(job.params))
+            except JobCancelled:
+                self._finish(job_id, JobStatus.CANCELLED)
+                jobs_finished.labels(kind=job.kind, status='cancelled').inc()
+            except JobInterrupted:
+                self._finish(job_id, JobStatus.QUEUED)
+                jobs_finished.labels(kind=job.kind, status='interrupted').inc()
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job_id, job.kind)
+                self._finish(job_id, JobStatus.FAILED, error=str(e) or type(e).__name__)
+                jobs_finished.labels(kind=job.kind, status='failed').inc()
+            else:
+                self._finish(job_id, JobStatus.SUCCEEDED, progress=1.0, result=result)
+                jobs_finished.labels(kind=job.kind, status='succeeded').inc()
+            finally:
+                jobs_running.labels(kind=job.kind).dec()
+        except Exception:
+            logger.exception("Job runner failed on job %s", job_id)
+        finally:
+            self._release(job_id)
+
+    def _release(self, job_id: int) -> None:
+        with self._lock:
+            self._local.discard(job_id)
@@ -26,11 +26,29 @@ course_operations = Counter(
     ['operation', 'status']  # operation: create, update, delete, list, get
 )
 
+# Courses in the course table: counted at startup, then follows the change log's
+# course creates and deletes, including moves to archival storage
 active_courses = Gauge(
     'radegast_active_courses',
     'Number of active courses'
 )
 
+stats_counter_drift = Counter(
+    'radegast_stats_counter_drift_total',
+    'Stats counters found wrong and corrected by reconciliation'
+)
+
+courses_archived = Counter(
+    'radegast_courses_archived_total',
+    'Archived courses moved to archival storage'
+)
+
+course_status_transitions = Counter(
+    'radegast_course_status_transitions_total',
+    'Courses moved to a status by the date scheduler',
+    ['status']  # status: active, archived
+)
+
 # Teacher Assignment Metrics
 teacher_assignments = Counter(
     'radegast_teacher_assignments_total',
@@ -38,6 +56,12 @@ teacher_assignments = Counter(
     ['operation', 'status']  # operation: assign, remove, update
 )
 
+teacher_schedule_conflicts = Counter(
+    'radegast_teacher_schedule_conflicts_total',
+    'Teacher assignments overlapping another course of the teacher',
+    ['policy']  # policy: warn, reject
+)
+
 teachers_per_course = Histogram(
     'radegast_teachers_per_course',
     'Number of teachers assigned per course',
@@ -74,6 +98,135 @@ active_users = Gauge(
     ['role']  # ADMIN, TEACHER, STUDENT
 )
 
+# Read Replica Metrics
+db_read_routing = Counter(
+    'radegast_db_read_routing_total',
+    'Read sessions by target database',
+    ['target']  # replica, primary
+)
+
+db_replica_up = Gauge(
+    'radegast_db_replica_up',
+    'Whether a read replica passed its last health check',
+    ['replica']
+)
+
+# Concurrency Limiting Metrics
+concurrency_shed = Counter(
+    'radegast_concurrency_shed_total',
+    'Requests rejected by the concurrency limiter',
+    ['route_class', 'reason']  # reason: queue_full, queue_timeout
+)
+
+concurrency_queued = Gauge(
+    'radegast_concurrency_queued',
+    'Requests waiting for a concurrency slot',
+    ['route_class']
+)
+
+concurrency_in_flight = Gauge(
+    'radegast_concurrency_in_flight',
+    'Requests currently holding a concurrency slot',
+    ['route_class']
+)
+
+concurrency_limit = Gauge(
+    'radegast_concurrency_limit',
+    'Current concurrency limit',
+    ['route_class']
+)
+
+# Rate Limiting Metrics
+rate_limit_hits = Counter(
+    'radegast_rate_limit_hits_total',
+    'Requests checked by the rate limiter',
+    ['policy', 'outcome']  # outcome: allowed, limited
+)
+
+# Request Deadline Metrics
+request_deadline_exceeded = Counter(
+    'radegast_request_deadline_exceeded_total',
+    'Requests that ran past their deadline',
+    ['stage']  # stage: service, database
+)
+
+# Batch Metrics
+batch_operations = Counter(
+    'radegast_batch_operations_total',
+    'Sub-requests run through the batch endpoint',
+    ['method', 'outcome']  # outcome: success, failed, skipped
+)
+
+# Change Log Metrics
+change_log_compacted = Counter(
+    'radegast_change_log_compacted_total',
+    'Change log entries removed by compaction',
+    ['reason']  # reason: superseded, tombstone
+)
+
+# Server-Sent Events Metrics
+sse_subscribers = Gauge(
+    'radegast_sse_subscribers',
+    'Open course event streams'
+)
+
+sse_dropped_subscribers = Counter(
+    'radegast_sse_dropped_subscribers_total',
+    'Event streams closed because the client fell behind'
+)
+
+# Event Bus Metrics
+event_bus_messages = Counter(
+    'radegast_event_bus_messages_total',
+    'Domain events passed through the event bus',
+    ['backend', 'direction']  # direction: published, received
+)
+
+# Idempotency Metrics
+idempotency_requests = Counter(
+    'radegast_idempotency_requests_total',
+    'Requests carrying an Idempotency-Key',
+    ['outcome']  # outcome: new, done (replayed), pending (gave up waiting), mismatch
+)
+
+# Background Job Metrics
+jobs_finished = Counter(
+    'radegast_jobs_finished_total',
+    'Background jobs that stopped running',
+    ['kind', 'status']  # status: succeeded, failed, cancelled, interrupted
+)
+
+jobs_running = Gauge(
+    'radegast_jobs_running',
+    'Background jobs running in this process',
+    ['kind']
+)
+
+# Audit Log Metrics
+audit_events = Counter(
+    'radegast_audit_events_total',
+    'Audit events by what happened to them',
+    ['outcome']  # outcome: queued, written, dropped, failed
+)
+
+audit_queue_depth = Gauge(
+    'radegast_audit_queue_depth',
+    'Audit events waiting to be written'
+)
+
+# Snapshot Metrics
+snapshot_builds = Counter(
+    'radegast_snapshot_builds_total',
+    'Pre-rendered snapshot builds',
+    ['snapshot', 'status']  # status: success, failed
+)
+
+snapshot_responses = Counter(
+    'radegast_snapshot_responses_total',
+    'Requests answered from a pre-rendered snapshot',
+    ['snapshot', 'outcome']  # outcome: gzip, identity, not_modified
+)
+
 
 # Decorator for tracking endpoint metrics
 def track_endpoint_metrics(endpoint_name: str):
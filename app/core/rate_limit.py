@@ -0,0 +1,141 @@
+# app/core/rate_limit.py
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import HTTPException, Request, status
+
+from app.config.config import settings
+from app.core.metrics import rate_limit_hits
+from app.services.auth_services import AuthService
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parse "10/minute" into (bucket capacity, tokens refilled per second)."""
+    count, _, period = rate.partition("/")
+    seconds = PERIODS.get(period.strip().rstrip("s"))
+    if seconds is None or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate {rate!r}, expected <count>/<{'|'.join(PERIODS)}>")
+    capacity = int(count)
+    return capacity, capacity / seconds
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. Implement this to share limits between workers."""
+
+    @abstractmethod
+    def hit(self, key: str, capacity: int, refill_rate: float) -> float:
+        """Take one token for key. Returns 0 when allowed, else seconds until retry."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all buckets."""
+
+
+class InMemoryTokenBucketBackend(RateLimitBackend):
+    """Per-process token buckets: one (tokens, timestamp) pair per key, idle keys evicted."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (tokens, last update, time at which the bucket is full again)
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = float(capacity)
+            else:
+                tokens, updated_at, _ = bucket
+                tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_rate
+
+            full_at = now + (capacity - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, full_at)
+            return retry_after
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        # Least recently used keys sit at the front; a full bucket carries no state
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) < self.max_keys:
+                break
+            del self._buckets[key]
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+
+    def check(self, policy: str, rate: str, key: str) -> None:
+        capacity, refill_rate = parse_rate(rate)
+        retry_after = self.backend.hit(f"{policy}:{key}", capacity, refill_rate)
+        if retry_after:
+            rate_limit_hits.labels(policy=policy, outcome='limited').inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        rate_limit_hits.labels(policy=policy, outcome='allowed').inc()
+
+
+rate_limiter = RateLimiter(InMemoryTokenBucketBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS))
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def login_email(request: Request) -> str:
+    email = request.query_params.get("email")
+    return email.lower() if email else client_ip(request)
+
+
+def token_subject(request: Request) -> str:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        subject = AuthService.decode_token_subject(token)
+        if subject:
+            return subject
+    return client_ip(request)
+
+
+class RateLimit:
+    """Route dependency enforcing one rate limit policy.
+
+    Usage: ``dependencies=[Depends(RateLimit("login", "RATE_LIMIT_LOGIN", login_email))]``
+    """
+
+    def __init__(self, policy: str, setting: str, key_func: Callable[[Request], str] = client_ip):
+        self.policy = policy
+        self.setting = setting
+        self.key_func = key_func
+        # Fail on a misconfigured rate at startup rather than on the first request
+        parse_rate(getattr(settings, setting))
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        rate_limiter.check(self.policy, getattr(settings, self.setting), self.key_func(request))
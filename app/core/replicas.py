@@ -0,0 +1,96 @@
+# app/core/replicas.py
+import itertools
+import logging
+import threading
+
+from sqlalchemy import Engine, create_engine, event, text
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import settings
+from app.core.metrics import db_replica_up
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_COOKIE = "radegast_recent_write"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# POST endpoints that only read, so they must not pin the client to the primary
+READ_ONLY_POST_PATHS = {f"{settings.API_V1_STR}/courses/batch"}
+
+
+class ReplicaPool:
+    """Health-checked round robin over read replica engines."""
+
+    def __init__(self, urls: list[str]):
+        self.engines: list[Engine] = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self._healthy = [True] * len(self.engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for index, replica in enumerate(self.engines):
+            event.listen(replica, "handle_error", self._on_error(index))
+            db_replica_up.labels(replica=str(index)).set(1)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Engine | None:
+        """Next healthy replica, or None when every replica is down."""
+        if not self.engines:
+            return None
+        with self._lock:
+            start = next(self._counter)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._healthy[index]:
+                return self.engines[index]
+        return None
+
+    def check_health(self) -> None:
+        for index, replica in enumerate(self.engines):
+            try:
+                with replica.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self._set_health(index, True)
+            except Exception:
+                logger.warning("Read replica %s failed its health check", index)
+                self._set_health(index, False)
+
+    def _set_health(self, index: int, healthy: bool) -> None:
+        self._healthy[index] = healthy
+        db_replica_up.labels(replica=str(index)).set(int(healthy))
+
+    def _on_error(self, index: int):
+        def handle_error(context) -> None:
+            # Take the replica out of rotation until the next successful health check
+            if context.is_disconnect:
+                self._set_health(index, False)
+        return handle_error
+
+
+replicas = ReplicaPool(settings.REPLICA_DATABASE_URIS)
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so their next reads go to the primary."""
+
+    def __init__(self, app: ASGIApp, window_seconds: int):
+        self.app = app
+        self.cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={window_seconds}; Path=/; HttpOnly; SameSite=Lax"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+                scope["type"] != "http"
+                or scope["method"] in SAFE_METHODS
+                or scope["path"] in READ_ONLY_POST_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", self.cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,42 @@
+# app/core/routing.py
+import asyncio
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+
+from app.core.db import LazySession
+
+
+def _release_sessions(values: dict[str, Any]) -> None:
+    for value in values.values():
+        if isinstance(value, LazySession):
+            value.release()
+
+
+def release_sessions_after(func: Callable) -> Callable:
+    """Release the request's sessions as soon as the handler returns, before the
+    response model is validated and encoded."""
+
+    @wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _release_sessions(kwargs)
+
+    @wraps(func)
+    def sync_wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _release_sessions(kwargs)
+
+    return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """APIRoute whose endpoint gives its pooled DB connection back before serialization."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, release_sessions_after(endpoint), **kwargs)
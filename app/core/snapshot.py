@@ -0,0 +1,209 @@
+# app/core/snapshot.py
+import gzip
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.metrics import snapshot_builds, snapshot_responses
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Document:
+    """One rendered document of a snapshot, mapped from its files"""
+    etag: str
+    identity: memoryview
+    gzip: memoryview
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    documents: dict[str, Document]
+    built_at: float
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, both encodings of a document share its tag
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+class FileSnapshot:
+    """Documents rendered ahead of time and served from memory mapped files.
+
+    ``render`` returns the documents by name. A build writes each of them plain
+    and gzip compressed to a temporary file, maps it and renames it over the
+    previous version, so the directory only ever holds complete files and
+    mappings of a replaced build stay valid for responses still sending them.
+    Serving a document costs neither queries nor serialization.
+
+    ``invalidate()`` asks for a rebuild. It runs once no change came in for
+    ``debounce`` seconds, but no later than ``max_delay`` after the first
+    change, so a steady stream of writes cannot keep the snapshot stale. A
+    snapshot older than ``max_age`` is rebuilt regardless.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            directory: str,
+            render: Callable[[], dict[str, bytes]],
+            debounce: float,
+            max_delay: float,
+            max_age: float
+    ):
+        self.name = name
+        self.directory = directory
+        self.render = render
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self._current: Snapshot | None = None
+        self._condition = threading.Condition()
+        # Monotonic times of the first and the latest change not built yet
+        self._first_change: float | None = None
+        self._last_change = 0.0
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> Snapshot | None:
+        return self._current
+
+    def start(self) -> None:
+        """Build in the background, starting right away"""
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with self._condition:
+            self._stopping = False
+            self._first_change = self._last_change = time.monotonic() - self.debounce
+        self._thread = threading.Thread(target=self._run, name=f"snapshot-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        self._current = None
+
+    def invalidate(self) -> None:
+        if self._thread is None:
+            return
+        with self._condition:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify_all()
+
+    def build(self) -> Snapshot:
+        """Render and swap in a new snapshot on the calling thread"""
+        try:
+            documents = {}
+            for key, body in self.render().items():
+                documents[key] = Document(
+                    etag=f'W/"{hashlib.sha256(body).hexdigest()[:32]}"',
+                    identity=self._write(f"{self.name}-{key}.json", body),
+                    gzip=self._write(f"{self.name}-{key}.json.gz", gzip.compress(body, mtime=0)),
+                )
+        except Exception:
+            snapshot_builds.labels(snapshot=self.name, status='failed').inc()
+            raise
+        self._current = Snapshot(documents, time.monotonic())
+        snapshot_builds.labels(snapshot=self.name, status='success').inc()
+        return self._current
+
+    def response(self, key: str, request: Request, media_type: str = "application/json") -> Response | None:
+        """The document as a response to request, None until a snapshot was built"""
+        snapshot = self._current
+        document = snapshot.documents.get(key) if snapshot is not None else None
+        if document is None:
+            return None
+
+        headers = {"ETag": document.etag, "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), document.etag):
+            snapshot_responses.labels(snapshot=self.name, outcome='not_modified').inc()
+            return Response(status_code=304, headers=headers)
+        if _accepts_gzip(request.headers.get("accept-encoding", "")):
+            snapshot_responses.labels(snapshot=self.name, outcome='gzip').inc()
+            headers["Content-Encoding"] = "gzip"
+            return Response(document.gzip, media_type=media_type, headers=headers)
+        snapshot_responses.labels(snapshot=self.name, outcome='identity').inc()
+        return Response(document.identity, media_type=media_type, headers=headers)
+
+    def _write(self, filename: str, data: bytes) -> memoryview:
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix=f".{filename}.")
+        try:
+            with os.fdopen(fd, "w+b") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+                # Mapped before the rename, another worker may replace the file right after
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            os.replace(temporary, os.path.join(self.directory, filename))
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+        return memoryview(mapped)
+
+    def _wait(self, now: float) -> float:
+        """Seconds until the next build is due"""
+        if self._first_change is None:
+            built_at = self._current.built_at if self._current is not None else now
+            return built_at + self.max_age - now
+        return min(self._last_change + self.debounce, self._first_change + self.max_delay) - now
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    wait = self._wait(time.monotonic())
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                if self._stopping:
+                    return
+                self._first_change = None
+            try:
+                self.build()
+            except Exception:
+                logger.exception("Snapshot %s build failed, retrying", self.name)
+                with self._condition:
+                    if self._first_change is None:
+                        self._first_change = self._last_change = time.monotonic()
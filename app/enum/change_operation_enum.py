@@ -0,0 +1,6 @@
+# app/enum/change_operation_enum.py
+from enum import Enum
+
+class ChangeOperation(str, Enum):
+    UPSERT = "upsert"
+    DELETE = "delete"
@@ -0,0 +1,9 @@
+# app/enum/job_status_enum.py
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
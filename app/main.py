@@ -1,18 +1,87 @@
+import math
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
+from fastapi.concurrency import run_in_threadpool
+from app.config.config import settings
+from app.core.audit import audit_log
+from app.core.concurrency import ConcurrencyLimitMiddleware
 from app.core.db import init_db
+from app.core.events import event_bus
+from app.core.idempotency import DatabaseIdempotencyStore, IdempotencyMiddleware, idempotency_store
+from app.core.replicas import ReadYourWritesMiddleware, replicas
+from app.core.tasks import PeriodicTask
 from app.routes.v1 import api_router
+from app.services.catalog_service import catalog_snapshot
+from app.services.change_log_service import compact_change_log
+from app.services.course_archive_service import archive_courses
+from app.services.course_schedule_service import run_course_schedule
+from app.services.job_service import job_runner
+from app.services.stats_service import reconcile_stats
 from prometheus_fastapi_instrumentator import Instrumentator
 from app.core.metrics import active_courses, active_users
 from sqlmodel import select, func
 
 
+replica_health_check = PeriodicTask(
+    "replica-health-check", settings.REPLICA_HEALTH_CHECK_SECONDS, replicas.check_health
+)
+change_log_compaction = PeriodicTask(
+    "change-log-compaction", settings.CHANGE_LOG_COMPACT_INTERVAL_SECONDS, compact_change_log
+)
+course_schedule = PeriodicTask(
+    "course-schedule", settings.COURSE_SCHEDULE_INTERVAL_SECONDS, run_course_schedule
+)
+course_archival = (
+    PeriodicTask("course-archival", settings.COURSE_ARCHIVAL_INTERVAL_SECONDS, archive_courses)
+    if settings.COURSE_ARCHIVAL_ENABLED else None
+)
+stats_reconciliation = PeriodicTask(
+    "stats-reconciliation", settings.STATS_RECONCILE_INTERVAL_SECONDS, reconcile_stats
+)
+job_recovery = PeriodicTask("job-recovery", settings.JOB_RECOVERY_SECONDS, job_runner.recover)
+idempotency_purge = (
+    PeriodicTask("idempotency-purge", settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS, idempotency_store.purge_expired)
+    if isinstance(idempotency_store, DatabaseIdempotencyStore) else None
+)
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     # Load the database and create tables
     init_db()
+    # Counters are only adjusted by later changes, count what is already there
+    await run_in_threadpool(reconcile_stats)
+    event_bus.start()
+    audit_log.start()
+    if replicas:
+        replica_health_check.start()
+    change_log_compaction.start()
+    course_schedule.start()
+    if course_archival:
+        course_archival.start()
+    stats_reconciliation.start()
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        catalog_snapshot.start()
+    job_runner.start()
+    job_recovery.start()
+    if idempotency_purge:
+        idempotency_purge.start()
     yield
     # Clean up and release the resources
+    if idempotency_purge:
+        idempotency_purge.stop()
+    job_recovery.stop()
+    # Waits for running jobs, off the event loop
+    await run_in_threadpool(job_runner.stop)
+    catalog_snapshot.stop()
+    stats_reconciliation.stop()
+    if course_archival:
+        course_archival.stop()
+    course_schedule.stop()
+    change_log_compaction.stop()
+    replica_health_check.stop()
+    audit_log.stop()
+    event_bus.stop()
 
 
 app = FastAPI(
@@ -25,6 +94,23 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if replicas or settings.CATALOG_SNAPSHOT_ENABLED:
+    window = settings.READ_YOUR_WRITES_SECONDS
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        # The catalog trails a write by up to its max delay plus a build; writers read the database meanwhile
+        window = max(window, math.ceil(
+            settings.CATALOG_SNAPSHOT_MAX_DELAY_SECONDS + settings.CATALOG_SNAPSHOT_DEBOUNCE_SECONDS
+        ))
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=window)
+
+# Added before the instrumentator so shed requests still show up in its metrics
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Outside the concurrency limiter: replays and waiting duplicates don't take a slot
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
 instrumentator = Instrumentator()
 instrumentator.instrument(app).expose(app)
 app.include_router(api_router)
@@ -0,0 +1,19 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from sqlalchemy import JSON
+from sqlmodel import Field, SQLModel
+
+
+class AuditEvent(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # e.g. "course.create", "course_teacher.remove"
+    action: str = Field(max_length=64, index=True)
+    entity: str = Field(max_length=32)
+    entity_id: Optional[int] = None
+    course_id: Optional[int] = Field(default=None, index=True)
+    # No foreign key: the trail outlives deleted users
+    actor_id: Optional[int] = Field(default=None, index=True)
+    actor_email: Optional[str] = Field(default=None, max_length=255)
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
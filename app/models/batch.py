@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from sqlmodel import SQLModel
+
+
+class BatchOperation(SQLModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    # Relative to the API root, e.g. "/courses/1/teachers"
+    path: str
+    query: Optional[Dict[str, Any]] = None
+    body: Optional[Any] = None
+
+
+class BatchRequest(SQLModel):
+    operations: List[BatchOperation]
+    # All operations share one transaction and are rolled back if any of them fails
+    atomic: bool = False
+
+
+class BatchOperationResult(SQLModel):
+    status_code: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(SQLModel):
+    results: List[BatchOperationResult]
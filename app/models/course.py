@@ -1,9 +1,12 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, Relationship
 
 from app.enum.course_status_enum import CourseStatus
+from app.enum.teacher_role_enum import TeacherRole
+from app.models.course_teacher import CourseTeacherRead
 
 if TYPE_CHECKING:
     from app.models.course_teacher import CourseTeacher
@@ -18,11 +21,36 @@ class CourseBase(SQLModel):
 
 
 class Course(CourseBase, table=True):
+    __table_args__ = (
+        # Scheduled courses in date order, for overlap checks
+        Index("ix_course_period", "start_date", "end_date"),
+        # Courses due for a status transition
+        Index("ix_course_status_start", "status", "start_date"),
+        Index("ix_course_status_end", "status", "end_date"),
+        # Hot read paths skip archived courses, which become most of the table over time
+        Index(
+            "ix_course_live",
+            "id",
+            postgresql_where=text("status <> 'ARCHIVED'"),
+            sqlite_where=text("status <> 'ARCHIVED'"),
+        ),
+        # Ids of archived courses live on in archival storage and must never be reused
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    teacher_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    # Denormalized staffing, maintained by CourseTeacherService:
+    # teacher_id is the primary teacher, teacher_count the number of assignments
+    teacher_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
+    teacher_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Course this one was cloned from, also how a bulk clone pairs copies with their sources
+    cloned_from_id: Optional[int] = Field(default=None, foreign_key="course.id", ondelete="SET NULL", index=True)
 
     # Koristi string za forward reference
-    teachers: List["CourseTeacher"] = Relationship(back_populates="course")
+    # Assignments go with the course through ON DELETE CASCADE, never loaded for it
+    teachers: List["CourseTeacher"] = Relationship(
+        back_populates="course", sa_relationship_kwargs={"passive_deletes": "all"}
+    )
 
 
 class CourseCreate(CourseBase):
@@ -32,6 +60,61 @@ class CourseCreate(CourseBase):
 class CourseRead(CourseBase):
     id: int
     teacher_id: Optional[int] = None
+    teacher_count: int = 0
+    cloned_from_id: Optional[int] = None
+
+
+class CourseReadWithTeachers(CourseRead):
+    teachers: List[CourseTeacherRead] = []
+
+
+class TeacherCourseRead(CourseRead):
+    # The teacher's assignment to the course
+    role: TeacherRole
+    assigned_at: datetime
+
+
+class TeacherCoursePage(SQLModel):
+    courses: List[TeacherCourseRead]
+    next_cursor: Optional[int] = None
+    has_more: bool
+
+
+class CourseCloneOptions(SQLModel):
+    status: CourseStatus = CourseStatus.DRAFT
+    # Moves both dates, e.g. 364 to roll a course over to the same weekday next year
+    shift_days: int = Field(default=0, ge=-3660, le=3660)
+    include_teachers: bool = True
+
+
+class CourseClone(CourseCloneOptions):
+    # Defaults to the source title
+    title: Optional[str] = None
+
+
+class CourseBulkClone(CourseCloneOptions):
+    # Every course with this status is cloned
+    source_status: CourseStatus
+
+
+class CourseBulkDeleteResult(SQLModel):
+    deleted: List[int]
+    missing: List[int]
+
+
+class CourseSearchResult(CourseRead):
+    # Relevance, higher is better; only comparable within one search
+    rank: float
+
+
+class CourseSearchPage(SQLModel):
+    courses: List[CourseSearchResult]
+    next_offset: Optional[int] = None
+    has_more: bool
+
+
+class CourseBatchRequest(SQLModel):
+    ids: List[int]
 
 
 class CourseUpdate(SQLModel):
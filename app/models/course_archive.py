@@ -0,0 +1,26 @@
+from typing import Optional
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+from app.enum.teacher_role_enum import TeacherRole
+from app.models.course import CourseBase
+
+
+class ArchivedCourse(CourseBase, table=True):
+    """Cold storage for archived courses, moved out of the course table by the archival job"""
+    # Keeps the id the course had
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    teacher_id: Optional[int] = None
+    teacher_count: int = 0
+    cloned_from_id: Optional[int] = None
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ArchivedCourseTeacher(SQLModel, table=True):
+    """Teacher assignments of archived courses"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(foreign_key="archivedcourse.id", index=True)
+    teacher_id: int = Field(index=True)
+    role: TeacherRole
+    assigned_at: datetime
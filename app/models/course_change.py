@@ -0,0 +1,45 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from sqlalchemy import Index, JSON
+from sqlmodel import Field, SQLModel
+
+from app.enum.change_operation_enum import ChangeOperation
+
+
+class CourseChangeBase(SQLModel):
+    # "course" or "course_teacher"
+    entity: str
+    entity_id: int
+    course_id: int = Field(index=True)
+    operation: ChangeOperation
+    # Row after the change, None for delete tombstones
+    data: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CourseChange(CourseChangeBase, table=True):
+    __table_args__ = (
+        Index("ix_coursechange_entity", "entity", "entity_id"),
+        # Never hand out a sequence number twice, even after the newest entry is compacted away
+        {"sqlite_autoincrement": True},
+    )
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+
+
+class CourseChangeRead(CourseChangeBase):
+    seq: int
+
+
+class CourseChangePage(SQLModel):
+    changes: List[CourseChangeRead]
+    # Pass as ``since`` to get the next page
+    next_cursor: int
+    has_more: bool
+
+
+class ChangeLogState(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Highest sequence number of a compacted tombstone; older cursors must resync
+    purged_through: int = Field(default=0)
@@ -1,6 +1,7 @@
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
 from app.enum.teacher_role_enum import TeacherRole
@@ -11,18 +12,32 @@ if TYPE_CHECKING:
 
 
 class CourseTeacherBase(SQLModel):
-    course_id: int = Field(foreign_key="course.id")
+    course_id: int = Field(foreign_key="course.id", ondelete="CASCADE")
     teacher_id: int = Field(foreign_key="user.id")
     role: TeacherRole = Field(default=TeacherRole.ASSISTANT)
     assigned_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class CourseTeacher(CourseTeacherBase, table=True):
+    __table_args__ = (
+        # A teacher's courses in course id order, straight from the index
+        Index("ix_courseteacher_teacher_course", "teacher_id", "course_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     course: Optional["Course"] = Relationship(back_populates="teachers")
     teacher: Optional["User"] = Relationship(back_populates="courses_teaching")
 
+    # Let CourseTeacherRead be built straight from an assignment with its teacher loaded
+    @property
+    def teacher_name(self) -> Optional[str]:
+        return self.teacher.full_name if self.teacher else None
+
+    @property
+    def teacher_email(self) -> Optional[str]:
+        return self.teacher.email if self.teacher else None
+
 
 class CourseTeacherCreate(SQLModel):
     teacher_id: int
@@ -36,4 +51,13 @@ class CourseTeacherRead(CourseTeacherBase):
 
 
 class CourseTeacherUpdate(SQLModel):
-    role: Optional[TeacherRole] = None
\ No newline at end of file
+    role: Optional[TeacherRole] = None
+
+
+class TeacherConflict(SQLModel):
+    """Two courses of one teacher whose dates overlap"""
+    teacher_id: int
+    course_id: int
+    conflicting_course_id: int
+    overlap_start: datetime
+    overlap_end: datetime
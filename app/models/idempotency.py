@@ -0,0 +1,16 @@
+from typing import List, Optional
+from datetime import datetime
+
+from sqlalchemy import JSON, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    # "<user>:<Idempotency-Key>"
+    key: str = Field(primary_key=True, max_length=511)
+    fingerprint: str = Field(max_length=64)
+    # None while the first request is still running
+    status_code: Optional[int] = None
+    headers: List[List[str]] = Field(default_factory=list, sa_type=JSON)
+    body: bytes = Field(default=b"", sa_type=LargeBinary)
+    expires_at: datetime = Field(index=True)
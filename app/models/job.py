@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from sqlalchemy import JSON
+from sqlmodel import Field, SQLModel
+
+from app.enum.job_status_enum import JobStatus
+
+
+class JobBase(SQLModel):
+    kind: str = Field(max_length=64)
+    params: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+
+
+class Job(JobBase, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True)
+    # 0..1, reported by the job while it runs
+    progress: float = Field(default=0.0)
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    error: Optional[str] = None
+    cancel_requested: bool = Field(default=False)
+    created_by: Optional[int] = Field(default=None, foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Touched while running; a stale heartbeat means the worker died and the job is requeued
+    heartbeat_at: Optional[datetime] = None
+
+
+class JobCreate(JobBase):
+    pass
+
+
+class JobRead(JobBase):
+    id: int
+    status: JobStatus
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_by: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,23 @@
+from typing import Dict
+
+from sqlmodel import Field, SQLModel
+
+from app.enum.course_status_enum import CourseStatus
+from app.enum.teacher_role_enum import TeacherRole
+from app.models.user import Role
+
+
+class StatCounter(SQLModel, table=True):
+    """A count kept up to date by the transactions changing it, e.g. "course.status.ACTIVE" """
+    name: str = Field(primary_key=True, max_length=64)
+    value: int = 0
+
+
+class StatsRead(SQLModel):
+    courses_by_status: Dict[CourseStatus, int]
+    users_by_role: Dict[Role, int]
+    # Teacher assignments by their role
+    teachers_by_role: Dict[TeacherRole, int]
+    total_courses: int
+    total_assignments: int
+    average_teachers_per_course: float
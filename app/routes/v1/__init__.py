@@ -1,9 +1,14 @@
-from fastapi import APIRouter
-from app.routes.v1 import auth, course, course_teacher
+from fastapi import APIRouter, Depends
+from app.core.deadline import request_deadline
+from app.routes.v1 import auth, batch, course, course_teacher, job, stats, user
 
-api_router = APIRouter(prefix="/api/v1")
+api_router = APIRouter(prefix="/api/v1", dependencies=[Depends(request_deadline)])
 
 # Include all v1 routers
 api_router.include_router(auth.router)
 api_router.include_router(course.router)
 api_router.include_router(course_teacher.router)
+api_router.include_router(user.router)
+api_router.include_router(batch.router)
+api_router.include_router(job.router)
+api_router.include_router(stats.router)
@@ -3,19 +3,29 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 
 from app.core.db import SessionDep
+from app.core.routing import SessionReleasingRoute
 from app.core.metrics import track_endpoint_metrics, auth_login_attempts, auth_registrations
+from app.core.rate_limit import RateLimit, client_ip, login_email
 from app.models.auth import Token, LoginData
 from app.models.user import UserCreate
 from app.services.auth_services import AuthService
 
 router = APIRouter(
     prefix="/auth",
-    tags=["authentication"]
+    tags=["authentication"],
+    route_class=SessionReleasingRoute,
 )
 
 
 
-@router.post("/token", response_model=Token)
+@router.post(
+    "/token",
+    response_model=Token,
+    dependencies=[
+        Depends(RateLimit("auth_ip", "RATE_LIMIT_AUTH_IP", client_ip)),
+        Depends(RateLimit("login", "RATE_LIMIT_LOGIN", login_email)),
+    ],
+)
 @track_endpoint_metrics("auth_login")
 async def login_for_access_token(
         form_data: Annotated[LoginData, Depends()],
@@ -30,7 +40,14 @@ async def login_for_access_token(
         raise
 
 
-@router.post("/token/register", response_model=Token)
+@router.post(
+    "/token/register",
+    response_model=Token,
+    dependencies=[
+        Depends(RateLimit("auth_ip", "RATE_LIMIT_AUTH_IP", client_ip)),
+        Depends(RateLimit("register", "RATE_LIMIT_REGISTER", client_ip)),
+    ],
+)
 @track_endpoint_metrics("auth_register")
 async def register_user(
         user: UserCreate,
@@ -0,0 +1,37 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request
+
+from app.core.db import LazySession, SessionDep
+from app.core.metrics import track_endpoint_metrics
+from app.core.routing import SessionReleasingRoute
+from app.models.batch import BatchRequest, BatchResponse
+from app.models.user import User
+from app.services.auth_services import AuthService
+from app.services.batch_service import BatchService
+
+router = APIRouter(
+    tags=["batch"],
+    route_class=SessionReleasingRoute,
+)
+
+
+@router.post("/batch", response_model=BatchResponse)
+@track_endpoint_metrics("batch")
+async def run_batch(
+        batch: BatchRequest,
+        request: Request,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.get_current_user)]
+) -> BatchResponse:
+    """Run several API calls in one round trip.
+
+    Each operation is authorized as the calling user and reports its own status.
+    With ``atomic`` the operations share one transaction: the first failure rolls
+    everything back and the remaining operations are skipped.
+    """
+    if isinstance(session, LazySession):
+        # The user is loaded, don't hold a connection while the operations run
+        session.release()
+    results = await BatchService.run(request, batch, current_user, session)
+    return BatchResponse(results=results)
@@ -1,37 +1,282 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select, func
-from typing import List, Annotated
-from app.core.metrics import course_operations, active_courses, track_endpoint_metrics
-from app.core.db import SessionDep
-from app.models.course import Course, CourseRead, CourseCreate
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlmodel import select
+from typing import List, Annotated, Literal, Optional, Union
+from app.core.audit import audit_log
+from app.core.broadcast import Subscription, broadcaster, format_sse
+from app.core.metrics import course_operations, track_endpoint_metrics
+from app.core.db import SessionDep, ReadSessionDep
+from app.core.routing import SessionReleasingRoute
+from app.core.rate_limit import RateLimit, token_subject
+from app.core.replicas import READ_YOUR_WRITES_COOKIE
+from app.config.config import settings
+from app.models.course import (
+    Course, CourseRead, CourseCreate, CourseReadWithTeachers, CourseBatchRequest, CourseBulkDeleteResult,
+    CourseSearchPage, CourseClone, CourseBulkClone
+)
+from app.models.course_change import CourseChangePage
+from app.models.course_teacher import TeacherConflict
 from app.models.user import User
 from app.services.auth_services import AuthService
+from app.services.catalog_service import CATALOG, CATALOG_WITH_TEACHERS, catalog_snapshot
+from app.services.change_log_service import ChangeLogService
+from app.services.course_archive_service import CourseArchiveService
+from app.services.course_search_service import CourseSearchService
+from app.services.stats_service import StatsService, course_status
+from app.services.course_teacher_service import CourseTeacherService
+from app.services.course_service import CourseService, COURSE_FIELDS, LIVE_COURSES, TEACHERS_LOADER
 
 router = APIRouter(
     prefix="/courses",
-    tags=["courses"]
+    tags=["courses"],
+    route_class=SessionReleasingRoute,
 )
 
+write_rate_limit = Depends(RateLimit("write", "RATE_LIMIT_WRITE", token_subject))
+
+CourseInclude = Optional[Literal["teachers"]]
+CourseFields = Annotated[
+    Optional[str],
+    Query(description=f"Comma separated subset of: {', '.join(COURSE_FIELDS.all())}")
+]
+
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+def _read_model(include: CourseInclude) -> type[CourseRead]:
+    return CourseReadWithTeachers if include == "teachers" else CourseRead
+
+
+def _courses_by_ids(
+        session: ReadSessionDep,
+        response: Response,
+        ids: List[int],
+        include: CourseInclude,
+        fields: Optional[str]
+):
+    selected = COURSE_FIELDS.parse(fields)
+    courses, missing = CourseService.get_courses_by_ids(session, ids, include == "teachers", selected)
+    headers = {MISSING_IDS_HEADER: ",".join(map(str, missing))} if missing else {}
+    course_operations.labels(operation='batch_get', status='success').inc()
+
+    if selected is not None:
+        return JSONResponse(jsonable_encoder(courses), headers=headers)
+    response.headers.update(headers)
+    read_model = _read_model(include)
+    return [read_model.model_validate(course) for course in courses]
+
+
+def _catalog_response(request: Request, include: CourseInclude) -> Optional[Response]:
+    """The unfiltered list from the catalog snapshot, None when it has to come from the database"""
+    if (
+            getattr(request.state, "batch_user", None) is not None
+            # Recent writers may not be in the snapshot yet
+            or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    ):
+        return None
+    return catalog_snapshot.response(CATALOG_WITH_TEACHERS if include == "teachers" else CATALOG, request)
 
 
-@router.get("/", response_model=List[CourseRead])
+@router.get("/", response_model=List[Union[CourseReadWithTeachers, CourseRead]])
 @track_endpoint_metrics("courses_list")
-def list_courses(session: SessionDep) -> List[Course]:
+def list_courses(
+        request: Request,
+        session: ReadSessionDep,
+        response: Response,
+        include: CourseInclude = None,
+        fields: CourseFields = None,
+        ids: Annotated[
+            Optional[str],
+            Query(description=f"Comma separated course ids to fetch in request order, missing ids "
+                              f"are listed in the {MISSING_IDS_HEADER} header")
+        ] = None,
+        include_archived: Annotated[
+            bool,
+            Query(description="Also list archived courses, including those moved to archival storage")
+        ] = False
+) -> List[CourseRead]:
     try:
-        courses = session.exec(select(Course)).all()
-        course_operations.labels(operation='list', status='success').inc()
+        if ids is not None:
+            return _courses_by_ids(session, response, CourseService.parse_ids(ids), include, fields)
+
+        if fields is None and not include_archived:
+            snapshot = _catalog_response(request, include)
+            if snapshot is not None:
+                course_operations.labels(operation='list', status='success').inc()
+                return snapshot
+
+        selected = COURSE_FIELDS.parse(fields)
+        if selected is not None:
+            courses = CourseService.get_course_fields(
+                session, selected, include == "teachers", where=None if include_archived else LIVE_COURSES
+            )
+            if include_archived:
+                archived = CourseArchiveService.get_archived_courses(session, include_teachers=include == "teachers")
+                courses += CourseArchiveService.as_fields(archived, selected)
+            course_operations.labels(operation='list', status='success').inc()
+            return JSONResponse(jsonable_encoder(courses))
 
-        # Update active courses gauge
-        count = session.exec(select(func.count(Course.id))).one()
-        active_courses.set(count)
+        statement = select(Course)
+        if not include_archived:
+            statement = statement.where(LIVE_COURSES)
+        if include == "teachers":
+            statement = statement.options(TEACHERS_LOADER)
+        courses = session.exec(statement).all()
+        course_operations.labels(operation='list', status='success').inc()
 
+        read_model = _read_model(include)
+        courses = [read_model.model_validate(course) for course in courses]
+        if include_archived:
+            courses += CourseArchiveService.get_archived_courses(session, include_teachers=include == "teachers")
         return courses
     except Exception as e:
         course_operations.labels(operation='list', status='failed').inc()
         raise
 
 
-@router.post("/", response_model=CourseRead)
+@router.post("/batch", response_model=List[Union[CourseReadWithTeachers, CourseRead]])
+@track_endpoint_metrics("courses_batch_get")
+def batch_get_courses(
+        batch: CourseBatchRequest,
+        session: ReadSessionDep,
+        response: Response,
+        include: CourseInclude = None,
+        fields: CourseFields = None
+) -> List[CourseRead]:
+    """Same as GET /courses/?ids=..., for id lists too long for a query string"""
+    try:
+        return _courses_by_ids(session, response, batch.ids, include, fields)
+    except Exception as e:
+        course_operations.labels(operation='batch_get', status='failed').inc()
+        raise
+
+
+@router.get("/search", response_model=CourseSearchPage)
+@track_endpoint_metrics("courses_search")
+def search_courses(
+        session: ReadSessionDep,
+        q: Annotated[str, Query(min_length=1, max_length=200, description="Words to find in titles and "
+                                                                           "descriptions, the last one may be "
+                                                                           "incomplete")],
+        limit: Annotated[int, Query(ge=1, le=settings.SEARCH_MAX_LIMIT)] = 20,
+        offset: Annotated[int, Query(ge=0, le=settings.SEARCH_MAX_OFFSET)] = 0
+) -> CourseSearchPage:
+    """Full-text course search, best matches first"""
+    try:
+        page = CourseSearchService.search(session, q, limit, offset)
+        course_operations.labels(operation='search', status='success').inc()
+        return page
+    except Exception as e:
+        course_operations.labels(operation='search', status='failed').inc()
+        raise
+
+
+@router.get("/conflicts", response_model=List[TeacherConflict])
+@track_endpoint_metrics("courses_conflicts")
+def list_teacher_conflicts(
+        session: ReadSessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> List[TeacherConflict]:
+    """Every pair of overlapping courses taught by the same teacher"""
+    try:
+        conflicts = CourseTeacherService.find_all_conflicts(session)
+        course_operations.labels(operation='conflicts', status='success').inc()
+        return conflicts
+    except Exception as e:
+        course_operations.labels(operation='conflicts', status='failed').inc()
+        raise
+
+
+@router.get("/changes", response_model=CourseChangePage)
+@track_endpoint_metrics("courses_changes")
+def list_course_changes(
+        session: ReadSessionDep,
+        since: Annotated[int, Query(ge=0, description="next_cursor of the previous page, 0 for a full sync")] = 0,
+        limit: Annotated[int, Query(ge=1, le=settings.CHANGE_FEED_MAX_LIMIT)] = 100
+) -> CourseChangePage:
+    """Course and teacher assignment changes since a cursor, for mirrors syncing incrementally"""
+    try:
+        page = ChangeLogService.get_changes(session, since, limit)
+        course_operations.labels(operation='changes', status='success').inc()
+        return page
+    except HTTPException:
+        raise
+    except Exception as e:
+        course_operations.labels(operation='changes', status='failed').inc()
+        raise
+
+
+async def _course_event_stream(subscription: Subscription, backlog: List[dict], resync_cursor: Optional[int]):
+    try:
+        last_seq = 0
+        for event in backlog:
+            yield format_sse(event, event="change", event_id=event["seq"])
+            last_seq = event["seq"]
+        if resync_cursor is not None:
+            # Too far behind to replay, the client should page through /courses/changes
+            yield format_sse({"next_cursor": resync_cursor}, event="resync")
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is None:
+                yield format_sse({"detail": "Client fell behind, reconnect with Last-Event-ID"}, event="dropped")
+                return
+            # Already sent while replaying
+            if event["seq"] <= last_seq:
+                continue
+            yield format_sse(event, event="change", event_id=event["seq"])
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/events")
+@track_endpoint_metrics("courses_events")
+async def stream_course_events(
+        session: SessionDep,
+        course_id: Optional[int] = None,
+        last_event_id: Annotated[Optional[int], Header()] = None
+) -> StreamingResponse:
+    """Server-sent course and teacher assignment changes.
+
+    Reconnecting clients send Last-Event-ID and get the changes they missed first.
+    """
+    subscription = broadcaster.subscribe(course_id)
+    if subscription is None:
+        course_operations.labels(operation='events', status='rejected').inc()
+        raise HTTPException(status_code=503, detail="Too many open event streams")
+
+    try:
+        backlog, resync_cursor = [], None
+        # Subscribed first, so nothing committed during the replay is missed
+        if last_event_id is not None:
+            page = await run_in_threadpool(
+                ChangeLogService.get_changes, session, last_event_id, settings.SSE_REPLAY_LIMIT, course_id
+            )
+            backlog = [change.model_dump(mode="json") for change in page.changes]
+            if page.has_more:
+                resync_cursor = page.next_cursor
+    except Exception:
+        broadcaster.unsubscribe(subscription)
+        raise
+
+    course_operations.labels(operation='events', status='success').inc()
+    return StreamingResponse(
+        _course_event_stream(subscription, backlog, resync_cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/", response_model=CourseRead, dependencies=[write_rate_limit])
 @track_endpoint_metrics("courses_create")
 def create_course(
         course_in: CourseCreate,
@@ -41,11 +286,13 @@ def create_course(
     try:
         course = Course(**course_in.model_dump())
         session.add(course)
+        StatsService.adjust(session, {course_status(course.status): 1})
         session.commit()
         session.refresh(course)
 
         course_operations.labels(operation='create', status='success').inc()
-        active_courses.inc()
+        audit_log.record(current_user, "course.create", "course", course.id, course.id,
+                         details=course_in.model_dump(), session=session)
 
         return course
     except Exception as e:
@@ -53,7 +300,75 @@ def create_course(
         raise
 
 
-@router.delete("/{course_id}")
+@router.post("/clone", response_model=List[CourseRead], status_code=201, dependencies=[write_rate_limit])
+@track_endpoint_metrics("courses_bulk_clone")
+def bulk_clone_courses(
+        clone: CourseBulkClone,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> List[Course]:
+    """Clone every course with a status, e.g. to roll a term over"""
+    try:
+        courses = CourseService.clone_courses(session, Course.status == clone.source_status, clone)
+        course_operations.labels(operation='clone', status='success').inc(len(courses))
+        for course in courses:
+            audit_log.record(current_user, "course.clone", "course", course.id, course.id,
+                             details={"cloned_from_id": course.cloned_from_id}, session=session)
+        return courses
+    except Exception as e:
+        course_operations.labels(operation='clone', status='failed').inc()
+        raise
+
+
+@router.post("/{course_id}/clone", response_model=CourseRead, status_code=201, dependencies=[write_rate_limit])
+@track_endpoint_metrics("courses_clone")
+def clone_course(
+        course_id: int,
+        clone: CourseClone,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> Course:
+    """Copy a course and its teacher line-up"""
+    try:
+        courses = CourseService.clone_courses(session, Course.id == course_id, clone, clone.title)
+        if not courses:
+            course_operations.labels(operation='clone', status='not_found').inc()
+            raise HTTPException(status_code=404, detail="Course not found")
+
+        course_operations.labels(operation='clone', status='success').inc()
+        audit_log.record(current_user, "course.clone", "course", courses[0].id, courses[0].id,
+                         details={"cloned_from_id": course_id}, session=session)
+        return courses[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        course_operations.labels(operation='clone', status='failed').inc()
+        raise
+
+
+@router.post("/bulk-delete", response_model=CourseBulkDeleteResult, dependencies=[write_rate_limit])
+@track_endpoint_metrics("courses_bulk_delete")
+def bulk_delete_courses(
+        batch: CourseBatchRequest,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> CourseBulkDeleteResult:
+    """Delete many courses with their teacher assignments, all or nothing"""
+    try:
+        deleted, missing = CourseService.delete_courses(session, batch.ids)
+        course_operations.labels(operation='bulk_delete', status='success').inc()
+        for course_id, title in deleted.items():
+            audit_log.record(current_user, "course.delete", "course", course_id, course_id,
+                             details={"title": title}, session=session)
+        return CourseBulkDeleteResult(deleted=list(deleted), missing=missing)
+    except HTTPException:
+        raise
+    except Exception as e:
+        course_operations.labels(operation='bulk_delete', status='failed').inc()
+        raise
+
+
+@router.delete("/{course_id}", dependencies=[write_rate_limit])
 @track_endpoint_metrics("courses_delete")
 def delete_course(
         course_id: int,
@@ -61,16 +376,14 @@ def delete_course(
         current_user: Annotated[User, Depends(AuthService.require_admin)]
 ):
     try:
-        course = session.get(Course, course_id)
-        if not course:
+        deleted, _ = CourseService.delete_courses(session, [course_id])
+        if not deleted:
             course_operations.labels(operation='delete', status='not_found').inc()
             raise HTTPException(status_code=404, detail="Course not found")
 
-        session.delete(course)
-        session.commit()
-
         course_operations.labels(operation='delete', status='success').inc()
-        active_courses.dec()
+        audit_log.record(current_user, "course.delete", "course", course_id, course_id,
+                         details={"title": deleted[course_id]}, session=session)
 
         return {"ok": True}
     except HTTPException:
@@ -80,20 +393,42 @@ def delete_course(
         raise
 
 
-@router.get("/{course_id}", response_model=CourseRead)
+@router.get("/{course_id}", response_model=Union[CourseReadWithTeachers, CourseRead])
 @track_endpoint_metrics("courses_get")
 def get_course(
         course_id: int,
-        session: SessionDep
-) -> Course:
+        session: ReadSessionDep,
+        include: CourseInclude = None,
+        fields: CourseFields = None
+) -> CourseRead:
     try:
-        course = session.get(Course, course_id)
+        selected = COURSE_FIELDS.parse(fields)
+        if selected is not None:
+            courses = CourseService.get_course_fields(
+                session, selected, include == "teachers", where=Course.id == course_id
+            )
+            if not courses:
+                # Moved to archival storage?
+                archived = CourseArchiveService.get_archived_courses(session, [course_id], include == "teachers")
+                courses = CourseArchiveService.as_fields(archived, selected)
+            if not courses:
+                course_operations.labels(operation='get', status='not_found').inc()
+                raise HTTPException(status_code=404, detail="Course not found")
+            course_operations.labels(operation='get', status='success').inc()
+            return JSONResponse(jsonable_encoder(courses[0]))
+
+        options = [TEACHERS_LOADER] if include == "teachers" else []
+        course = session.get(Course, course_id, options=options)
         if not course:
+            archived = CourseArchiveService.get_archived_courses(session, [course_id], include == "teachers")
+            if archived:
+                course_operations.labels(operation='get', status='success').inc()
+                return archived[0]
             course_operations.labels(operation='get', status='not_found').inc()
             raise HTTPException(status_code=404, detail="Course not found")
 
         course_operations.labels(operation='get', status='success').inc()
-        return course
+        return _read_model(include).model_validate(course)
     except HTTPException:
         raise
     except Exception as e:
@@ -101,7 +436,7 @@ def get_course(
         raise
 
 
-@router.patch("/{course_id}", response_model=CourseRead)
+@router.patch("/{course_id}", response_model=CourseRead, dependencies=[write_rate_limit])
 @track_endpoint_metrics("courses_update")
 def update_course(
         course_id: int,
@@ -115,15 +450,20 @@ def update_course(
             course_operations.labels(operation='update', status='not_found').inc()
             raise HTTPException(status_code=404, detail="Course not found")
 
+        old_status = course.status
         update_data = course_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(course, field, value)
 
         session.add(course)
+        if course.status != old_status:
+            StatsService.adjust(session, {course_status(old_status): -1, course_status(course.status): 1})
         session.commit()
         session.refresh(course)
 
         course_operations.labels(operation='update', status='success').inc()
+        audit_log.record(current_user, "course.update", "course", course.id, course.id,
+                         details=update_data, session=session)
         return course
     except HTTPException:
         raise
@@ -1,7 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.core.db import SessionDep
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.audit import audit_log
+from app.core.db import SessionDep, ReadSessionDep
+from app.core.routing import SessionReleasingRoute
+from app.core.rate_limit import RateLimit, token_subject
+from app.models.course import Course
 from app.models.user import User
 from app.models.course_teacher import (
     CourseTeacherCreate,
@@ -11,24 +17,38 @@ from app.models.course_teacher import (
 
 from app.core.metrics import teacher_assignments, teachers_per_course, track_endpoint_metrics
 from app.services.auth_services import AuthService
-from app.services.course_teacher_service import CourseTeacherService
+from app.services.course_teacher_service import CourseTeacherService, COURSE_TEACHER_FIELDS
 
 router = APIRouter(
     prefix="/courses/{course_id}/teachers",
-    tags=["course-teachers"]
+    tags=["course-teachers"],
+    route_class=SessionReleasingRoute,
 )
 
+write_rate_limit = Depends(RateLimit("write", "RATE_LIMIT_WRITE", token_subject))
+
+SCHEDULE_CONFLICTS_HEADER = "X-Schedule-Conflicts"
+
 
 @router.get("/", response_model=List[CourseTeacherRead])
 @track_endpoint_metrics("course_teacher_list")
 def get_course_teachers(
         course_id: int,
-        session: SessionDep
+        session: ReadSessionDep,
+        fields: Annotated[
+            Optional[str],
+            Query(description=f"Comma separated subset of: {', '.join(COURSE_TEACHER_FIELDS.all())}")
+        ] = None
 ) -> List[CourseTeacherRead]:
     """
     Get all teachers assigned to a course.
     Public endpoint - no authentication required.
     """
+    selected = COURSE_TEACHER_FIELDS.parse(fields)
+    if selected is not None:
+        rows = CourseTeacherService.get_course_teacher_fields(session, course_id, selected)
+        return JSONResponse(jsonable_encoder(rows))
+
     assignments = CourseTeacherService.get_course_teachers(session, course_id)
 
     result = []
@@ -46,24 +66,35 @@ def get_course_teachers(
 
     return result
 
-@router.post("/", response_model=CourseTeacherRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=CourseTeacherRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[write_rate_limit],
+)
 @track_endpoint_metrics("course_teacher_assign")
 def assign_teacher_to_course(
         course_id: int,
         teacher_data: CourseTeacherCreate,
         session: SessionDep,
+        response: Response,
         current_user: User = Depends(AuthService.require_admin)
 ) -> CourseTeacherRead:
     try:
-        assignment = CourseTeacherService.assign_teacher(
+        assignment, conflicts = CourseTeacherService.assign_teacher(
             session, course_id, teacher_data, current_user
         )
+        if conflicts:
+            # Only reported under the "warn" overlap policy
+            response.headers[SCHEDULE_CONFLICTS_HEADER] = ",".join(map(str, conflicts))
 
         teacher_assignments.labels(operation='assign', status='success').inc()
+        audit_log.record(current_user, "course_teacher.assign", "course_teacher", assignment.id, course_id,
+                         details={"teacher_id": assignment.teacher_id, "role": assignment.role}, session=session)
 
         # Track teachers per course
-        teacher_count = len(CourseTeacherService.get_course_teachers(session, course_id))
-        teachers_per_course.observe(teacher_count)
+        course = session.get(Course, course_id)
+        teachers_per_course.observe(course.teacher_count)
 
         teacher = session.get(User, assignment.teacher_id)
         result = CourseTeacherRead(
@@ -81,7 +112,7 @@ def assign_teacher_to_course(
         raise
 
 
-@router.delete("/{teacher_id}")
+@router.delete("/{teacher_id}", dependencies=[write_rate_limit])
 @track_endpoint_metrics("course_teacher_remove")
 def remove_teacher_from_course(
         course_id: int,
@@ -94,13 +125,15 @@ def remove_teacher_from_course(
             session, course_id, teacher_id, current_user
         )
         teacher_assignments.labels(operation='remove', status='success').inc()
+        audit_log.record(current_user, "course_teacher.remove", "course_teacher", None, course_id,
+                         details={"teacher_id": teacher_id}, session=session)
         return result
     except Exception as e:
         teacher_assignments.labels(operation='remove', status='failed').inc()
         raise
 
 
-@router.patch("/{teacher_id}", response_model=CourseTeacherRead)
+@router.patch("/{teacher_id}", response_model=CourseTeacherRead, dependencies=[write_rate_limit])
 @track_endpoint_metrics("course_teacher_update")
 def update_teacher_role(
         course_id: int,
@@ -121,6 +154,8 @@ def update_teacher_role(
         )
 
         teacher_assignments.labels(operation='update', status='success').inc()
+        audit_log.record(current_user, "course_teacher.update", "course_teacher", assignment.id, course_id,
+                         details={"teacher_id": teacher_id, "role": assignment.role}, session=session)
 
         teacher = session.get(User, assignment.teacher_id)
         return CourseTeacherRead(
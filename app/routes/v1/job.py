@@ -0,0 +1,52 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response, status
+
+from app.config.config import settings
+from app.core.db import SessionDep
+from app.core.metrics import track_endpoint_metrics
+from app.core.routing import SessionReleasingRoute
+from app.models.job import Job, JobCreate, JobRead
+from app.models.user import User
+from app.services.auth_services import AuthService
+from app.services.job_service import JobService
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    route_class=SessionReleasingRoute,
+)
+
+
+@router.post("/", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+@track_endpoint_metrics("jobs_submit")
+def submit_job(
+        job_in: JobCreate,
+        response: Response,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> Job:
+    """Start a long running admin operation, poll the returned job for its outcome"""
+    job = JobService.submit_job(session, job_in, current_user)
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/{job.id}"
+    return job
+
+
+@router.get("/{job_id}", response_model=JobRead)
+@track_endpoint_metrics("jobs_get")
+def get_job(
+        job_id: int,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> Job:
+    return JobService.get_job(session, job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=JobRead)
+@track_endpoint_metrics("jobs_cancel")
+def cancel_job(
+        job_id: int,
+        session: SessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> Job:
+    return JobService.cancel_job(session, job_id)
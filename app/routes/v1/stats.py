@@ -0,0 +1,27 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.core.db import ReadSessionDep
+from app.core.metrics import track_endpoint_metrics
+from app.core.routing import SessionReleasingRoute
+from app.models.stats import StatsRead
+from app.models.user import User
+from app.services.auth_services import AuthService
+from app.services.stats_service import StatsService
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+    route_class=SessionReleasingRoute,
+)
+
+
+@router.get("/", response_model=StatsRead)
+@track_endpoint_metrics("stats_get")
+def get_stats(
+        session: ReadSessionDep,
+        current_user: Annotated[User, Depends(AuthService.require_admin)]
+) -> StatsRead:
+    """Course, user and assignment counts, read from counters kept up to date on every change"""
+    return StatsService.get_stats(session)
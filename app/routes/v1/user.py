@@ -0,0 +1,63 @@
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query
+
+from app.config.config import settings
+from app.core.db import ReadSessionDep
+from app.core.routing import SessionReleasingRoute
+from app.core.metrics import teacher_assignments, track_endpoint_metrics
+from app.enum.course_status_enum import CourseStatus
+from app.enum.teacher_role_enum import TeacherRole
+from app.models.course import TeacherCoursePage
+from app.models.user import User
+from app.services.auth_services import AuthService
+from app.services.course_teacher_service import CourseTeacherService
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    route_class=SessionReleasingRoute,
+)
+
+After = Annotated[int, Query(ge=0, description="next_cursor of the previous page")]
+Limit = Annotated[int, Query(ge=1, le=settings.TEACHER_COURSES_MAX_LIMIT)]
+
+
+def _teacher_courses(session, teacher_id, limit, after, role, course_status) -> TeacherCoursePage:
+    try:
+        page = CourseTeacherService.get_teacher_courses(session, teacher_id, limit, after, role, course_status)
+        teacher_assignments.labels(operation='list_by_teacher', status='success').inc()
+        return page
+    except Exception as e:
+        teacher_assignments.labels(operation='list_by_teacher', status='failed').inc()
+        raise
+
+
+@router.get("/me/courses", response_model=TeacherCoursePage)
+@track_endpoint_metrics("user_courses_me")
+def get_my_courses(
+        session: ReadSessionDep,
+        current_user: Annotated[User, Depends(AuthService.get_current_user)],
+        after: After = 0,
+        limit: Limit = 50,
+        role: Optional[TeacherRole] = None,
+        status: Optional[CourseStatus] = None
+) -> TeacherCoursePage:
+    """Courses the current user teaches"""
+    return _teacher_courses(session, current_user.id, limit, after, role, status)
+
+
+@router.get("/{user_id}/courses", response_model=TeacherCoursePage)
+@track_endpoint_metrics("user_courses")
+def get_user_courses(
+        user_id: int,
+        session: ReadSessionDep,
+        after: After = 0,
+        limit: Limit = 50,
+        role: Optional[TeacherRole] = None,
+        status: Optional[CourseStatus] = None
+) -> TeacherCoursePage:
+    """
+    Courses a user teaches, ordered by course id.
+    Public endpoint - no authentication required.
+    """
+    return _teacher_courses(session, user_id, limit, after, role, status)
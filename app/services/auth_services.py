@@ -3,7 +3,7 @@ from datetime import timedelta, datetime, timezone
 import jwt
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlmodel import Session, select
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 
 from app.config.config import settings
 from app.core.db import SessionDep
@@ -59,23 +59,33 @@ class AuthService:
         new_user = UserService.create_user(session, user_create)
         return _generate_token(new_user)
 
+    @staticmethod
+    def decode_token_subject(token: str) -> str | None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        except jwt.PyJWTError:
+            return None
+        return payload.get("sub")
+
     @staticmethod
     def get_current_user(
+            request: Request,
             session: SessionDep,
             credentials: HTTPAuthorizationCredentials = Depends(security),
     ) -> User:
+        # Sub-requests of a batch reuse the user the batch already authenticated
+        batch_user = getattr(request.state, "batch_user", None)
+        if batch_user is not None:
+            return batch_user
+
         token = credentials.credentials
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            email: str = payload.get("sub")
-            if email is None:
-                raise credentials_exception
-        except jwt.PyJWTError:
+        email = AuthService.decode_token_subject(token)
+        if email is None:
             raise credentials_exception
         user = AuthService.get_user(session, email)
         if user is None:
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session
+
+from app.config.config import settings
+from app.core.db import SharedSession
+from app.core.metrics import batch_operations
+from app.core.replicas import READ_YOUR_WRITES_COOKIE, SAFE_METHODS
+from app.models.batch import BatchOperation, BatchOperationResult, BatchRequest
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = "/batch"
+# Endpoints that stream until the client disconnects, which an in-process call never does
+STREAMING_PATHS = {"/courses/events"}
+# Describe the batch body, not the sub-request's
+SKIPPED_HEADERS = {b"content-length", b"content-type", b"cookie"}
+
+
+class BatchService:
+
+    @staticmethod
+    async def run(
+            request: Request,
+            batch: BatchRequest,
+            user: User,
+            session: Session
+    ) -> List[BatchOperationResult]:
+        """Run every operation through the app's router, in order, without leaving the process"""
+        if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations can be batched"
+            )
+        for operation in batch.operations:
+            BatchService._validate_path(operation.path)
+
+        shared = SharedSession(session.get_bind()) if batch.atomic else None
+        results: List[BatchOperationResult] = []
+        failed = False
+        wrote = False
+        try:
+            for operation in batch.operations:
+                if failed:
+                    batch_operations.labels(method=operation.method, outcome='skipped').inc()
+                    results.append(BatchOperationResult(
+                        status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                        body={"detail": "Not executed, an earlier operation failed"}
+                    ))
+                    continue
+
+                state: Dict[str, Any] = {"batch_user": user}
+                if shared is not None:
+                    state["batch_session"] = shared
+                result = await BatchService._dispatch(request, operation, state, wrote)
+                results.append(result)
+
+                succeeded = result.status_code < 400
+                batch_operations.labels(
+                    method=operation.method, outcome='success' if succeeded else 'failed'
+                ).inc()
+                wrote = wrote or (succeeded and operation.method not in SAFE_METHODS)
+                failed = shared is not None and not succeeded
+
+            if shared is not None:
+                await run_in_threadpool(shared.finish, not failed)
+        finally:
+            if shared is not None:
+                await run_in_threadpool(shared.close)
+
+        return results
+
+    @staticmethod
+    def _validate_path(path: str) -> None:
+        route_path = path.partition("?")[0]
+        if not route_path.startswith("/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operation path must start with '/': {path}"
+            )
+        if route_path.rstrip("/") == BATCH_PATH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batches cannot be nested"
+            )
+        if route_path.rstrip("/") in STREAMING_PATHS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Streaming endpoints cannot be batched: {route_path}"
+            )
+
+    @staticmethod
+    async def _dispatch(
+            request: Request,
+            operation: BatchOperation,
+            state: Dict[str, Any],
+            wrote: bool
+    ) -> BatchOperationResult:
+        route_path, _, query_string = operation.path.partition("?")
+        if operation.query:
+            extra = urlencode(operation.query, doseq=True)
+            query_string = f"{query_string}&{extra}" if query_string else extra
+        path = f"{settings.API_V1_STR}{route_path}"
+
+        body = b""
+        headers = [(name, value) for name, value in request.scope["headers"] if name not in SKIPPED_HEADERS]
+        if operation.body is not None:
+            body = json.dumps(jsonable_encoder(operation.body)).encode()
+            headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode()))
+
+        # Later reads in the batch must see what earlier operations wrote
+        cookies = [f"{name}={value}" for name, value in request.cookies.items()]
+        if wrote:
+            cookies.append(f"{READ_YOUR_WRITES_COOKIE}=1")
+        if cookies:
+            headers.append((b"cookie", "; ".join(cookies).encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": request.scope.get("asgi", {"version": "3.0"}),
+            "http_version": request.scope.get("http_version", "1.1"),
+            "method": operation.method,
+            "scheme": request.scope.get("scheme", "http"),
+            "server": request.scope.get("server"),
+            "client": request.scope.get("client"),
+            "root_path": request.scope.get("root_path", ""),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "headers": headers,
+            "app": request.app,
+            "state": state,
+        }
+        # Let HTTPExceptions become responses the same way they do for real requests
+        if "starlette.exception_handlers" in request.scope:
+            scope["starlette.exception_handlers"] = request.scope["starlette.exception_handlers"]
+
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # The client never disconnects from an in-process call
+            await asyncio.Event().wait()
+
+        response: Dict[str, Any] = {"status": 500, "headers": [], "body": b""}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+
+        try:
+            # Own task, so the deadline a sub-request starts does not leak into the next one
+            await asyncio.create_task(request.app.router(scope, receive, send))
+        except Exception:
+            logger.exception("Batch operation %s %s failed", operation.method, path)
+            return BatchOperationResult(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                body={"detail": "Internal Server Error"}
+            )
+
+        return BatchService._result(response)
+
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> BatchOperationResult:
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in response["headers"]
+            if name.lower() not in (b"content-length", b"content-type")
+        }
+        content_types = [value for name, value in response["headers"] if name.lower() == b"content-type"]
+
+        body = response["body"] or None
+        if body is not None:
+            if content_types and content_types[0].startswith(b"application/json"):
+                body = json.loads(body)
+            else:
+                body = body.decode("utf-8", errors="replace")
+
+        return BatchOperationResult(status_code=response["status"], headers=headers, body=body)
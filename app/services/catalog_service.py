@@ -0,0 +1,52 @@
+from typing import Dict, List
+
+from pydantic import TypeAdapter
+from sqlmodel import Session, select
+
+from app.config.config import settings
+from app.core.db import engine
+from app.core.events import event_bus
+from app.core.snapshot import FileSnapshot
+from app.models.course import Course, CourseRead, CourseReadWithTeachers
+from app.services.change_log_service import COURSE_CHANGED
+from app.services.course_service import LIVE_COURSES, TEACHERS_LOADER
+
+# Snapshot documents, by the course list's include parameter
+CATALOG = "courses"
+CATALOG_WITH_TEACHERS = "teachers"
+
+_courses = TypeAdapter(List[CourseRead])
+_courses_with_teachers = TypeAdapter(List[CourseReadWithTeachers])
+
+
+class CatalogService:
+
+    @staticmethod
+    def render(session: Session) -> Dict[str, bytes]:
+        """The public course list as JSON, with and without teachers, from one query"""
+        courses = session.exec(
+            select(Course).where(LIVE_COURSES).options(TEACHERS_LOADER).order_by(Course.id)
+        ).all()
+        with_teachers = [CourseReadWithTeachers.model_validate(course) for course in courses]
+        return {
+            CATALOG: _courses.dump_json([CourseRead.model_validate(course) for course in courses]),
+            CATALOG_WITH_TEACHERS: _courses_with_teachers.dump_json(with_teachers),
+        }
+
+
+def render_catalog() -> Dict[str, bytes]:
+    with Session(engine) as session:
+        return CatalogService.render(session)
+
+
+catalog_snapshot = FileSnapshot(
+    "catalog",
+    settings.CATALOG_SNAPSHOT_DIR,
+    render_catalog,
+    debounce=settings.CATALOG_SNAPSHOT_DEBOUNCE_SECONDS,
+    max_delay=settings.CATALOG_SNAPSHOT_MAX_DELAY_SECONDS,
+    max_age=settings.CATALOG_SNAPSHOT_MAX_AGE_SECONDS,
+)
+
+# Every worker hears every change and rebuilds its own snapshot
+event_bus.subscribe(COURSE_CHANGED, lambda payload: catalog_snapshot.invalidate())
@@ -0,0 +1,234 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select, delete, func
+
+from app.config.config import settings
+from app.core.broadcast import broadcaster
+from app.core.db import engine
+from app.core.events import event_bus
+from app.core.metrics import active_courses, change_log_compacted
+from app.enum.change_operation_enum import ChangeOperation
+from app.models.course import Course
+from app.models.course_change import ChangeLogState, CourseChange, CourseChangePage, CourseChangeRead
+from app.models.course_teacher import CourseTeacher
+
+logger = logging.getLogger(__name__)
+
+TRACKED_ENTITIES = {Course: "course", CourseTeacher: "course_teacher"}
+MODELS = {name: model for model, name in TRACKED_ENTITIES.items()}
+
+# Serializes change log appends on Postgres, so sequence numbers become visible in order
+CHANGE_LOG_LOCK_KEY = 72_616_465
+
+# Event bus topic, payload is a CourseChangeRead plus whether the row was created
+COURSE_CHANGED = "course.changed"
+
+_PENDING = "change_log_pending"
+_WRITTEN = "change_log_written"
+
+
+def _pending(session: ORMSession) -> Dict[Tuple[str, int], Tuple[int, bool, bool]]:
+    """(entity, id) -> (course id, created, deleted) for rows changed in the current transaction."""
+    return session.info.setdefault(_PENDING, {})
+
+
+def _course_id(obj) -> int:
+    return obj.id if isinstance(obj, Course) else obj.course_id
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _collect_changes(session, flush_context) -> None:
+    # new, dirty and deleted still describe the flush that just ran
+    pending = None
+    for obj in session.new | session.dirty | session.deleted:
+        entity = TRACKED_ENTITIES.get(type(obj))
+        if entity is None:
+            continue
+        deleted = obj in session.deleted
+        if not deleted and obj not in session.new and not session.is_modified(obj):
+            continue
+        if pending is None:
+            pending = _pending(session)
+        created = obj in session.new or pending.get((entity, obj.id), (None, False))[1]
+        pending[(entity, obj.id)] = (_course_id(obj), created, deleted)
+
+
+@event.listens_for(ORMSession, "before_commit")
+def _write_changes(session) -> None:
+    """Append the transaction's changes to the log just before it commits."""
+    # Runs ahead of the commit's own flush; flushing here collects what is still pending
+    session.flush()
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK_KEY})
+
+    changes = []
+    for (entity, entity_id), (course_id, created, deleted) in pending.items():
+        data = None
+        if not deleted:
+            obj = session.get(MODELS[entity], entity_id)
+            if obj is None:
+                continue
+            data = jsonable_encoder(
+                {column.key: getattr(obj, column.key) for column in inspect(obj).mapper.column_attrs}
+            )
+        change = CourseChange(
+            entity=entity,
+            entity_id=entity_id,
+            course_id=course_id,
+            operation=ChangeOperation.DELETE if deleted else ChangeOperation.UPSERT,
+            data=data,
+        )
+        session.add(change)
+        changes.append((change, created))
+
+    # Assigns the sequence numbers
+    session.flush()
+    payloads = [
+        {**CourseChangeRead.model_validate(change).model_dump(mode="json"), "created": created}
+        for change, created in changes
+    ]
+    if event_bus.transactional:
+        # Sent with the commit, on the connection the transaction already holds
+        connection = session.connection()
+        for payload in payloads:
+            event_bus.publish_in_transaction(connection, COURSE_CHANGED, payload)
+    else:
+        # Published once the commit succeeds
+        session.info[_WRITTEN] = payloads
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _publish_changes(session) -> None:
+    for payload in session.info.pop(_WRITTEN, ()):
+        try:
+            event_bus.publish(COURSE_CHANGED, payload)
+        except Exception:
+            # The changes are committed and in the log, subscribers can catch up from there
+            logger.exception("Publishing course change %s failed", payload["seq"])
+
+
+@event.listens_for(ORMSession, "after_transaction_end")
+def _discard_changes(session, transaction) -> None:
+    # Rolled back or closed without commit
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+        session.info.pop(_WRITTEN, None)
+
+
+def _track_active_courses(payload: dict) -> None:
+    # Every worker sees every create and delete, so each keeps the global count
+    if payload["entity"] != "course" or payload["created"] == (payload["operation"] == "delete"):
+        return
+    if payload["created"]:
+        active_courses.inc()
+    else:
+        active_courses.dec()
+
+
+event_bus.subscribe(COURSE_CHANGED, broadcaster.publish)
+event_bus.subscribe(COURSE_CHANGED, _track_active_courses)
+
+
+class ChangeLogService:
+
+    @staticmethod
+    def mark_courses_changed(session: Session, course_ids: Iterable[int]) -> None:
+        """Record courses changed by bulk statements, which bypass the flush"""
+        pending = _pending(session)
+        for course_id in course_ids:
+            created = pending.get(("course", course_id), (None, False))[1]
+            pending[("course", course_id)] = (course_id, created, False)
+
+    @staticmethod
+    def mark_created(session: Session, entity: str, rows: Iterable[Tuple[int, int]]) -> None:
+        """Record (id, course id) rows inserted by bulk statements"""
+        pending = _pending(session)
+        for entity_id, course_id in rows:
+            pending[(entity, entity_id)] = (course_id, True, False)
+
+    @staticmethod
+    def mark_deleted(session: Session, entity: str, rows: Iterable[Tuple[int, int]]) -> None:
+        """Record (id, course id) rows removed by bulk statements"""
+        pending = _pending(session)
+        for entity_id, course_id in rows:
+            created = pending.get((entity, entity_id), (None, False))[1]
+            pending[(entity, entity_id)] = (course_id, created, True)
+
+    @staticmethod
+    def get_changes(
+            session: Session,
+            since: int,
+            limit: int,
+            course_id: Optional[int] = None
+    ) -> CourseChangePage:
+        """Changes after the ``since`` cursor, oldest first"""
+        state = session.get(ChangeLogState, 1)
+        if state is not None and 0 < since < state.purged_through:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Cursor is older than the change log retention, resync from since=0"
+            )
+
+        statement = select(CourseChange).where(CourseChange.seq > since)
+        if course_id is not None:
+            statement = statement.where(CourseChange.course_id == course_id)
+        changes = list(session.exec(statement.order_by(CourseChange.seq).limit(limit + 1)).all())
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return CourseChangePage(
+            changes=changes,
+            next_cursor=changes[-1].seq if changes else since,
+            has_more=has_more,
+        )
+
+    @staticmethod
+    def compact(session: Session, retention_days: int) -> int:
+        """Drop entries superseded by a newer one for the same row, then tombstones past retention.
+
+        Reading from since=0 still yields every live row afterwards.
+        """
+        latest = select(func.max(CourseChange.seq)).group_by(CourseChange.entity, CourseChange.entity_id)
+        superseded = session.exec(
+            delete(CourseChange)
+            .where(CourseChange.seq.not_in(latest))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        change_log_compacted.labels(reason='superseded').inc(superseded)
+
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        purged_through = session.exec(
+            select(func.max(CourseChange.seq))
+            .where(CourseChange.operation == ChangeOperation.DELETE)
+            .where(CourseChange.changed_at < cutoff)
+        ).one()
+        tombstones = 0
+        if purged_through is not None:
+            tombstones = session.exec(
+                delete(CourseChange)
+                .where(CourseChange.operation == ChangeOperation.DELETE)
+                .where(CourseChange.seq <= purged_through)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            state = session.get(ChangeLogState, 1) or ChangeLogState(id=1)
+            state.purged_through = max(state.purged_through, purged_through)
+            session.add(state)
+        change_log_compacted.labels(reason='tombstone').inc(tombstones)
+
+        session.commit()
+        return superseded + tombstones
+
+
+def compact_change_log() -> None:
+    with Session(engine) as session:
+        ChangeLogService.compact(session, settings.CHANGE_LOG_RETENTION_DAYS)
@@ -0,0 +1,137 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, insert, literal
+from sqlmodel import Session, SQLModel, select, delete, func
+
+from app.config.config import settings
+from app.core.db import engine
+from app.core.metrics import courses_archived
+from app.enum.course_status_enum import CourseStatus
+from app.models.course import Course, CourseRead, CourseReadWithTeachers
+from app.models.course_archive import ArchivedCourse, ArchivedCourseTeacher
+from app.models.course_teacher import CourseTeacher, CourseTeacherRead
+from app.models.user import User
+from app.services.change_log_service import ChangeLogService
+
+logger = logging.getLogger(__name__)
+
+COURSE_COLUMNS = [column.name for column in Course.__table__.columns]
+ASSIGNMENT_COLUMNS = ["course_id", "teacher_id", "role", "assigned_at"]
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _check_course_ids_not_reused(metadata, connection, **kw) -> None:
+    # Only a table created with AUTOINCREMENT keeps SQLite from reusing the ids of moved courses
+    if connection.dialect.name != "sqlite":
+        return
+    ddl = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'course'").scalar()
+    if ddl is not None and "AUTOINCREMENT" not in ddl.upper():
+        logger.warning("The course table predates AUTOINCREMENT: ids of courses moved to archival storage "
+                       "can be reused, such courses are left in place rather than archived")
+
+
+class CourseArchiveService:
+
+    @staticmethod
+    def get_archived_courses(
+            session: Session,
+            ids: Optional[List[int]] = None,
+            include_teachers: bool = False
+    ) -> List[CourseRead]:
+        """Courses from archival storage, all of them or the given ids"""
+        statement = select(ArchivedCourse).order_by(ArchivedCourse.id)
+        if ids is not None:
+            statement = statement.where(ArchivedCourse.id.in_(ids))
+        archived = session.exec(statement).all()
+        if not include_teachers:
+            return [CourseRead.model_validate(course) for course in archived]
+
+        teachers = defaultdict(list)
+        rows = session.exec(
+            select(ArchivedCourseTeacher, User.full_name, User.email)
+            .outerjoin(User, User.id == ArchivedCourseTeacher.teacher_id)
+            .where(ArchivedCourseTeacher.course_id.in_([course.id for course in archived]))
+            .order_by(ArchivedCourseTeacher.id)
+        )
+        for assignment, name, email in rows:
+            teachers[assignment.course_id].append(CourseTeacherRead(
+                **assignment.model_dump(), teacher_name=name, teacher_email=email
+            ))
+        return [
+            CourseReadWithTeachers.model_validate(course, update={"teachers": teachers[course.id]})
+            for course in archived
+        ]
+
+    @staticmethod
+    def as_fields(courses: List[CourseRead], fields: tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Sparse fieldset output for archived courses, shaped like CourseService.get_course_fields"""
+        return [course.model_dump(include={*fields, "teachers"}) for course in courses]
+
+    @staticmethod
+    def archive_courses(
+            session: Session,
+            batch_size: int,
+            on_batch: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Move archived courses and their teacher assignments into archival storage.
+
+        Each batch is copied and removed in one short transaction. ``on_batch``
+        is called with the courses moved so far and the number there were to move.
+        Moved rows are logged as deleted from the course tables.
+        """
+        movable = (Course.status == CourseStatus.ARCHIVED, Course.id.not_in(select(ArchivedCourse.id)))
+        # Ids reused since an older course was moved (see _check_course_ids_not_reused)
+        clashing = session.exec(
+            select(Course.id).where(Course.status == CourseStatus.ARCHIVED, Course.id.in_(select(ArchivedCourse.id)))
+        ).all()
+        if clashing:
+            logger.warning("Not archiving courses %s, their ids are already taken in archival storage", clashing)
+        total = session.exec(select(func.count(Course.id)).where(*movable)).one()
+        moved = 0
+        while True:
+            # Rows stay locked until the batch commits, a concurrent PATCH waits for it
+            ids = session.exec(
+                select(Course.id)
+                .where(*movable)
+                .order_by(Course.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not ids:
+                break
+
+            session.exec(insert(ArchivedCourse).from_select(
+                [*COURSE_COLUMNS, "archived_at"],
+                select(*Course.__table__.columns, literal(datetime.utcnow())).where(Course.id.in_(ids)),
+            ))
+            session.exec(insert(ArchivedCourseTeacher).from_select(
+                ASSIGNMENT_COLUMNS,
+                select(*[CourseTeacher.__table__.c[name] for name in ASSIGNMENT_COLUMNS])
+                .where(CourseTeacher.course_id.in_(ids)),
+            ))
+            assignments = session.exec(
+                delete(CourseTeacher)
+                .where(CourseTeacher.course_id.in_(ids))
+                .returning(CourseTeacher.id, CourseTeacher.course_id)
+            ).all()
+            session.exec(delete(Course).where(Course.id.in_(ids)))
+            # Also how every worker's active_courses gauge learns the courses left the table
+            ChangeLogService.mark_deleted(session, "course_teacher", assignments)
+            ChangeLogService.mark_deleted(session, "course", [(course_id, course_id) for course_id in ids])
+            session.commit()
+
+            moved += len(ids)
+            courses_archived.inc(len(ids))
+            if on_batch is not None:
+                on_batch(moved, max(total, moved))
+            if len(ids) < batch_size:
+                break
+        return moved
+
+
+def archive_courses() -> None:
+    with Session(engine) as session:
+        CourseArchiveService.archive_courses(session, settings.COURSE_ARCHIVAL_BATCH_SIZE)
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlmodel import Session, select, update
+
+from app.config.config import settings
+from app.core.db import engine
+from app.core.metrics import course_status_transitions
+from app.enum.course_status_enum import CourseStatus
+from app.models.course import Course
+from app.services.change_log_service import ChangeLogService
+from app.services.stats_service import StatsService, course_status
+
+# (from, to, date column reaching now): walked through the (status, date) indexes
+TRANSITIONS = [
+    (CourseStatus.DRAFT, CourseStatus.ACTIVE, Course.start_date),
+    (CourseStatus.ACTIVE, CourseStatus.ARCHIVED, Course.end_date),
+]
+
+
+class CourseScheduleService:
+
+    @staticmethod
+    def apply_transitions(
+            session: Session,
+            batch_size: int,
+            now: Optional[datetime] = None
+    ) -> Dict[CourseStatus, int]:
+        """Activate draft courses that started and archive active courses that ended.
+
+        Works in batches of ``batch_size`` courses, each its own short
+        transaction, so no lock is held for long. Returns the number of courses
+        moved into each status.
+        """
+        now = now or datetime.utcnow()
+        moved = {}
+        for source, target, date in TRANSITIONS:
+            moved[target] = 0
+            while True:
+                ids = session.exec(
+                    select(Course.id)
+                    .where(Course.status == source, date <= now)
+                    .order_by(date)
+                    .limit(batch_size)
+                ).all()
+                if not ids:
+                    break
+                # Status rechecked: a PATCH may have moved the course since it was selected
+                changed = session.exec(
+                    update(Course)
+                    .where(Course.id.in_(ids), Course.status == source)
+                    .values(status=target)
+                    .returning(Course.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+                ChangeLogService.mark_courses_changed(session, changed)
+                StatsService.adjust(session, {course_status(source): -len(changed), course_status(target): len(changed)})
+                session.commit()
+
+                moved[target] += len(changed)
+                course_status_transitions.labels(status=target.value).inc(len(changed))
+                if len(ids) < batch_size:
+                    break
+        return moved
+
+
+def run_course_schedule() -> None:
+    with Session(engine) as session:
+        CourseScheduleService.apply_transitions(session, settings.COURSE_SCHEDULE_BATCH_SIZE)
@@ -0,0 +1,134 @@
+import re
+from typing import List
+
+from sqlalchemy import column, event, func, literal_column, table, text
+from sqlmodel import Session, SQLModel, select
+
+from app.config.config import settings
+from app.models.course import Course, CourseSearchPage, CourseSearchResult
+
+# Title matches outweigh description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+# Postgres: a generated tsvector kept by the database itself, GIN indexed.
+# The configuration is a literal, so the expression stays immutable.
+_POSTGRES_DDL = [
+    f"""
+    ALTER TABLE course ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{settings.SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{settings.SEARCH_TEXT_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_course_search_vector ON course USING GIN (search_vector)",
+]
+
+# SQLite: an FTS5 index over the course table, kept in sync by triggers.
+# The 2 and 3 character prefix indexes serve typeahead queries.
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5(
+        title, description,
+        content='course', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_insert AFTER INSERT ON course BEGIN
+        INSERT INTO course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_delete AFTER DELETE ON course BEGIN
+        INSERT INTO course_fts(course_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS course_fts_update AFTER UPDATE OF title, description ON course BEGIN
+        INSERT INTO course_fts(course_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO course_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _create_search_index(metadata, connection, **kw) -> None:
+    # Runs after every create_all, so databases created before search get the index too
+    if connection.dialect.name == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif connection.dialect.name == "sqlite":
+        existed = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'course_fts'")
+        ).first()
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        if not existed:
+            connection.execute(text("INSERT INTO course_fts(course_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(SQLModel.metadata, "before_drop")
+def _drop_search_index(metadata, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS course_fts"))
+
+
+class CourseSearchService:
+
+    @staticmethod
+    def parse_terms(q: str) -> List[str]:
+        """Words of the query; punctuation and search operators are dropped"""
+        return _TERM.findall(q.lower())
+
+    @staticmethod
+    def search(session: Session, q: str, limit: int, offset: int = 0) -> CourseSearchPage:
+        """Courses matching every term, best first. The last term also matches as a prefix."""
+        terms = CourseSearchService.parse_terms(q)
+        if not terms:
+            return CourseSearchPage(courses=[], has_more=False)
+
+        if session.get_bind().dialect.name == "postgresql":
+            statement = CourseSearchService._postgres_statement(terms)
+        else:
+            statement = CourseSearchService._sqlite_statement(terms)
+
+        rows = session.exec(statement.order_by(literal_column("rank").desc(), Course.id)
+                            .limit(limit + 1).offset(offset)).all()
+        has_more = len(rows) > limit
+        courses = [
+            CourseSearchResult.model_validate(course, update={"rank": rank})
+            for course, rank in rows[:limit]
+        ]
+        return CourseSearchPage(
+            courses=courses,
+            next_offset=offset + limit if has_more else None,
+            has_more=has_more,
+        )
+
+    @staticmethod
+    def _postgres_statement(terms: List[str]):
+        query = func.to_tsquery(
+            literal_column(f"'{settings.SEARCH_TEXT_CONFIG}'"),
+            " & ".join(terms) + ":*",
+        )
+        vector = literal_column("course.search_vector")
+        rank = func.ts_rank_cd(vector, query).label("rank")
+        return select(Course, rank).where(vector.op("@@")(query))
+
+    @staticmethod
+    def _sqlite_statement(terms: List[str]):
+        fts = table("course_fts", column("rowid"))
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        # bm25 is lower for better matches
+        rank = (-func.bm25(literal_column("course_fts"), TITLE_WEIGHT, DESCRIPTION_WEIGHT)).label("rank")
+        return (
+            select(Course, rank)
+            .join(fts, fts.c.rowid == Course.id)
+            .where(literal_column("course_fts").op("MATCH")(match))
+        )
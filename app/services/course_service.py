@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, literal, null
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlmodel import Session, select, delete, func
+
+from app.config.config import settings
+from app.core.fieldsets import FieldSet, rows_as_dicts
+from app.enum.course_status_enum import CourseStatus
+from app.models.course import Course, CourseCloneOptions, CourseRead
+from app.models.course_teacher import CourseTeacher
+from app.services.change_log_service import ChangeLogService
+from app.services.course_teacher_service import CourseTeacherService
+from app.services.stats_service import StatsService, course_status, teacher_role
+
+COURSE_FIELDS = FieldSet(CourseRead, {name: getattr(Course, name) for name in CourseRead.model_fields})
+
+# Default filter of the listings, served by the ix_course_live partial index
+LIVE_COURSES = Course.status != CourseStatus.ARCHIVED
+
+# Teachers and their users come in one extra query for the whole page
+TEACHERS_LOADER = selectinload(Course.teachers).joinedload(CourseTeacher.teacher)
+
+
+def _shift_days(column, days: int, dialect: str):
+    if days == 0:
+        return column
+    if dialect == "postgresql":
+        return column + func.make_interval(0, 0, 0, days)
+    # SQLite keeps datetimes as text
+    return func.strftime("%Y-%m-%d %H:%M:%f", column, f"{days:+d} days")
+
+
+class CourseService:
+
+    @staticmethod
+    def get_course_fields(
+            session: Session,
+            fields: tuple[str, ...],
+            include_teachers: bool = False,
+            where: Optional[Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Load only the selected course columns, optionally with embedded teachers"""
+        # Teachers are attached by course id, so select it even when not requested
+        selected = COURSE_FIELDS.normalize({*fields, "id"}) if include_teachers else fields
+
+        statement = COURSE_FIELDS.statement(selected)
+        if where is not None:
+            statement = statement.where(where)
+        courses = rows_as_dicts(session.exec(statement))
+
+        if include_teachers:
+            teachers = CourseTeacherService.get_teachers_by_course(
+                session, [course["id"] for course in courses]
+            )
+            for course in courses:
+                course["teachers"] = teachers.get(course["id"], [])
+                if "id" not in fields:
+                    del course["id"]
+
+        return courses
+
+    @staticmethod
+    def parse_ids(raw: str) -> List[int]:
+        """Parse a comma separated id list, dropping duplicates but keeping order"""
+        try:
+            ids = [int(part) for part in raw.split(",") if part.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ids must be a comma separated list of integers"
+            )
+        return list(dict.fromkeys(ids))
+
+    @staticmethod
+    def get_courses_by_ids(
+            session: Session,
+            ids: List[int],
+            include_teachers: bool = False,
+            fields: Optional[tuple[str, ...]] = None
+    ) -> Tuple[List[Any], List[int]]:
+        """Fetch many courses with one IN query, returns them in request order plus the missing ids"""
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.COURSE_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.COURSE_BATCH_MAX_IDS} ids can be requested at once"
+            )
+        if not ids:
+            return [], []
+
+        if fields is not None:
+            rows = CourseService.get_course_fields(
+                session, COURSE_FIELDS.normalize({*fields, "id"}), include_teachers, where=Course.id.in_(ids)
+            )
+            by_id = {row["id"]: row for row in rows}
+            if "id" not in fields:
+                for row in rows:
+                    del row["id"]
+        else:
+            statement = select(Course).where(Course.id.in_(ids))
+            if include_teachers:
+                statement = statement.options(TEACHERS_LOADER)
+            by_id = {course.id: course for course in session.exec(statement)}
+
+        found = [by_id[course_id] for course_id in ids if course_id in by_id]
+        missing = [course_id for course_id in ids if course_id not in by_id]
+        return found, missing
+
+    @staticmethod
+    def delete_courses(session: Session, ids: List[int]) -> Tuple[Dict[int, str], List[int]]:
+        """Delete courses and their teacher assignments in one transaction.
+
+        Returns the titles of the deleted courses by id, and the missing ids,
+        both in request order.
+
+        Two set-based statements however many courses and teachers there are.
+        Assignments are deleted explicitly rather than left to ON DELETE
+        CASCADE, which older schemas and SQLite without foreign keys lack.
+        """
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.COURSE_BULK_DELETE_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.COURSE_BULK_DELETE_MAX_IDS} courses can be deleted at once"
+            )
+        if not ids:
+            return {}, []
+
+        assignments = session.exec(
+            delete(CourseTeacher)
+            .where(CourseTeacher.course_id.in_(ids))
+            .returning(CourseTeacher.id, CourseTeacher.course_id, CourseTeacher.role)
+            .execution_options(synchronize_session=False)
+        ).all()
+        courses = session.exec(
+            delete(Course)
+            .where(Course.id.in_(ids))
+            .returning(Course.id, Course.status, Course.title)
+            .execution_options(synchronize_session=False)
+        ).all()
+        deleted = {course_id: title for course_id, _, title in courses}
+
+        ChangeLogService.mark_deleted(session, "course_teacher", [row[:2] for row in assignments])
+        ChangeLogService.mark_deleted(session, "course", [(course_id, course_id) for course_id in deleted])
+        StatsService.adjust(session, {
+            **{name: -n for name, n in StatsService.count(course_status, [row[1] for row in courses]).items()},
+            **{name: -n for name, n in StatsService.count(teacher_role, [row[2] for row in assignments]).items()},
+        })
+        session.commit()
+
+        return {course_id: deleted[course_id] for course_id in ids if course_id in deleted}, [
+            course_id for course_id in ids if course_id not in deleted
+        ]
+
+    @staticmethod
+    def clone_courses(
+            session: Session,
+            where: Any,
+            options: CourseCloneOptions,
+            title: Optional[str] = None
+    ) -> List[Course]:
+        """Copy the courses matching ``where``, with their teacher assignments, returns the copies.
+
+        Copied server-side with INSERT ... SELECT: one statement for the
+        courses, one for the assignments, however many there are. Each copy
+        points back to its source through cloned_from_id, which is how the
+        assignments find their new course.
+        """
+        dialect = session.get_bind().dialect.name
+        columns = {
+            "title": literal(title) if title is not None else Course.title,
+            "description": Course.description,
+            "status": literal(options.status, type_=Course.__table__.c.status.type),
+            "start_date": _shift_days(Course.start_date, options.shift_days, dialect),
+            "end_date": _shift_days(Course.end_date, options.shift_days, dialect),
+            "teacher_id": Course.teacher_id if options.include_teachers else null(),
+            "teacher_count": Course.teacher_count if options.include_teachers else literal(0),
+            "cloned_from_id": Course.id,
+        }
+        cloned = session.exec(
+            insert(Course)
+            .from_select(list(columns), select(*columns.values()).where(where).order_by(Course.id))
+            .returning(Course.id)
+        ).scalars().all()
+        if not cloned:
+            return []
+
+        ChangeLogService.mark_created(session, "course", [(course_id, course_id) for course_id in cloned])
+        StatsService.adjust(session, {course_status(options.status): len(cloned)})
+        if options.include_teachers:
+            copy = aliased(Course)
+            assignments = session.exec(
+                insert(CourseTeacher)
+                .from_select(
+                    ["course_id", "teacher_id", "role", "assigned_at"],
+                    select(copy.id, CourseTeacher.teacher_id, CourseTeacher.role, literal(datetime.utcnow()))
+                    .join(copy, copy.cloned_from_id == CourseTeacher.course_id)
+                    .where(copy.id.in_(cloned))
+                )
+                .returning(CourseTeacher.id, CourseTeacher.course_id, CourseTeacher.role)
+            ).all()
+            ChangeLogService.mark_created(session, "course_teacher", [row[:2] for row in assignments])
+            StatsService.adjust(session, StatsService.count(teacher_role, [row[2] for row in assignments]))
+        session.commit()
+
+        return list(session.exec(select(Course).where(Course.id.in_(cloned)).order_by(Course.id)).all())
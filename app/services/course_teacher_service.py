@@ -1,12 +1,71 @@
-from typing import List
-from sqlmodel import Session, select
+import heapq
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, literal_column, text
+from sqlmodel import Session, SQLModel, select, func, update, or_
 from fastapi import HTTPException, status
 
-from app.models.course_teacher import CourseTeacher, CourseTeacherCreate
-from app.models.course import Course
+from app.config.config import settings
+from app.core.deadline import check_deadline
+from app.core.fieldsets import FieldSet, rows_as_dicts
+from app.core.metrics import teacher_schedule_conflicts
+from app.services.change_log_service import ChangeLogService
+from app.services.stats_service import StatsService, teacher_role
+from app.models.course_teacher import CourseTeacher, CourseTeacherCreate, CourseTeacherRead, TeacherConflict
+from app.models.course import Course, TeacherCoursePage, TeacherCourseRead
 from app.models.user import User
+from app.enum.course_status_enum import CourseStatus
 from app.enum.teacher_role_enum import TeacherRole
 
+logger = logging.getLogger(__name__)
+
+TEACHER_USER_FIELDS = {"teacher_name", "teacher_email"}
+
+# A course takes part in overlap checks once it has both dates; periods include both ends
+SCHEDULED = (Course.start_date.is_not(None), Course.end_date.is_not(None), Course.start_date <= Course.end_date)
+
+# Postgres answers overlap queries from a GiST index on the course period. Partial, so
+# unscheduled courses and inverted dates, which tsrange rejects, never reach it.
+_POSTGRES_PERIOD_INDEX = """
+    CREATE INDEX IF NOT EXISTS ix_course_period_gist ON course
+    USING GIST (tsrange(start_date, end_date, '[]'))
+    WHERE start_date IS NOT NULL AND end_date IS NOT NULL AND start_date <= end_date
+"""
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _create_period_index(metadata, connection, **kw) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(_POSTGRES_PERIOD_INDEX))
+
+
+def _period(start, end):
+    # Same expression as the index, so the planner can use it
+    return func.tsrange(start, end, literal_column("'[]'"))
+
+
+def _select_from_course_teacher(statement, fields):
+    statement = statement.select_from(CourseTeacher)
+    if TEACHER_USER_FIELDS.intersection(fields):
+        statement = statement.outerjoin(User, User.id == CourseTeacher.teacher_id)
+    return statement
+
+
+COURSE_TEACHER_FIELDS = FieldSet(
+    CourseTeacherRead,
+    {
+        "id": CourseTeacher.id,
+        "course_id": CourseTeacher.course_id,
+        "teacher_id": CourseTeacher.teacher_id,
+        "role": CourseTeacher.role,
+        "assigned_at": CourseTeacher.assigned_at,
+        "teacher_name": User.full_name,
+        "teacher_email": User.email,
+    },
+    select_from=_select_from_course_teacher,
+)
+
 
 class CourseTeacherService:
 
@@ -16,8 +75,12 @@ class CourseTeacherService:
             course_id: int,
             teacher_data: CourseTeacherCreate,
             current_user: User
-    ) -> CourseTeacher:
-        """Assign teacher to course"""
+    ) -> Tuple[CourseTeacher, List[int]]:
+        """Assign teacher to course.
+
+        Returns the assignment and, under the "warn" overlap policy, the ids of
+        the teacher's other courses overlapping this one.
+        """
 
         # Check if course exists
         course = session.get(Course, course_id)
@@ -27,8 +90,14 @@ class CourseTeacherService:
                 detail="Course not found"
             )
 
-        # Check if teacher exists
-        teacher = session.get(User, teacher_data.teacher_id)
+        check_deadline()
+
+        # Check if teacher exists. Unless overlaps are allowed, the teacher row stays
+        # locked until the commit, so concurrent assignments of the teacher queue up
+        # behind this one's overlap check (Postgres; SQLite ignores FOR UPDATE)
+        teacher = session.get(
+            User, teacher_data.teacher_id, with_for_update=settings.TEACHER_OVERLAP_POLICY != "allow"
+        )
         if not teacher:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -47,6 +116,21 @@ class CourseTeacherService:
                 detail="Teacher is already assigned to this course"
             )
 
+        conflicts = []
+        if settings.TEACHER_OVERLAP_POLICY != "allow":
+            conflicts = CourseTeacherService.find_overlapping_courses(session, teacher_data.teacher_id, course)
+        if conflicts:
+            teacher_schedule_conflicts.labels(policy=settings.TEACHER_OVERLAP_POLICY).inc()
+            if settings.TEACHER_OVERLAP_POLICY == "reject":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Teacher already teaches overlapping courses: {', '.join(map(str, conflicts))}"
+                )
+            logger.warning("Teacher %s assigned to course %s overlapping courses %s",
+                           teacher_data.teacher_id, course_id, conflicts)
+
+        check_deadline()
+
         # Create assignment
         course_teacher = CourseTeacher(
             course_id=course_id,
@@ -54,9 +138,71 @@ class CourseTeacherService:
             role=teacher_data.role
         )
         session.add(course_teacher)
+
+        # Keep the denormalized staffing fields in the same transaction
+        course.teacher_count = Course.teacher_count + 1
+        if teacher_data.role == TeacherRole.PRIMARY and course.teacher_id is None:
+            course.teacher_id = teacher_data.teacher_id
+        session.add(course)
+        StatsService.adjust(session, {teacher_role(teacher_data.role): 1})
+
         session.commit()
         session.refresh(course_teacher)
-        return course_teacher
+        return course_teacher, conflicts
+
+    @staticmethod
+    def find_overlapping_courses(session: Session, teacher_id: int, course: Course) -> List[int]:
+        """Other courses of the teacher whose dates overlap the course, in one indexed query"""
+        if course.start_date is None or course.end_date is None or course.start_date > course.end_date:
+            return []
+
+        statement = (
+            select(Course.id)
+            .join(CourseTeacher, CourseTeacher.course_id == Course.id)
+            .where(CourseTeacher.teacher_id == teacher_id, Course.id != course.id, *SCHEDULED)
+        )
+        if session.get_bind().dialect.name == "postgresql":
+            statement = statement.where(
+                _period(Course.start_date, Course.end_date).op("&&")(_period(course.start_date, course.end_date))
+            )
+        else:
+            statement = statement.where(Course.start_date <= course.end_date, Course.end_date >= course.start_date)
+        return list(session.exec(statement.order_by(Course.id)).all())
+
+    @staticmethod
+    def find_all_conflicts(session: Session) -> List[TeacherConflict]:
+        """Every pair of overlapping courses sharing a teacher.
+
+        One pass over the assignments sorted by teacher and start date. Courses
+        still running when the next one starts are kept in a heap by end date,
+        so the cost follows the number of conflicts rather than of course pairs.
+        """
+        rows = session.exec(
+            select(CourseTeacher.teacher_id, Course.id, Course.start_date, Course.end_date)
+            .join(CourseTeacher, CourseTeacher.course_id == Course.id)
+            .where(*SCHEDULED)
+            .order_by(CourseTeacher.teacher_id, Course.start_date, Course.id)
+            .execution_options(yield_per=1000)
+        )
+
+        conflicts = []
+        current_teacher = None
+        running: List[Tuple[Any, int]] = []
+        for teacher_id, course_id, start, end in rows:
+            if teacher_id != current_teacher:
+                current_teacher, running = teacher_id, []
+            while running and running[0][0] < start:
+                heapq.heappop(running)
+            for other_end, other_id in running:
+                conflicts.append(TeacherConflict(
+                    teacher_id=teacher_id,
+                    course_id=other_id,
+                    conflicting_course_id=course_id,
+                    overlap_start=start,
+                    overlap_end=min(end, other_end),
+                ))
+            heapq.heappush(running, (end, course_id))
+        return conflicts
 
     @staticmethod
     def get_course_teachers(session: Session, course_id: int) -> List[CourseTeacher]:
@@ -68,9 +214,84 @@ class CourseTeacherService:
                 detail="Course not found"
             )
 
+        check_deadline()
+
         statement = select(CourseTeacher).where(CourseTeacher.course_id == course_id)
         return list(session.exec(statement).all())
 
+    @staticmethod
+    def get_course_teacher_fields(
+            session: Session,
+            course_id: int,
+            fields: tuple[str, ...]
+    ) -> List[Dict[str, Any]]:
+        """Get the selected fields of every teacher assigned to a course"""
+        course = session.get(Course, course_id)
+        if not course:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+
+        check_deadline()
+
+        statement = COURSE_TEACHER_FIELDS.statement(fields).where(CourseTeacher.course_id == course_id)
+        return rows_as_dicts(session.exec(statement))
+
+    @staticmethod
+    def get_teachers_by_course(
+            session: Session,
+            course_ids: List[int]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Get the teachers of many courses in one query, grouped by course id"""
+        statement = (
+            COURSE_TEACHER_FIELDS.statement(COURSE_TEACHER_FIELDS.all())
+            .where(CourseTeacher.course_id.in_(course_ids))
+            .order_by(CourseTeacher.course_id, CourseTeacher.id)
+        )
+        teachers = defaultdict(list)
+        for row in rows_as_dicts(session.exec(statement)):
+            teachers[row["course_id"]].append(row)
+        return teachers
+
+    @staticmethod
+    def get_teacher_courses(
+            session: Session,
+            teacher_id: int,
+            limit: int,
+            after: int = 0,
+            role: Optional[TeacherRole] = None,
+            course_status: Optional[CourseStatus] = None
+    ) -> TeacherCoursePage:
+        """Courses a user teaches, by course id after the ``after`` cursor, in one indexed join"""
+        statement = (
+            select(Course, CourseTeacher.role, CourseTeacher.assigned_at)
+            .join(CourseTeacher, CourseTeacher.course_id == Course.id)
+            .where(CourseTeacher.teacher_id == teacher_id, CourseTeacher.course_id > after)
+        )
+        if role is not None:
+            statement = statement.where(CourseTeacher.role == role)
+        if course_status is not None:
+            statement = statement.where(Course.status == course_status)
+        rows = session.exec(statement.order_by(CourseTeacher.course_id).limit(limit + 1)).all()
+
+        if not rows and session.get(User, teacher_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        has_more = len(rows) > limit
+        courses = [
+            TeacherCourseRead.model_validate(course, update={"role": role, "assigned_at": assigned_at})
+            for course, role, assigned_at in rows[:limit]
+        ]
+        return TeacherCoursePage(
+            courses=courses,
+            next_cursor=courses[-1].id if has_more else None,
+            has_more=has_more,
+        )
+
     @staticmethod
     def remove_teacher(
             session: Session,
@@ -86,6 +307,8 @@ class CourseTeacherService:
                 detail="Course not found"
             )
 
+        check_deadline()
+
         # Find assignment
         assignment = session.exec(
             select(CourseTeacher)
@@ -99,7 +322,17 @@ class CourseTeacherService:
                 detail="Teacher assignment not found"
             )
 
+        check_deadline()
         session.delete(assignment)
+
+        course.teacher_count = Course.teacher_count - 1
+        if course.teacher_id == teacher_id:
+            course.teacher_id = CourseTeacherService._next_primary_teacher(
+                session, course_id, exclude_teacher_id=teacher_id
+            )
+        session.add(course)
+        StatsService.adjust(session, {teacher_role(assignment.role): -1})
+
         session.commit()
         return {"ok": True, "message": "Teacher removed successfully"}
 
@@ -126,8 +359,66 @@ class CourseTeacherService:
                 detail="Teacher assignment not found"
             )
 
+        check_deadline()
+
+        old_role = assignment.role
         assignment.role = new_role
         session.add(assignment)
+
+        course = session.get(Course, course_id)
+        if new_role == TeacherRole.PRIMARY and course.teacher_id is None:
+            course.teacher_id = teacher_id
+        elif old_role == TeacherRole.PRIMARY and course.teacher_id == teacher_id:
+            course.teacher_id = CourseTeacherService._next_primary_teacher(
+                session, course_id, exclude_teacher_id=teacher_id
+            )
+        session.add(course)
+        if new_role != old_role:
+            StatsService.adjust(session, {teacher_role(old_role): -1, teacher_role(new_role): 1})
+
         session.commit()
         session.refresh(assignment)
-        return assignment
\ No newline at end of file
+        return assignment
+
+    @staticmethod
+    def _next_primary_teacher(
+            session: Session,
+            course_id: int,
+            exclude_teacher_id: int
+    ) -> Optional[int]:
+        """Earliest remaining PRIMARY assignment of a course, used when its primary teacher changes"""
+        return session.exec(
+            select(CourseTeacher.teacher_id)
+            .where(CourseTeacher.course_id == course_id)
+            .where(CourseTeacher.role == TeacherRole.PRIMARY)
+            .where(CourseTeacher.teacher_id != exclude_teacher_id)
+            .order_by(CourseTeacher.assigned_at, CourseTeacher.id)
+            .limit(1)
+        ).first()
+
+    @staticmethod
+    def repair_course_staffing(session: Session) -> int:
+        """Recompute teacher_count and teacher_id from the assignments, returns the number of repaired courses"""
+        count = (
+            select(func.count(CourseTeacher.id))
+            .where(CourseTeacher.course_id == Course.id)
+            .scalar_subquery()
+        )
+        primary = (
+            select(CourseTeacher.teacher_id)
+            .where(CourseTeacher.course_id == Course.id)
+            .where(CourseTeacher.role == TeacherRole.PRIMARY)
+            .order_by(CourseTeacher.assigned_at, CourseTeacher.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        repaired = session.exec(
+            update(Course)
+            .where(or_(Course.teacher_count != count, Course.teacher_id.is_distinct_from(primary)))
+            .values(teacher_count=count, teacher_id=primary)
+            .returning(Course.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        ChangeLogService.mark_courses_changed(session, repaired)
+        session.commit()
+        return len(repaired)
\ No newline at end of file
@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+from sqlmodel import Session, update
+
+from app.config.config import settings
+from app.core.db import engine
+from app.core.jobs import JobContext, JobRunner, job_kinds, register_job
+from app.enum.job_status_enum import JobStatus
+from app.models.job import Job, JobCreate
+from app.models.user import User
+from app.services.change_log_service import ChangeLogService
+from app.services.course_archive_service import CourseArchiveService
+from app.services.course_teacher_service import CourseTeacherService
+from app.services.stats_service import StatsService
+
+job_runner = JobRunner(
+    session_factory=lambda: Session(engine),
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    stale_seconds=settings.JOB_STALE_SECONDS,
+)
+
+
+@register_job("repair_course_staffing")
+def repair_course_staffing_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    with ctx.session() as session:
+        return {"repaired": CourseTeacherService.repair_course_staffing(session)}
+
+
+@register_job("compact_change_log")
+def compact_change_log_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    retention_days = int(params.get("retention_days", settings.CHANGE_LOG_RETENTION_DAYS))
+    with ctx.session() as session:
+        return {"removed": ChangeLogService.compact(session, retention_days)}
+
+
+@register_job("archive_courses")
+def archive_courses_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    batch_size = int(params.get("batch_size", settings.COURSE_ARCHIVAL_BATCH_SIZE))
+    with ctx.session() as session:
+        moved = CourseArchiveService.archive_courses(
+            session, batch_size, lambda done, total: ctx.report(done / total, f"{done} of {total} courses")
+        )
+    return {"archived": moved}
+
+
+@register_job("reconcile_stats")
+def reconcile_stats_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    with ctx.session() as session:
+        return {"corrected": StatsService.reconcile(session)}
+
+
+class JobService:
+
+    @staticmethod
+    def submit_job(session: Session, job_in: JobCreate, current_user: User) -> Job:
+        """Persist a job and hand it to the runner"""
+        if job_in.kind not in job_kinds:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown job kind. Available: {', '.join(sorted(job_kinds))}"
+            )
+        if not job_runner.has_capacity():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job queue is full, please retry later",
+                headers={"Retry-After": str(int(settings.JOB_RECOVERY_SECONDS))},
+            )
+
+        job = Job(kind=job_in.kind, params=job_in.params, created_by=current_user.id)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+
+        job_runner.enqueue(job.id)
+        return job
+
+    @staticmethod
+    def get_job(session: Session, job_id: int) -> Job:
+        job = session.get(Job, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return job
+
+    @staticmethod
+    def cancel_job(session: Session, job_id: int) -> Job:
+        """Cancel a queued job right away, a running one at its next progress report"""
+        JobService.get_job(session, job_id)
+        # Conditional updates: the runner may claim the job between a read and a write
+        cancelled = session.exec(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.CANCELLED, finished_at=datetime.utcnow())
+        ).rowcount
+        requested = cancelled or session.exec(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+            .values(cancel_requested=True)
+        ).rowcount
+        session.commit()
+
+        job = JobService.get_job(session, job_id)
+        if not requested:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job already {job.status.value}"
+            )
+        return job
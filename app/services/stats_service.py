@@ -0,0 +1,117 @@
+from collections import Counter
+from enum import Enum
+from typing import Dict, Iterable
+
+from sqlalchemy import union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from app.core.metrics import stats_counter_drift
+from app.enum.course_status_enum import CourseStatus
+from app.enum.teacher_role_enum import TeacherRole
+from app.models.course import Course
+from app.models.course_archive import ArchivedCourse, ArchivedCourseTeacher
+from app.models.course_teacher import CourseTeacher
+from app.models.stats import StatCounter, StatsRead
+from app.models.user import Role, User
+
+COURSE_STATUS = "course.status."
+USER_ROLE = "user.role."
+TEACHER_ROLE = "assignment.role."
+
+
+def course_status(value: CourseStatus) -> str:
+    return COURSE_STATUS + value.name
+
+
+def user_role(value: Role) -> str:
+    return USER_ROLE + value.name
+
+
+def teacher_role(value: TeacherRole) -> str:
+    return TEACHER_ROLE + value.name
+
+
+class StatsService:
+
+    @staticmethod
+    def adjust(session: Session, deltas: Dict[str, int]) -> None:
+        """Add deltas to counters, in the caller's transaction.
+
+        One atomic increment per counter, so concurrent transactions never
+        lose an update. Nothing is committed here.
+        """
+        rows = [{"name": name, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(StatCounter).values(rows)
+        session.exec(statement.on_conflict_do_update(
+            index_elements=[StatCounter.name],
+            set_={"value": StatCounter.value + statement.excluded.value},
+        ))
+
+    @staticmethod
+    def count(name_of, values: Iterable[Enum]) -> Dict[str, int]:
+        """Deltas of +1 for every value, e.g. the statuses of created courses"""
+        return dict(Counter(name_of(value) for value in values))
+
+    @staticmethod
+    def get_stats(session: Session) -> StatsRead:
+        counters = dict(session.exec(select(StatCounter.name, StatCounter.value)).all())
+        courses = {value: counters.get(course_status(value), 0) for value in CourseStatus}
+        users = {value: counters.get(user_role(value), 0) for value in Role}
+        teachers = {value: counters.get(teacher_role(value), 0) for value in TeacherRole}
+        total_courses = sum(courses.values())
+        total_assignments = sum(teachers.values())
+        return StatsRead(
+            courses_by_status=courses,
+            users_by_role=users,
+            teachers_by_role=teachers,
+            total_courses=total_courses,
+            total_assignments=total_assignments,
+            average_teachers_per_course=total_assignments / total_courses if total_courses else 0.0,
+        )
+
+    @staticmethod
+    def recount(session: Session) -> Dict[str, int]:
+        """Every counter computed from scratch, with full table scans"""
+        counted = {}
+        # Archived courses count wherever they are stored
+        statuses = union_all(select(Course.status), select(ArchivedCourse.status)).subquery()
+        for value, total in session.exec(select(statuses.c.status, func.count()).group_by(statuses.c.status)):
+            counted[course_status(CourseStatus(value))] = total
+        roles = union_all(select(CourseTeacher.role), select(ArchivedCourseTeacher.role)).subquery()
+        for value, total in session.exec(select(roles.c.role, func.count()).group_by(roles.c.role)):
+            counted[teacher_role(TeacherRole(value))] = total
+        for value, total in session.exec(select(User.role, func.count()).group_by(User.role)):
+            counted[user_role(value)] = total
+        return counted
+
+    @staticmethod
+    def reconcile(session: Session) -> int:
+        """Correct counters that drifted from the tables, returns how many were wrong"""
+        # Counter rows stay locked until the commit: mutations that already
+        # incremented are waited for, later ones wait for the corrected values
+        stored = dict(session.exec(
+            select(StatCounter.name, StatCounter.value).with_for_update()
+        ).all())
+        counted = StatsService.recount(session)
+        deltas = {
+            name: counted.get(name, 0) - stored.get(name, 0)
+            for name in {*stored, *counted}
+        }
+        StatsService.adjust(session, deltas)
+        session.commit()
+
+        drifted = sum(1 for delta in deltas.values() if delta)
+        stats_counter_drift.inc(drifted)
+        return drifted
+
+
+def reconcile_stats() -> None:
+    # Imported here, the database module depends on this one through UserService
+    from app.core.db import engine
+
+    with Session(engine) as session:
+        StatsService.reconcile(session)
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 
 from app.models.user import UserCreate, User
 from app.services.security_services import SecurityService
+from app.services.stats_service import StatsService, user_role
 
 
 class UserService:
@@ -31,6 +32,7 @@ class UserService:
             hashed_password=hashed_password,
         )
         session.add(new_user)
+        StatsService.adjust(session, {user_role(new_user.role): 1})
         session.commit()
         session.refresh(new_user)
         return new_user
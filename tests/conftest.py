@@ -15,7 +15,8 @@ os.environ["POSTGRES_USER"] = "test_user"
 os.environ["POSTGRES_PASSWORD"] = "test_password"
 
 # Now import app modules that depend on settings
-from app.core.db import get_session
+from app.core.db import get_session, get_read_session
+from app.core.rate_limit import rate_limiter
 from app.main import app
 
 
@@ -47,6 +48,8 @@ def client_fixture(session: Session):
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    rate_limiter.backend.reset()
 
     client = TestClient(app)
     yield client
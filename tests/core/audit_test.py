@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.core.audit import AuditLog
+from app.core.db import SharedSession
+from app.models.audit import AuditEvent
+from app.models.user import User
+
+
+class TestAuditLog:
+    """Test suite for the batched audit log"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        # A file, not one shared in-memory connection: the flush thread writes while the test reads
+        engine = create_engine(f"sqlite:///{tmp_path}/audit.db", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        return engine
+
+    @pytest.fixture
+    def actor(self):
+        return User(id=7, email="auditor@example.com", full_name="Auditor", hashed_password="x")
+
+    def _events(self, engine) -> list[AuditEvent]:
+        with Session(engine) as session:
+            return list(session.exec(select(AuditEvent).order_by(AuditEvent.id)).all())
+
+    def test_flush_writes_batches(self, engine, actor):
+        writes = []
+
+        def factory():
+            writes.append(1)
+            return Session(engine)
+
+        audit = AuditLog(factory, max_queue=100, batch_size=2, flush_interval=1.0)
+        for course_id in range(5):
+            audit.record(actor, "course.create", "course", course_id, course_id, details={"title": "x"})
+        assert self._events(engine) == []
+
+        audit.flush()
+        events = self._events(engine)
+        assert [event.entity_id for event in events] == [0, 1, 2, 3, 4]
+        assert events[0].actor_id == 7
+        assert events[0].actor_email == "auditor@example.com"
+        assert events[0].details == {"title": "x"}
+        assert len(writes) == 3
+
+    def test_full_queue_drops_events(self, engine, actor):
+        audit = AuditLog(lambda: Session(engine), max_queue=2, batch_size=10, flush_interval=1.0)
+        for course_id in range(4):
+            audit.record(actor, "course.delete", "course", course_id)
+        audit.flush()
+        assert [event.entity_id for event in self._events(engine)] == [0, 1]
+
+    def test_thread_writes_after_interval_and_drains_on_stop(self, engine, actor):
+        audit = AuditLog(lambda: Session(engine), max_queue=100, batch_size=100, flush_interval=0.05)
+        audit.start()
+        try:
+            audit.record(actor, "course.update", "course", 1)
+            deadline = time.monotonic() + 2
+            while not self._events(engine) and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert len(self._events(engine)) == 1
+
+            audit.record(actor, "course.update", "course", 2)
+        finally:
+            audit.stop()
+        assert [event.entity_id for event in self._events(engine)] == [1, 2]
+
+    def test_batch_session_defers_until_commit(self, engine, actor):
+        audit = AuditLog(lambda: Session(engine), max_queue=100, batch_size=10, flush_interval=1.0)
+        rolled_back = SharedSession(engine)
+        rolled_back.connection()
+        audit.record(actor, "course.create", "course", 1, session=rolled_back)
+        rolled_back.finish(False)
+
+        committed = SharedSession(engine)
+        committed.connection()
+        audit.record(actor, "course.create", "course", 2, session=committed)
+        audit.flush()
+        assert self._events(engine) == []
+
+        committed.finish(True)
+        audit.flush()
+        assert [event.entity_id for event in self._events(engine)] == [2]
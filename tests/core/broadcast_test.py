@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from app.core.broadcast import Broadcaster, format_sse
+
+
+class TestBroadcaster:
+    """Test suite for the in-process event broadcaster"""
+
+    def test_fan_out_with_course_filter(self):
+        async def scenario():
+            broadcaster = Broadcaster(queue_size=10, max_subscribers=10)
+            everything = broadcaster.subscribe()
+            one_course = broadcaster.subscribe(course_id=1)
+
+            broadcaster.publish({"seq": 1, "course_id": 1})
+            broadcaster.publish({"seq": 2, "course_id": 2})
+            await asyncio.sleep(0)
+
+            assert [everything.queue.get_nowait()["seq"] for _ in range(2)] == [1, 2]
+            assert one_course.queue.get_nowait()["seq"] == 1
+            assert one_course.queue.empty()
+
+        asyncio.run(scenario())
+
+    def test_publish_from_another_thread(self):
+        async def scenario():
+            broadcaster = Broadcaster(queue_size=10, max_subscribers=10)
+            subscription = broadcaster.subscribe()
+
+            thread = threading.Thread(target=broadcaster.publish, args=({"seq": 7},))
+            thread.start()
+            thread.join()
+
+            assert (await asyncio.wait_for(subscription.queue.get(), 1))["seq"] == 7
+
+        asyncio.run(scenario())
+
+    def test_slow_consumer_is_dropped(self):
+        async def scenario():
+            broadcaster = Broadcaster(queue_size=2, max_subscribers=10)
+            slow = broadcaster.subscribe()
+
+            for seq in range(3):
+                broadcaster.publish({"seq": seq})
+            await asyncio.sleep(0)
+
+            assert slow.dropped
+            assert len(broadcaster) == 0
+            # The backlog is discarded, only the end-of-stream marker is left
+            assert slow.queue.get_nowait() is None
+
+        asyncio.run(scenario())
+
+    def test_max_subscribers(self):
+        async def scenario():
+            broadcaster = Broadcaster(queue_size=2, max_subscribers=1)
+            first = broadcaster.subscribe()
+            assert broadcaster.subscribe() is None
+
+            broadcaster.unsubscribe(first)
+            assert broadcaster.subscribe() is not None
+
+        asyncio.run(scenario())
+
+    def test_format_sse(self):
+        assert format_sse({"a": 1}, event="change", event_id=3) == 'event: change\nid: 3\ndata: {"a":1}\n\n'
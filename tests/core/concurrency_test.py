@@ -0,0 +1,80 @@
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from fastapi.testclient import TestClient
+
+from app.core.concurrency import (
+    ConcurrencyLimiter,
+    ConcurrencyLimitMiddleware,
+    GradientLimit,
+    classify_request,
+)
+
+
+class TestConcurrencyLimiter:
+    """Test suite for the concurrency limiter and load shedding middleware"""
+
+    def test_classify_request(self):
+        assert classify_request("POST", "/api/v1/auth/token") == "auth"
+        assert classify_request("GET", "/api/v1/courses/") == "read"
+        assert classify_request("PATCH", "/api/v1/courses/1") == "write"
+        assert classify_request("GET", "/metrics") is None
+        assert classify_request("GET", "/api/v1/courses/events") is None
+
+    def test_queue_full_is_shed(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter("test", limit=1, queue_size=1, queue_timeout=1.0)
+            assert await limiter.acquire() is True
+
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.queued == 1
+
+            # Queue is full, third request is rejected immediately
+            assert await limiter.acquire() is False
+
+            limiter.release()
+            assert await waiter is True
+            assert limiter.in_flight == 1
+
+        asyncio.run(scenario())
+
+    def test_queue_timeout_is_shed(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter("test", limit=1, queue_size=5, queue_timeout=0.01)
+            assert await limiter.acquire() is True
+            assert await limiter.acquire() is False
+            assert limiter.queued == 0
+            assert limiter.in_flight == 1
+
+        asyncio.run(scenario())
+
+    def test_gradient_limit_shrinks_on_latency_increase(self):
+        gradient = GradientLimit(initial=20, min_limit=1, max_limit=100)
+        for _ in range(50):
+            gradient.update(0.01, in_flight=20)
+        grown = gradient.limit
+        assert grown > 20
+
+        for _ in range(50):
+            gradient.update(0.5, in_flight=int(gradient.limit))
+        assert gradient.limit < grown
+
+    def test_middleware_returns_503_with_retry_after(self):
+        limiter = ConcurrencyLimiter("read", limit=0, queue_size=0, queue_timeout=0.01)
+
+        async def endpoint(request):
+            return PlainTextResponse("ok")
+
+        inner = Starlette(routes=[Route("/api/v1/courses/", endpoint)])
+        client = TestClient(ConcurrencyLimitMiddleware(inner, limiters={"read": limiter}))
+
+        response = client.get("/api/v1/courses/")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+        # Paths outside the API are never limited
+        response = client.get("/metrics")
+        assert response.status_code == 404
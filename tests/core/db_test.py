@@ -0,0 +1,137 @@
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from pydantic import field_validator
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, inspect
+from sqlmodel import select
+
+from app.core.db import LazySession, _add_missing_columns, added_columns
+from app.core.routing import SessionReleasingRoute
+from app.models.course import Course, CourseRead
+
+
+class TestLazySession:
+    """Test suite for lazy sessions and early connection release"""
+
+    def test_session_connects_on_first_use(self, engine):
+        with LazySession(engine) as session:
+            assert not session.in_transaction()
+            session.exec(select(Course)).all()
+            assert session.in_transaction()
+
+    def test_release_keeps_loaded_objects_readable(self, engine):
+        with LazySession(engine) as session:
+            course = Course(title="Released")
+            session.add(course)
+            session.commit()
+            # Committed objects are not expired, so no new checkout is needed
+            assert not session.in_transaction()
+            assert course.title == "Released"
+
+            loaded = session.exec(select(Course)).one()
+            session.release()
+            assert not session.in_transaction()
+            assert loaded.title == "Released"
+
+    def test_connection_released_before_serialization(self, engine):
+        seen_during_serialization = []
+
+        def get_lazy_session():
+            with LazySession(engine) as session:
+                seen_during_serialization.append(session)
+                yield session
+
+        class TrackingCourseRead(CourseRead):
+            @field_validator("title")
+            @classmethod
+            def record_transaction_state(cls, value):
+                session = seen_during_serialization[0]
+                seen_during_serialization.append(session.in_transaction())
+                return value
+
+        router = APIRouter(route_class=SessionReleasingRoute)
+
+        @router.get("/courses", response_model=List[TrackingCourseRead])
+        def list_courses(session: Annotated[LazySession, Depends(get_lazy_session)]):
+            return session.exec(select(Course)).all()
+
+        app = FastAPI()
+        app.include_router(router)
+
+        with LazySession(engine) as session:
+            session.add(Course(title="Serialized"))
+            session.commit()
+
+        response = TestClient(app).get("/courses")
+        assert response.status_code == 200
+        assert response.json()[0]["title"] == "Serialized"
+        assert seen_during_serialization[1:] == [False]
+
+
+class TestAddMissingColumns:
+    """Test suite for the additive upgrade of existing tables"""
+
+    def _tables(self, *columns) -> MetaData:
+        metadata = MetaData()
+        # A reserved word, the table name has to be quoted
+        Table("user", metadata, Column("id", Integer, primary_key=True), *columns)
+        return metadata
+
+    def test_adds_columns_and_indexes(self):
+        engine = create_engine("sqlite://")
+        self._tables().create_all(engine)
+        with engine.connect() as connection:
+            connection.exec_driver_sql('INSERT INTO "user" (id) VALUES (1)')
+            connection.commit()
+
+        current = self._tables(
+            Column("nickname", String(32), index=True),
+            Column("score", Integer, nullable=False, server_default="0"),
+        )
+        with engine.begin() as connection:
+            _add_missing_columns(current, connection)
+
+        inspector = inspect(engine)
+        assert {column["name"] for column in inspector.get_columns("user")} == {"id", "nickname", "score"}
+        assert [index["name"] for index in inspector.get_indexes("user")] == ["ix_user_nickname"]
+        assert {("user", "nickname"), ("user", "score")} <= added_columns
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('SELECT score FROM "user"').scalar() == 0
+
+    def test_not_null_without_default_needs_a_migration(self):
+        engine = create_engine("sqlite://")
+        self._tables().create_all(engine)
+        with engine.begin() as connection:
+            with pytest.raises(RuntimeError, match="user.score"):
+                _add_missing_columns(self._tables(Column("score", Integer, nullable=False)), connection)
+
+    def test_init_db_backfills_teacher_count(self, monkeypatch):
+        from sqlmodel import SQLModel, Session
+        from sqlmodel.pool import StaticPool
+        from app.config.config import settings
+        from app.core import db
+        from app.models.course_teacher import CourseTeacher
+        from app.models.user import User
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            teacher = User(email="backfill@example.com", full_name="Teacher", hashed_password="x")
+            course = Course(title="Staffed")
+            admin = User(email=settings.FIRST_SUPERUSER, full_name="Admin", hashed_password="x")
+            session.add_all([teacher, course, admin])
+            session.commit()
+            session.add(CourseTeacher(course_id=course.id, teacher_id=teacher.id))
+            session.commit()
+            course_id = course.id
+        # A course table from before the column
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE course DROP COLUMN teacher_count")
+
+        monkeypatch.setattr(db, "engine", engine)
+        db.init_db()
+
+        with Session(engine) as session:
+            assert session.get(Course, course_id).teacher_count == 1
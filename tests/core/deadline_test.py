@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core import deadline
+from app.core.deadline import DeadlineExceeded
+
+
+class TestDeadline:
+    """Test suite for request deadlines"""
+
+    def test_check_deadline(self):
+        token = deadline.set_deadline(10)
+        try:
+            deadline.check_deadline()
+            assert deadline.remaining() > 9
+        finally:
+            deadline.reset_deadline(token)
+
+        token = deadline.set_deadline(0)
+        try:
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                deadline.check_deadline()
+            assert exc_info.value.status_code == 504
+        finally:
+            deadline.reset_deadline(token)
+
+    def test_no_deadline_outside_requests(self):
+        assert deadline.remaining() is None
+        deadline.check_deadline()
+
+    def test_expired_deadline_interrupts_sqlite_query(self, session: Session):
+        slow_query = text(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000000) "
+            "SELECT count(*) FROM n"
+        )
+        session.exec(text("SELECT 1")).one()
+
+        token = deadline.set_deadline(0.01)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                session.exec(slow_query).one()
+        finally:
+            deadline.reset_deadline(token)
+            session.rollback()
@@ -0,0 +1,105 @@
+import json
+import multiprocessing
+import socket
+import threading
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.core.events import InMemoryEventBus, PostgresEventBus, UnixSocketEventBus
+from app.models.course import Course
+
+
+def _publish_from_child(directory: str) -> None:
+    UnixSocketEventBus(directory).publish("course.changed", {"seq": 42})
+
+
+class TestEventBus:
+    """Test suite for the domain event bus backends"""
+
+    def test_in_memory_dispatch(self):
+        bus = InMemoryEventBus()
+        received = []
+
+        def failing(payload):
+            raise RuntimeError("boom")
+
+        bus.subscribe("course.changed", failing)
+        bus.subscribe("course.changed", received.append)
+        bus.publish("course.changed", {"seq": 1})
+        bus.publish("other", {"seq": 2})
+
+        # A failing handler does not keep the others from running
+        assert received == [{"seq": 1}]
+
+        bus.unsubscribe("course.changed", received.append)
+        bus.publish("course.changed", {"seq": 3})
+        assert received == [{"seq": 1}]
+
+    def test_unix_socket_fan_out(self, tmp_path):
+        first, second = UnixSocketEventBus(str(tmp_path)), UnixSocketEventBus(str(tmp_path))
+        delivered = {first: threading.Event(), second: threading.Event()}
+        for bus in (first, second):
+            bus.subscribe("course.changed", lambda payload, bus=bus: delivered[bus].set())
+            bus.start()
+        try:
+            first.publish("course.changed", {"seq": 1})
+            assert delivered[first].wait(2)
+            assert delivered[second].wait(2)
+        finally:
+            first.stop()
+            second.stop()
+
+    def test_unix_socket_across_processes(self, tmp_path):
+        bus = UnixSocketEventBus(str(tmp_path))
+        received = []
+        delivered = threading.Event()
+        bus.subscribe("course.changed", lambda payload: (received.append(payload), delivered.set()))
+        bus.start()
+        try:
+            child = multiprocessing.get_context("fork").Process(target=_publish_from_child, args=(str(tmp_path),))
+            child.start()
+            child.join(5)
+            assert delivered.wait(2)
+            assert received == [{"seq": 42}]
+        finally:
+            bus.stop()
+
+    def test_unix_socket_removes_stale_sockets(self, tmp_path):
+        # A worker that died without stopping its bus leaves a socket file nobody reads
+        stale = tmp_path / "123-deadbeef.sock"
+        crashed = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        crashed.bind(str(stale))
+        crashed.close()
+
+        UnixSocketEventBus(str(tmp_path)).publish("course.changed", {"seq": 1})
+        assert not stale.exists()
+
+    def test_postgres_publishes_with_the_commit(self, tmp_path, monkeypatch):
+        from app.services import change_log_service
+
+        # One connection: a publish checking out its own would time out
+        engine = create_engine(f"sqlite:///{tmp_path}/events.db", pool_size=1, max_overflow=0, pool_timeout=0.5)
+        notified = []
+
+        @event.listens_for(engine, "connect")
+        def _pg_notify(dbapi_connection, _):
+            dbapi_connection.create_function(
+                "pg_notify", 2, lambda channel, message: notified.append((channel, json.loads(message)))
+            )
+
+        SQLModel.metadata.create_all(engine)
+        bus = PostgresEventBus(engine, "radegast_test")
+        monkeypatch.setattr(change_log_service, "event_bus", bus)
+
+        with Session(engine) as session:
+            session.add(Course(title="Notified"))
+            session.commit()
+
+        assert [(channel, message["topic"]) for channel, message in notified] == [("radegast_test", "course.changed")]
+        assert notified[0][1]["payload"]["entity"] == "course"
+        assert notified[0][1]["payload"]["created"] is True
+
+        with engine.connect() as connection:
+            bus.publish_in_transaction(connection, "course.changed", {"seq": 1, "data": "x" * 10_000})
+        assert notified[-1][1]["payload"] == {"seq": 1, "data": None, "truncated": True}
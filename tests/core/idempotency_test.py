@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.idempotency import (
+    DatabaseIdempotencyStore,
+    IdempotencyMiddleware,
+    InMemoryIdempotencyStore,
+    KeyState,
+    StoredResponse,
+)
+from app.services.auth_services import AuthService
+
+RESPONSE = StoredResponse(201, [(b"content-type", b"application/json")], b'{"id":1}')
+
+
+def _auth(email: str = "idem@example.com") -> dict:
+    return {"Authorization": f"Bearer {AuthService.create_access_token({'sub': email})}"}
+
+
+class TestIdempotency:
+    """Test suite for idempotency key stores and middleware"""
+
+    def _check_store(self, store):
+        assert store.begin("user:a", "f1") == (KeyState.NEW, None)
+        assert store.begin("user:a", "f1") == (KeyState.PENDING, None)
+        assert store.begin("user:a", "f2") == (KeyState.MISMATCH, None)
+
+        store.complete("user:a", RESPONSE)
+        assert store.begin("user:a", "f1") == (KeyState.DONE, RESPONSE)
+
+        assert store.begin("user:b", "f1")[0] is KeyState.NEW
+        store.abandon("user:b")
+        assert store.begin("user:b", "f1")[0] is KeyState.NEW
+
+    def test_in_memory_store(self):
+        self._check_store(InMemoryIdempotencyStore(max_keys=10, ttl=60, pending_timeout=60))
+
+    def test_in_memory_store_is_bounded(self):
+        store = InMemoryIdempotencyStore(max_keys=2, ttl=60, pending_timeout=60)
+        for key in "abc":
+            store.begin(key, "f")
+        assert len(store) == 2
+        assert store.begin("a", "f")[0] is KeyState.NEW
+
+    def test_database_store(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        store = DatabaseIdempotencyStore(engine, ttl=60, pending_timeout=60)
+        self._check_store(store)
+
+        expired = DatabaseIdempotencyStore(engine, ttl=-1, pending_timeout=60)
+        expired.complete("user:a", RESPONSE)
+        expired.purge_expired()
+        assert store.begin("user:a", "f1")[0] is KeyState.NEW
+
+    def test_concurrent_duplicate_waits_for_original(self):
+        calls = []
+
+        async def create(request):
+            calls.append(await request.body())
+            await asyncio.sleep(0.05)
+            return JSONResponse({"call": len(calls)}, status_code=201)
+
+        app = IdempotencyMiddleware(
+            Starlette(routes=[Route("/api/v1/things", create, methods=["POST"])]),
+            store=InMemoryIdempotencyStore(max_keys=10, ttl=60, pending_timeout=60),
+        )
+
+        async def scenario():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                headers = {**_auth(), "Idempotency-Key": "k1"}
+                first, second = await asyncio.gather(
+                    client.post("/api/v1/things", content=b"x", headers=headers),
+                    client.post("/api/v1/things", content=b"x", headers=headers),
+                )
+                other_user = await client.post(
+                    "/api/v1/things", content=b"x", headers={**_auth("other@example.com"), "Idempotency-Key": "k1"}
+                )
+            return first, second, other_user
+
+        first, second, other_user = asyncio.run(scenario())
+        assert len(calls) == 2
+        assert first.json() == second.json() == {"call": 1}
+        assert {first.headers.get("idempotent-replayed"), second.headers.get("idempotent-replayed")} == {None, "true"}
+        assert other_user.json() == {"call": 2}
+
+    @pytest.mark.parametrize("status_code", [503, 429, 409, 403, 401])
+    def test_transient_errors_are_not_stored(self, status_code):
+        calls = []
+
+        async def flaky(request):
+            calls.append(1)
+            return JSONResponse({}, status_code=status_code if len(calls) == 1 else 201)
+
+        app = IdempotencyMiddleware(
+            Starlette(routes=[Route("/api/v1/things", flaky, methods=["POST"])]),
+            store=InMemoryIdempotencyStore(max_keys=10, ttl=60, pending_timeout=60),
+        )
+
+        async def scenario():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                headers = {**_auth(), "Idempotency-Key": "retry"}
+                return [(await client.post("/api/v1/things", headers=headers)).status_code for _ in range(3)]
+
+        assert asyncio.run(scenario()) == [status_code, 201, 201]
+        assert len(calls) == 2
+
+    def test_validation_errors_are_stored(self):
+        calls = []
+
+        async def invalid(request):
+            calls.append(1)
+            return JSONResponse({"detail": "bad"}, status_code=422)
+
+        app = IdempotencyMiddleware(
+            Starlette(routes=[Route("/api/v1/things", invalid, methods=["POST"])]),
+            store=InMemoryIdempotencyStore(max_keys=10, ttl=60, pending_timeout=60),
+        )
+
+        async def scenario():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                headers = {**_auth(), "Idempotency-Key": "invalid"}
+                return [await client.post("/api/v1/things", headers=headers) for _ in range(2)]
+
+        first, second = asyncio.run(scenario())
+        assert first.status_code == second.status_code == 422
+        assert second.headers["idempotent-replayed"] == "true"
+        assert len(calls) == 1
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.core.jobs import JobRunner, register_job
+from app.services.job_service import JobService
+from app.enum.job_status_enum import JobStatus
+from app.models.job import Job
+
+
+@register_job("test_progress")
+def _progress_job(ctx, params):
+    for step in range(params["steps"]):
+        ctx.report((step + 1) / params["steps"], f"step {step + 1}")
+    return {"steps": params["steps"]}
+
+
+@register_job("test_fail")
+def _failing_job(ctx, params):
+    raise ValueError("bad input")
+
+
+@register_job("test_cancel")
+def _cancelled_job(ctx, params):
+    with ctx.session() as session:
+        job = session.get(Job, ctx.job_id)
+        job.cancel_requested = True
+        session.add(job)
+        session.commit()
+    ctx.check_cancelled()
+
+
+@register_job("test_wait")
+def _waiting_job(ctx, params):
+    # Until the runner stops or the job is cancelled
+    while True:
+        ctx.report(0.5)
+        time.sleep(0.01)
+
+
+class TestJobRunner:
+    """Test suite for the background job runner"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        # A file, not one shared in-memory connection: workers and the test poll from different threads
+        engine = create_engine(f"sqlite:///{tmp_path}/jobs.db", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        return engine
+
+    @pytest.fixture
+    def runner(self, engine):
+        return JobRunner(lambda: Session(engine), workers=1, max_queued=10, stale_seconds=60)
+
+    def _submit(self, engine, kind, **values) -> int:
+        with Session(engine) as session:
+            job = Job(kind=kind, **values)
+            session.add(job)
+            session.commit()
+            return job.id
+
+    def _job(self, engine, job_id) -> Job:
+        with Session(engine) as session:
+            return session.get(Job, job_id)
+
+    def test_job_succeeds_with_progress(self, engine, runner):
+        job_id = self._submit(engine, "test_progress", params={"steps": 2})
+        runner.run(job_id)
+
+        job = self._job(engine, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert (job.progress, job.message, job.result) == (1.0, "step 2", {"steps": 2})
+        assert job.started_at and job.finished_at
+
+    def test_job_failure_and_unknown_kind(self, engine, runner):
+        failing = self._submit(engine, "test_fail")
+        unknown = self._submit(engine, "no_such_kind")
+        runner.run(failing)
+        runner.run(unknown)
+
+        assert (self._job(engine, failing).status, self._job(engine, failing).error) == (JobStatus.FAILED, "bad input")
+        assert self._job(engine, unknown).status == JobStatus.FAILED
+
+    def test_job_cancellation(self, engine, runner):
+        job_id = self._submit(engine, "test_cancel")
+        runner.run(job_id)
+        assert self._job(engine, job_id).status == JobStatus.CANCELLED
+
+    def test_job_runs_once(self, engine, runner):
+        job_id = self._submit(engine, "test_progress", params={"steps": 1})
+        runner.run(job_id)
+        runner.run(job_id)
+        assert self._job(engine, job_id).result == {"steps": 1}
+
+    def test_pool_runs_recovered_jobs(self, engine, runner):
+        stale = self._submit(
+            engine, "test_progress", params={"steps": 1},
+            status=JobStatus.RUNNING, heartbeat_at=datetime.utcnow() - timedelta(minutes=5)
+        )
+        queued = self._submit(engine, "test_progress", params={"steps": 1})
+
+        runner.start()
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and any(
+                    self._job(engine, job_id).status != JobStatus.SUCCEEDED for job_id in (stale, queued)
+            ):
+                time.sleep(0.02)
+        finally:
+            runner.stop()
+
+        assert self._job(engine, stale).status == JobStatus.SUCCEEDED
+        assert self._job(engine, queued).status == JobStatus.SUCCEEDED
+
+    def test_cancel_after_claim_requests_cancellation(self, engine, runner):
+        job_id = self._submit(engine, "test_progress", params={"steps": 1})
+        # Claimed between the caller reading the job and cancelling it
+        runner._claim(job_id)
+        with Session(engine) as session:
+            job = JobService.cancel_job(session, job_id)
+        assert (job.status, job.cancel_requested) == (JobStatus.RUNNING, True)
+
+    def test_stop_releases_jobs_that_never_ran(self, engine, runner):
+        running = self._submit(engine, "test_wait")
+        pending = [self._submit(engine, "test_wait") for _ in range(3)]
+        runner.start()
+        deadline = time.monotonic() + 5
+        while self._job(engine, running).status != JobStatus.RUNNING and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        started = time.monotonic()
+        runner.stop(timeout=10)
+        assert time.monotonic() - started < 2
+        assert runner._local == set()
+        # Interrupted and never started jobs are all left for recovery
+        assert {self._job(engine, job_id).status for job_id in [running, *pending]} == {JobStatus.QUEUED}
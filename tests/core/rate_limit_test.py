@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from app.core.rate_limit import InMemoryTokenBucketBackend, parse_rate
+
+
+class TestRateLimit:
+    """Test suite for the in-memory token bucket store"""
+
+    def test_parse_rate(self):
+        assert parse_rate("10/minute") == (10, 10 / 60)
+        assert parse_rate("5/seconds") == (5, 5.0)
+
+    @pytest.mark.parametrize("rate", ["10/fortnight", "ten/minute", "10"])
+    def test_parse_rate_rejects_invalid(self, rate):
+        with pytest.raises(ValueError, match=rate):
+            parse_rate(rate)
+
+    def test_bucket_allows_burst_then_limits(self):
+        backend = InMemoryTokenBucketBackend(max_keys=10)
+        for _ in range(3):
+            assert backend.hit("login:a", capacity=3, refill_rate=1.0) == 0
+        retry_after = backend.hit("login:a", capacity=3, refill_rate=1.0)
+        assert 0 < retry_after <= 1.0
+
+        # Keys are independent
+        assert backend.hit("login:b", capacity=3, refill_rate=1.0) == 0
+
+    def test_bucket_refills(self):
+        backend = InMemoryTokenBucketBackend(max_keys=10)
+        assert backend.hit("k", capacity=1, refill_rate=100.0) == 0
+        assert backend.hit("k", capacity=1, refill_rate=100.0) > 0
+        time.sleep(0.02)
+        assert backend.hit("k", capacity=1, refill_rate=100.0) == 0
+
+    def test_idle_and_excess_keys_are_evicted(self):
+        backend = InMemoryTokenBucketBackend(max_keys=2)
+        backend.hit("a", capacity=1, refill_rate=1.0)
+        backend.hit("b", capacity=1, refill_rate=1.0)
+        backend.hit("c", capacity=1, refill_rate=1.0)
+        assert len(backend) == 2
+
+        backend = InMemoryTokenBucketBackend(max_keys=100)
+        backend.hit("idle", capacity=1, refill_rate=1000.0)
+        time.sleep(0.01)
+        backend.hit("fresh", capacity=1, refill_rate=1000.0)
+        assert len(backend) == 1
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.replicas import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware, ReplicaPool
+
+
+class TestReplicas:
+    """Test suite for read replica routing"""
+
+    def test_round_robin_skips_unhealthy_replicas(self):
+        pool = ReplicaPool(["sqlite://", "sqlite://"])
+        first, second = pool.engines
+
+        assert {pool.choose(), pool.choose()} == {first, second}
+
+        pool._set_health(0, False)
+        assert [pool.choose() for _ in range(3)] == [second] * 3
+
+        pool._set_health(1, False)
+        assert pool.choose() is None
+
+        pool.check_health()
+        assert {pool.choose(), pool.choose()} == {first, second}
+
+    def test_no_replicas_configured(self):
+        pool = ReplicaPool([])
+        assert not pool
+        assert pool.choose() is None
+
+    def test_writes_set_read_your_writes_cookie(self):
+        async def endpoint(request):
+            return PlainTextResponse("ok")
+
+        inner = Starlette(routes=[Route("/", endpoint, methods=["GET", "PATCH"])])
+        client = TestClient(ReadYourWritesMiddleware(inner, window_seconds=5))
+
+        response = client.get("/")
+        assert READ_YOUR_WRITES_COOKIE not in response.cookies
+
+        response = client.patch("/")
+        assert response.cookies[READ_YOUR_WRITES_COOKIE] == "1"
+        assert "Max-Age=5" in response.headers["set-cookie"]
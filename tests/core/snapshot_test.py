@@ -0,0 +1,92 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+from starlette.requests import Request
+
+from app.core.snapshot import FileSnapshot
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+class TestFileSnapshot:
+    """Test suite for pre-rendered file snapshots"""
+
+    @pytest.fixture
+    def renders(self):
+        return []
+
+    @pytest.fixture
+    def snapshot(self, tmp_path, renders):
+        def render():
+            renders.append(time.monotonic())
+            return {"items": json.dumps({"version": len(renders)}).encode()}
+
+        snapshot = FileSnapshot("test", str(tmp_path), render, debounce=0.1, max_delay=0.3, max_age=60.0)
+        yield snapshot
+        snapshot.stop()
+
+    def _wait_for(self, condition, timeout: float = 3.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.01)
+
+    def test_build_swaps_files(self, snapshot, tmp_path):
+        first = snapshot.build().documents["items"]
+        second = snapshot.build().documents["items"]
+
+        # The replaced build stays readable for responses still sending it
+        assert bytes(first.identity) == b'{"version": 1}'
+        assert gzip.decompress(first.gzip) == b'{"version": 1}'
+        assert first.etag != second.etag
+        assert sorted(os.listdir(tmp_path)) == ["test-items.json", "test-items.json.gz"]
+        assert (tmp_path / "test-items.json").read_bytes() == b'{"version": 2}'
+
+    def test_responses(self, snapshot):
+        assert snapshot.response("items", _request()) is None
+        etag = snapshot.build().documents["items"].etag
+
+        compressed = snapshot.response("items", _request(accept_encoding="br, gzip"))
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["etag"] == etag
+        assert gzip.decompress(compressed.body) == b'{"version": 1}'
+
+        plain = snapshot.response("items", _request(accept_encoding="gzip;q=0"))
+        assert "content-encoding" not in plain.headers
+        assert bytes(plain.body) == b'{"version": 1}'
+
+        assert snapshot.response("items", _request(if_none_match=f'"x", {etag}')).status_code == 304
+        assert snapshot.response("items", _request(if_none_match='W/"other"')).status_code == 200
+        assert snapshot.response("missing", _request()) is None
+
+    def test_changes_are_debounced(self, snapshot, renders):
+        snapshot.start()
+        self._wait_for(lambda: snapshot.current is not None)
+
+        for _ in range(3):
+            snapshot.invalidate()
+            time.sleep(0.02)
+        self._wait_for(lambda: len(renders) == 2)
+        time.sleep(0.2)
+        assert len(renders) == 2
+
+    def test_steady_changes_build_after_max_delay(self, snapshot, renders):
+        snapshot.start()
+        self._wait_for(lambda: snapshot.current is not None)
+
+        # Never quiet for the debounce, max_delay still forces a build
+        deadline = time.monotonic() + 0.8
+        while time.monotonic() < deadline:
+            snapshot.invalidate()
+            time.sleep(0.02)
+        assert len(renders) >= 2
@@ -185,3 +185,26 @@ class TestAuthRoutes:
         )
         token = response.json()["access_token"]
         return {"Authorization": f"Bearer {token}"}
+
+    def test_login_rate_limited_per_email(self, client: TestClient):
+        """Test repeated logins for one email are rejected with 429"""
+        for _ in range(10):
+            response = client.post(
+                "/api/v1/auth/token",
+                params={"email": "bruteforce@example.com", "password": "wrongpass123"}
+            )
+            assert response.status_code == 401
+
+        response = client.post(
+            "/api/v1/auth/token",
+            params={"email": "bruteforce@example.com", "password": "wrongpass123"}
+        )
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # Other accounts are not affected
+        response = client.post(
+            "/api/v1/auth/token",
+            params={"email": "someoneelse@example.com", "password": "wrongpass123"}
+        )
+        assert response.status_code == 401
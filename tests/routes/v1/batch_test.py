@@ -0,0 +1,146 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.course import Course
+from app.services.auth_services import AuthService
+
+
+class TestBatchRoutes:
+    """Test suite for the batch route"""
+
+    def _create_auth_user(self, client: TestClient, role: str = "admin", email: str = None):
+        """Helper method to create a user and return auth headers"""
+        if email is None:
+            email = f"{role}_batch@example.com"
+
+        response = client.post(
+            "/api/v1/auth/token/register",
+            json={
+                "email": email,
+                "password": "testpass123",
+                "full_name": f"{role.capitalize()} User",
+                "role": role
+            }
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_batch_requires_auth(self, client: TestClient, session: Session):
+        """Test that the batch endpoint needs a token"""
+        response = client.post("/api/v1/batch", json={"operations": []})
+        assert response.status_code == 403
+
+    def test_batch_reports_status_per_operation(self, client: TestClient, session: Session):
+        """Test that every operation gets its own status and body"""
+        headers = self._create_auth_user(client)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [
+                {"method": "POST", "path": "/courses/", "body": {"title": "Batched", "status": "draft"}},
+                {"method": "GET", "path": "/courses/", "query": {"fields": "title"}},
+                {"method": "GET", "path": "/courses/999"},
+            ]},
+            headers=headers
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [200, 200, 404]
+        assert results[0]["body"]["title"] == "Batched"
+        assert results[1]["body"] == [{"title": "Batched"}]
+        assert results[2]["body"] == {"detail": "Course not found"}
+
+    def test_batch_authenticates_once(self, client: TestClient, session: Session, monkeypatch):
+        """Test that the operations reuse the user resolved for the batch"""
+        headers = self._create_auth_user(client)
+        lookups = []
+        get_user = AuthService.get_user
+        monkeypatch.setattr(
+            AuthService, "get_user", staticmethod(lambda s, email: lookups.append(email) or get_user(s, email))
+        )
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [
+                {"method": "POST", "path": "/courses/", "body": {"title": f"Course {i}"}}
+                for i in range(3)
+            ]},
+            headers=headers
+        )
+
+        assert [result["status_code"] for result in response.json()["results"]] == [200, 200, 200]
+        assert lookups == ["admin_batch@example.com"]
+
+    def test_batch_enforces_operation_permissions(self, client: TestClient, session: Session):
+        """Test that operations are authorized as the calling user"""
+        headers = self._create_auth_user(client, "guest")
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [{"method": "POST", "path": "/courses/", "body": {"title": "Nope"}}]},
+            headers=headers
+        )
+
+        assert response.json()["results"][0]["status_code"] == 403
+
+    def test_atomic_batch_commits_all(self, client: TestClient, session: Session):
+        """Test that a successful atomic batch keeps every change"""
+        headers = self._create_auth_user(client)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"atomic": True, "operations": [
+                {"method": "POST", "path": "/courses/", "body": {"title": "First"}},
+                {"method": "POST", "path": "/courses/", "body": {"title": "Second"}},
+            ]},
+            headers=headers
+        )
+
+        assert [result["status_code"] for result in response.json()["results"]] == [200, 200]
+        titles = client.get("/api/v1/courses/", params={"fields": "title"}).json()
+        assert titles == [{"title": "First"}, {"title": "Second"}]
+
+    def test_atomic_batch_rolls_back_on_failure(self, client: TestClient, session: Session):
+        """Test that a failing operation undoes the earlier ones and skips the rest"""
+        headers = self._create_auth_user(client)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"atomic": True, "operations": [
+                {"method": "POST", "path": "/courses/", "body": {"title": "Rolled back"}},
+                {"method": "DELETE", "path": "/courses/999"},
+                {"method": "POST", "path": "/courses/", "body": {"title": "Never created"}},
+            ]},
+            headers=headers
+        )
+
+        assert response.status_code == 200
+        assert [result["status_code"] for result in response.json()["results"]] == [200, 404, 424]
+        session.expire_all()
+        assert session.exec(select(Course)).all() == []
+
+    def test_batch_cannot_be_nested(self, client: TestClient, session: Session):
+        """Test that an operation cannot call the batch endpoint"""
+        headers = self._create_auth_user(client)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [{"method": "POST", "path": "/batch", "body": {"operations": []}}]},
+            headers=headers
+        )
+
+        assert response.status_code == 400
+
+    def test_batch_rejects_streaming_endpoints(self, client: TestClient, session: Session):
+        """Test that an operation cannot open the never ending course event stream"""
+        headers = self._create_auth_user(client)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [{"method": "GET", "path": "/courses/events"}]},
+            headers=headers
+        )
+
+        assert response.status_code == 400
+        assert "Streaming" in response.json()["detail"]
@@ -1,11 +1,18 @@
+from datetime import datetime
 from typing import Type
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
 from sqlmodel import Session, select
 
+from app.config.config import settings
+from app.enum.teacher_role_enum import TeacherRole
 from app.models.user import User
 from app.models.course import Course
+from app.models.course_teacher import CourseTeacher
+from app.services.course_teacher_service import CourseTeacherService
 
 
 class TestCourseTeacherRoutes:
@@ -277,4 +284,475 @@ class TestCourseTeacherRoutes:
             f"/api/v1/courses/{test_course.id}/teachers/{teacher_user.id}",
             headers={"Authorization": f"Bearer {teacher_token}"}
         )
-        assert response.status_code == 403
\ No newline at end of file
+        assert response.status_code == 403
+
+    def test_get_course_teachers_deadline_exceeded(
+            self,
+            client: TestClient,
+            test_course: Course,
+            monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "REQUEST_DEADLINES", {"get_course_teachers": 0.0})
+
+        response = client.get(f"/api/v1/courses/{test_course.id}/teachers/")
+        assert response.status_code == 504
+        assert response.json()["detail"] == "Request deadline exceeded"
+
+    def test_staffing_fields_follow_assignments(
+            self,
+            client: TestClient,
+            session: Session,
+            test_course: Course,
+            teacher_user: User,
+            admin_user: User,
+            admin_token: str
+    ):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": teacher_user.id, "role": "PRIMARY"},
+            headers=headers
+        )
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": admin_user.id, "role": "ASSISTANT"},
+            headers=headers
+        )
+
+        data = client.get(f"/api/v1/courses/{test_course.id}").json()
+        assert data["teacher_count"] == 2
+        assert data["teacher_id"] == teacher_user.id
+
+        # Demoting the primary teacher clears it, promoting another sets it
+        client.patch(
+            f"/api/v1/courses/{test_course.id}/teachers/{teacher_user.id}",
+            json={"role": "ASSISTANT"},
+            headers=headers
+        )
+        assert client.get(f"/api/v1/courses/{test_course.id}").json()["teacher_id"] is None
+
+        client.patch(
+            f"/api/v1/courses/{test_course.id}/teachers/{admin_user.id}",
+            json={"role": "PRIMARY"},
+            headers=headers
+        )
+        client.delete(f"/api/v1/courses/{test_course.id}/teachers/{teacher_user.id}", headers=headers)
+
+        data = client.get(f"/api/v1/courses/{test_course.id}").json()
+        assert data["teacher_count"] == 1
+        assert data["teacher_id"] == admin_user.id
+
+        client.delete(f"/api/v1/courses/{test_course.id}/teachers/{admin_user.id}", headers=headers)
+        data = client.get(f"/api/v1/courses/{test_course.id}").json()
+        assert data["teacher_count"] == 0
+        assert data["teacher_id"] is None
+
+    def test_repair_course_staffing(
+            self,
+            session: Session,
+            test_course: Course,
+            teacher_user: User
+    ):
+        session.add(CourseTeacher(course_id=test_course.id, teacher_id=teacher_user.id, role=TeacherRole.PRIMARY))
+        session.commit()
+
+        assert CourseTeacherService.repair_course_staffing(session) == 1
+        session.refresh(test_course)
+        assert test_course.teacher_count == 1
+        assert test_course.teacher_id == teacher_user.id
+
+        # Nothing drifted, nothing to repair
+        assert CourseTeacherService.repair_course_staffing(session) == 0
+
+    def test_list_courses_include_teachers(
+            self,
+            client: TestClient,
+            engine,
+            session: Session,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str
+    ):
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": teacher_user.id, "role": "PRIMARY"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        for idx in range(5):
+            session.add(Course(title=f"Extra Course {idx}"))
+        session.commit()
+        session.expire_all()
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get("/api/v1/courses/", params={"include": "teachers"})
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 6
+        assert len(statements) == 2
+
+        staffed = next(course for course in data if course["id"] == test_course.id)
+        assert staffed["teachers"][0]["teacher_id"] == teacher_user.id
+        assert staffed["teachers"][0]["teacher_name"] == "Teacher User"
+        assert all(course["teachers"] == [] for course in data if course["id"] != test_course.id)
+
+        # Without include the payload is unchanged
+        assert "teachers" not in client.get("/api/v1/courses/").json()[0]
+
+    def test_get_course_include_teachers(
+            self,
+            client: TestClient,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str
+    ):
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": teacher_user.id, "role": "ASSISTANT"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.get(f"/api/v1/courses/{test_course.id}", params={"include": "teachers"})
+        assert response.status_code == 200
+        teachers = response.json()["teachers"]
+        assert len(teachers) == 1
+        assert teachers[0]["role"] == "ASSISTANT"
+        assert teachers[0]["teacher_email"] == "teacher@example.com"
+
+    def test_get_course_teachers_sparse_fields(
+            self,
+            client: TestClient,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str
+    ):
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": teacher_user.id, "role": "PRIMARY"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.get(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            params={"fields": "teacher_name,role"}
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"role": "PRIMARY", "teacher_name": "Teacher User"}]
+
+        response = client.get("/api/v1/courses/99999/teachers/", params={"fields": "role"})
+        assert response.status_code == 404
+
+    def test_assignment_changes_in_feed(
+            self,
+            client: TestClient,
+            session: Session,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str
+    ):
+        since = client.get("/api/v1/courses/changes").json()["next_cursor"]
+        client.post(
+            f"/api/v1/courses/{test_course.id}/teachers/",
+            json={"teacher_id": teacher_user.id, "role": "PRIMARY"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        client.delete(
+            f"/api/v1/courses/{test_course.id}/teachers/{teacher_user.id}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        changes = client.get("/api/v1/courses/changes", params={"since": since}).json()["changes"]
+        assert {(change["entity"], change["operation"]) for change in changes[:2]} == {
+            ("course", "upsert"), ("course_teacher", "upsert")
+        }
+        assert {(change["entity"], change["operation"]) for change in changes[2:]} == {
+            ("course", "upsert"), ("course_teacher", "delete")
+        }
+        assert all(change["course_id"] == test_course.id for change in changes)
+        staffed = next(change for change in changes[:2] if change["entity"] == "course")
+        assert staffed["data"]["teacher_count"] == 1
+        assert staffed["data"]["teacher_id"] == teacher_user.id
+
+    def _scheduled_courses(self, session: Session, *periods) -> list:
+        courses = [
+            Course(title=f"Course {n}", start_date=datetime(2025, *start), end_date=datetime(2025, *end))
+            for n, (start, end) in enumerate(periods)
+        ]
+        session.add_all(courses)
+        session.commit()
+        return [course.id for course in courses]
+
+    def _assign(self, client: TestClient, token: str, course_id: int, teacher_id: int):
+        return client.post(
+            f"/api/v1/courses/{course_id}/teachers/",
+            json={"teacher_id": teacher_id, "role": "ASSISTANT"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    @pytest.mark.parametrize("policy,code,header", [
+        ("allow", 201, None), ("warn", 201, "first"), ("reject", 409, None)
+    ])
+    def test_assign_overlapping_course_policy(
+            self,
+            client: TestClient,
+            session: Session,
+            teacher_user: User,
+            admin_token: str,
+            monkeypatch: pytest.MonkeyPatch,
+            policy: str,
+            code: int,
+            header
+    ):
+        monkeypatch.setattr(settings, "TEACHER_OVERLAP_POLICY", policy)
+        first, overlapping, later = self._scheduled_courses(
+            session, ((1, 1), (3, 31)), ((3, 1), (6, 30)), ((4, 1), (4, 30))
+        )
+        assert self._assign(client, admin_token, first, teacher_user.id).status_code == 201
+
+        response = self._assign(client, admin_token, overlapping, teacher_user.id)
+        assert response.status_code == code
+        assert response.headers.get("X-Schedule-Conflicts") == (str(first) if header else None)
+
+        # Does not touch the first course
+        response = self._assign(client, admin_token, later, teacher_user.id)
+        if policy == "reject":
+            assert response.status_code == 201
+        elif policy == "warn":
+            assert response.headers["X-Schedule-Conflicts"] == str(overlapping)
+
+    def test_assign_unscheduled_course_never_conflicts(
+            self,
+            client: TestClient,
+            session: Session,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str,
+            monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "TEACHER_OVERLAP_POLICY", "reject")
+        scheduled, = self._scheduled_courses(session, ((1, 1), (12, 31)))
+        assert self._assign(client, admin_token, scheduled, teacher_user.id).status_code == 201
+        assert self._assign(client, admin_token, test_course.id, teacher_user.id).status_code == 201
+
+    def test_overlap_check_locks_the_teacher(
+            self,
+            client: TestClient,
+            session: Session,
+            test_course: Course,
+            teacher_user: User,
+            admin_token: str,
+            monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test the overlap check runs with the teacher row locked, so concurrent assignments queue up"""
+        monkeypatch.setattr(settings, "TEACHER_OVERLAP_POLICY", "reject")
+        locked = []
+
+        def collect(orm_execute_state):
+            if not orm_execute_state.is_select:
+                return
+            # As Postgres would run it, SQLite drops FOR UPDATE
+            sql = str(orm_execute_state.statement.compile(dialect=postgresql.dialect()))
+            if sql.rstrip().endswith("FOR UPDATE"):
+                locked.extend(entity["entity"] for entity in orm_execute_state.statement.column_descriptions)
+
+        event.listen(session, "do_orm_execute", collect)
+        try:
+            assert self._assign(client, admin_token, test_course.id, teacher_user.id).status_code == 201
+        finally:
+            event.remove(session, "do_orm_execute", collect)
+        assert locked == [User]
+
+    def test_list_teacher_conflicts(
+            self,
+            client: TestClient,
+            session: Session,
+            teacher_user: User,
+            admin_user: User,
+            admin_token: str,
+            teacher_token: str
+    ):
+        a, b, c, d = self._scheduled_courses(
+            session, ((1, 1), (1, 31)), ((1, 15), (2, 15)), ((1, 20), (1, 25)), ((3, 1), (3, 31))
+        )
+        for course_id in (a, b, c, d):
+            self._assign(client, admin_token, course_id, teacher_user.id)
+        # Another teacher on overlapping dates is no conflict
+        self._assign(client, admin_token, a, admin_user.id)
+
+        response = client.get("/api/v1/courses/conflicts", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        pairs = {(row["course_id"], row["conflicting_course_id"]) for row in response.json()}
+        assert pairs == {(a, b), (a, c), (b, c)}
+        assert all(row["teacher_id"] == teacher_user.id for row in response.json())
+        overlap = next(row for row in response.json() if (row["course_id"], row["conflicting_course_id"]) == (a, b))
+        assert (overlap["overlap_start"], overlap["overlap_end"]) == ("2025-01-15T00:00:00", "2025-01-31T00:00:00")
+
+        forbidden = client.get("/api/v1/courses/conflicts", headers={"Authorization": f"Bearer {teacher_token}"})
+        assert forbidden.status_code == 403
+
+    def test_bulk_delete_courses_with_teachers(
+            self,
+            client: TestClient,
+            session: Session,
+            engine,
+            teacher_user: User,
+            admin_user: User,
+            admin_token: str
+    ):
+        courses = [Course(title=f"Doomed {n}") for n in range(3)]
+        session.add_all(courses)
+        session.commit()
+        ids = [course.id for course in courses]
+        for course_id in ids:
+            for user in (teacher_user, admin_user):
+                self._assign(client, admin_token, course_id, user.id)
+        since = client.get("/api/v1/courses/changes").json()["next_cursor"]
+
+        deletes = []
+
+        def count_delete(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("DELETE"):
+                deletes.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count_delete)
+        try:
+            response = client.post(
+                "/api/v1/courses/bulk-delete",
+                json={"ids": [*ids, 9999]},
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_delete)
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": ids, "missing": [9999]}
+        assert len(deletes) == 2
+        assert session.exec(select(CourseTeacher)).all() == []
+        assert client.get(f"/api/v1/courses/{ids[0]}").status_code == 404
+
+        changes = client.get("/api/v1/courses/changes", params={"since": since}).json()["changes"]
+        assert {change["operation"] for change in changes} == {"delete"}
+        assert sorted(change["entity"] for change in changes) == ["course"] * 3 + ["course_teacher"] * 6
+
+    def test_bulk_delete_empty_list(self, client: TestClient, admin_token: str):
+        response = client.post(
+            "/api/v1/courses/bulk-delete",
+            json={"ids": []},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"deleted": [], "missing": []}
+
+    def test_bulk_delete_requires_admin(self, client: TestClient, test_course: Course, teacher_token: str):
+        response = client.post(
+            "/api/v1/courses/bulk-delete",
+            json={"ids": [test_course.id]},
+            headers={"Authorization": f"Bearer {teacher_token}"}
+        )
+        assert response.status_code == 403
+
+    def test_clone_course_with_teachers(
+            self,
+            client: TestClient,
+            session: Session,
+            teacher_user: User,
+            admin_user: User,
+            admin_token: str
+    ):
+        source, = self._scheduled_courses(session, ((1, 10), (3, 20)))
+        self._assign(client, admin_token, source, teacher_user.id)
+        client.post(
+            f"/api/v1/courses/{source}/teachers/",
+            json={"teacher_id": admin_user.id, "role": "PRIMARY"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        response = client.post(
+            f"/api/v1/courses/{source}/clone",
+            json={"title": "Course 0 (autumn)", "shift_days": 30, "status": "active"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["id"] != source
+        assert data["cloned_from_id"] == source
+        assert data["title"] == "Course 0 (autumn)"
+        assert data["status"] == "active"
+        assert data["start_date"] == "2025-02-09T00:00:00"
+        assert data["end_date"] == "2025-04-19T00:00:00"
+        assert data["teacher_count"] == 2
+        assert data["teacher_id"] == admin_user.id
+
+        teachers = client.get(f"/api/v1/courses/{data['id']}/teachers/").json()
+        assert {(teacher["teacher_id"], teacher["role"]) for teacher in teachers} == {
+            (teacher_user.id, "ASSISTANT"), (admin_user.id, "PRIMARY")
+        }
+        assert len(client.get(f"/api/v1/courses/{source}/teachers/").json()) == 2
+
+    def test_clone_course_without_teachers(
+            self, client: TestClient, session: Session, test_course: Course, teacher_user: User, admin_token: str
+    ):
+        self._assign(client, admin_token, test_course.id, teacher_user.id)
+        response = client.post(
+            f"/api/v1/courses/{test_course.id}/clone",
+            json={"include_teachers": False},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 201
+        assert response.json()["title"] == test_course.title
+        assert response.json()["status"] == "draft"
+        assert response.json()["teacher_count"] == 0
+        assert client.get(f"/api/v1/courses/{response.json()['id']}/teachers/").json() == []
+
+        missing = client.post("/api/v1/courses/9999/clone", json={},
+                              headers={"Authorization": f"Bearer {admin_token}"})
+        assert missing.status_code == 404
+
+    def test_bulk_clone_courses_by_status(
+            self,
+            client: TestClient,
+            session: Session,
+            engine,
+            teacher_user: User,
+            admin_token: str
+    ):
+        term = [Course(title=f"Term {n}", status="active") for n in range(3)]
+        session.add_all([*term, Course(title="Draft", status="draft")])
+        session.commit()
+        for course in term:
+            self._assign(client, admin_token, course.id, teacher_user.id)
+        since = client.get("/api/v1/courses/changes").json()["next_cursor"]
+
+        inserts = []
+
+        def count_insert(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith(("INSERT INTO course ", "INSERT INTO courseteacher ")):
+                inserts.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count_insert)
+        try:
+            response = client.post(
+                "/api/v1/courses/clone",
+                json={"source_status": "active", "status": "draft"},
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_insert)
+
+        assert response.status_code == 201
+        clones = response.json()
+        assert [clone["cloned_from_id"] for clone in clones] == [course.id for course in term]
+        assert all(clone["status"] == "draft" and clone["teacher_count"] == 1 for clone in clones)
+        # One INSERT ... SELECT for the courses, one for their teachers
+        assert len(inserts) == 2
+
+        changes = client.get("/api/v1/courses/changes", params={"since": since}).json()["changes"]
+        assert sorted(change["entity"] for change in changes) == ["course"] * 3 + ["course_teacher"] * 3
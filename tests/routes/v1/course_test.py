@@ -291,4 +291,465 @@ class TestCourseRoutes:
         response = self._create_course(client, headers, course_data)
         assert response.status_code == 422
 
+    # Sparse fieldsets
+    def test_list_courses_sparse_fields(self, client: TestClient, session: Session):
+        """Test fields= narrows the list payload"""
+        headers = self._create_auth_user(client, "admin", "sparse_list@example.com")
+        self._create_course(client, headers)
 
+        response = client.get("/api/v1/courses/", params={"fields": "status, id,title"})
+        assert response.status_code == 200
+        assert response.json() == [{"id": 1, "title": "Test Course", "status": "draft"}]
+
+    def test_get_course_sparse_fields_with_teachers(self, client: TestClient, session: Session):
+        """Test fields= combined with include=teachers"""
+        headers = self._create_auth_user(client, "admin", "sparse_get@example.com")
+        course_id = self._create_course(client, headers).json()["id"]
+
+        response = client.get(
+            f"/api/v1/courses/{course_id}",
+            params={"fields": "title", "include": "teachers"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"title": "Test Course", "teachers": []}
+
+        response = client.get("/api/v1/courses/99999", params={"fields": "title"})
+        assert response.status_code == 404
+
+    def test_sparse_fields_unknown_field(self, client: TestClient):
+        """Test fields= rejects fields that are not on the read model"""
+        response = client.get("/api/v1/courses/", params={"fields": "title,hashed_password"})
+        assert response.status_code == 400
+        assert "hashed_password" in response.json()["detail"]
+
+    def test_sparse_fields_narrow_projection(self):
+        """Test only the selected columns are loaded and statements are cached"""
+        from app.services.course_service import COURSE_FIELDS
+
+        statement = COURSE_FIELDS.statement(COURSE_FIELDS.parse("title,id"))
+        assert statement is COURSE_FIELDS.statement(COURSE_FIELDS.parse("id,title"))
+        assert [column.name for column in statement.selected_columns] == ["title", "id"]
+
+    # Batch lookups
+    def test_get_courses_by_ids(self, client: TestClient, session: Session):
+        """Test ids= returns courses in request order and reports missing ids"""
+        headers = self._create_auth_user(client, "admin", "batch_get@example.com")
+        first = self._create_course(client, headers, {"title": "First"}).json()["id"]
+        second = self._create_course(client, headers, {"title": "Second"}).json()["id"]
+
+        response = client.get("/api/v1/courses/", params={"ids": f"{second},999,{first},{second}"})
+        assert response.status_code == 200
+        assert [course["title"] for course in response.json()] == ["Second", "First"]
+        assert response.headers["X-Missing-Ids"] == "999"
+
+        response = client.get("/api/v1/courses/", params={"ids": f"{first}", "fields": "title"})
+        assert response.json() == [{"title": "First"}]
+        assert "X-Missing-Ids" not in response.headers
+
+    def test_batch_get_courses_post(self, client: TestClient, session: Session):
+        """Test the POST variant of the batch lookup"""
+        headers = self._create_auth_user(client, "admin", "batch_post@example.com")
+        course_id = self._create_course(client, headers).json()["id"]
+
+        response = client.post("/api/v1/courses/batch", json={"ids": [404, course_id]})
+        assert response.status_code == 200
+        assert [course["id"] for course in response.json()] == [course_id]
+        assert response.headers["X-Missing-Ids"] == "404"
+
+    def test_batch_get_courses_limits(self, client: TestClient, monkeypatch):
+        """Test invalid and oversized id lists are rejected"""
+        from app.config.config import settings
+        monkeypatch.setattr(settings, "COURSE_BATCH_MAX_IDS", 2)
+
+        assert client.get("/api/v1/courses/", params={"ids": "1,x"}).status_code == 400
+        assert client.post("/api/v1/courses/batch", json={"ids": [1, 2, 3]}).status_code == 400
+
+    # Change feed
+    def test_course_changes_feed(self, client: TestClient, session: Session):
+        """Test writes show up in the change feed in order and can be paged by cursor"""
+        headers = self._create_auth_user(client, "admin", "changes@example.com")
+        course_id = self._create_course(client, headers, {"title": "Tracked"}).json()["id"]
+        client.patch(f"/api/v1/courses/{course_id}", json={"title": "Renamed"}, headers=headers)
+        client.delete(f"/api/v1/courses/{course_id}", headers=headers)
+
+        response = client.get("/api/v1/courses/changes")
+        assert response.status_code == 200
+        page = response.json()
+        changes = page["changes"]
+        assert [(change["entity"], change["operation"]) for change in changes] == [
+            ("course", "upsert"), ("course", "upsert"), ("course", "delete")
+        ]
+        assert changes[1]["data"]["title"] == "Renamed"
+        assert changes[2]["data"] is None
+        assert page["next_cursor"] == changes[-1]["seq"]
+        assert page["has_more"] is False
+
+        first_page = client.get("/api/v1/courses/changes", params={"limit": 2}).json()
+        assert first_page["has_more"] is True
+        rest = client.get("/api/v1/courses/changes", params={"since": first_page["next_cursor"]}).json()
+        assert [change["seq"] for change in rest["changes"]] == [changes[2]["seq"]]
+
+    def test_course_changes_skip_failed_writes(self, client: TestClient, session: Session):
+        """Test rolled back writes leave nothing in the change feed"""
+        headers = self._create_auth_user(client, "admin", "changes_batch@example.com")
+
+        client.post(
+            "/api/v1/batch",
+            json={"atomic": True, "operations": [
+                {"method": "POST", "path": "/courses/", "body": {"title": "Rolled back"}},
+                {"method": "DELETE", "path": "/courses/999"},
+            ]},
+            headers=headers
+        )
+
+        assert client.get("/api/v1/courses/changes").json()["changes"] == []
+
+    def test_course_changes_compaction(self, client: TestClient, session: Session):
+        """Test compaction keeps the latest entry per row and expires old tombstones"""
+        from app.services.change_log_service import ChangeLogService
+
+        headers = self._create_auth_user(client, "admin", "changes_compact@example.com")
+        kept = self._create_course(client, headers, {"title": "Kept"}).json()["id"]
+        client.patch(f"/api/v1/courses/{kept}", json={"title": "Kept v2"}, headers=headers)
+        deleted = self._create_course(client, headers, {"title": "Deleted"}).json()["id"]
+        client.delete(f"/api/v1/courses/{deleted}", headers=headers)
+        old_cursor = client.get("/api/v1/courses/changes", params={"limit": 1}).json()["next_cursor"]
+
+        assert ChangeLogService.compact(session, retention_days=0) == 3
+
+        changes = client.get("/api/v1/courses/changes").json()["changes"]
+        assert [(change["entity_id"], change["data"]["title"]) for change in changes] == [(kept, "Kept v2")]
+        assert client.get("/api/v1/courses/changes", params={"since": old_cursor}).status_code == 410
+
+    # Event stream
+    def test_course_events_replay_then_resync(self, client: TestClient, session: Session, monkeypatch):
+        """Test a reconnecting client gets missed changes, then a resync when too far behind"""
+        from app.config.config import settings
+        monkeypatch.setattr(settings, "SSE_REPLAY_LIMIT", 1)
+
+        headers = self._create_auth_user(client, "admin", "events@example.com")
+        first = self._create_course(client, headers, {"title": "First"}).json()["id"]
+        self._create_course(client, headers, {"title": "Second"})
+
+        response = client.get("/api/v1/courses/events", headers={"Last-Event-ID": "0"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        messages = response.text.strip().split("\n\n")
+        assert messages[0].startswith("event: change\nid: ")
+        assert f'"entity_id":{first}' in messages[0]
+        assert messages[1].startswith("event: resync\n")
+
+    def test_course_events_capacity(self, client: TestClient, monkeypatch):
+        """Test new streams are refused once the broadcaster is full"""
+        from app.core.broadcast import broadcaster
+        monkeypatch.setattr(broadcaster, "max_subscribers", 0)
+
+        assert client.get("/api/v1/courses/events").status_code == 503
+
+    def test_course_writes_are_published(self, client: TestClient, session: Session):
+        """Test committed course changes reach event stream subscribers"""
+        import asyncio
+        from app.core.broadcast import broadcaster
+
+        headers = self._create_auth_user(client, "admin", "events_live@example.com")
+
+        async def scenario():
+            subscription = broadcaster.subscribe()
+            try:
+                course_id = self._create_course(client, headers, {"title": "Live"}).json()["id"]
+                event = await asyncio.wait_for(subscription.queue.get(), 1)
+            finally:
+                broadcaster.unsubscribe(subscription)
+            assert (event["entity"], event["entity_id"], event["operation"]) == ("course", course_id, "upsert")
+
+        asyncio.run(scenario())
+
+    def test_active_courses_follow_domain_events(self, client: TestClient, session: Session):
+        """Test the active course gauge is kept from course created and deleted events"""
+        from app.core.metrics import active_courses
+
+        headers = self._create_auth_user(client, "admin", "gauge@example.com")
+        before = active_courses._value.get()
+        course_id = self._create_course(client, headers).json()["id"]
+        client.patch(f"/api/v1/courses/{course_id}", json={"title": "Renamed"}, headers=headers)
+        assert active_courses._value.get() == before + 1
+
+        client.delete(f"/api/v1/courses/{course_id}", headers=headers)
+        assert active_courses._value.get() == before
+
+    # Idempotency keys
+    def test_create_course_idempotency_key(self, client: TestClient, session: Session):
+        """Test a retried create with the same Idempotency-Key replays the first response"""
+        headers = {**self._create_auth_user(client, "admin", "idempotent@example.com"),
+                   "Idempotency-Key": "create-course-1"}
+        course_data = {"title": "Once"}
+
+        first = client.post("/api/v1/courses/", json=course_data, headers=headers)
+        retry = client.post("/api/v1/courses/", json=course_data, headers=headers)
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert len(client.get("/api/v1/courses/").json()) == 1
+
+        reused = client.post("/api/v1/courses/", json={"title": "Other"}, headers=headers)
+        assert reused.status_code == 422
+
+    # Audit log
+    def test_course_mutations_are_audited(self, client: TestClient, session: Session, engine, monkeypatch):
+        """Test admin creates, updates and deletes end up in the audit log once flushed"""
+        from sqlmodel import select
+        from app.core.audit import audit_log
+        from app.models.audit import AuditEvent
+
+        monkeypatch.setattr(audit_log, "session_factory", lambda: Session(engine))
+        headers = self._create_auth_user(client, "admin", "audited@example.com")
+        course_id = self._create_course(client, headers).json()["id"]
+        client.patch(f"/api/v1/courses/{course_id}", json={"title": "Renamed"}, headers=headers)
+        client.delete(f"/api/v1/courses/{course_id}", headers=headers)
+        bulk_id = self._create_course(client, headers, {"title": "Bulk"}).json()["id"]
+        client.post("/api/v1/courses/bulk-delete", json={"ids": [bulk_id]}, headers=headers)
+
+        audit_log.flush()
+        events = session.exec(
+            select(AuditEvent).where(AuditEvent.actor_email == "audited@example.com").order_by(AuditEvent.id)
+        ).all()
+        assert [event.action for event in events[:3]] == ["course.create", "course.update", "course.delete"]
+        assert all(event.course_id == course_id for event in events[:3])
+        assert events[1].details == {"title": "Renamed"}
+        # Deletions still say what was deleted
+        assert events[2].details == {"title": "Renamed"}
+        assert (events[-1].action, events[-1].course_id, events[-1].details) == (
+            "course.delete", bulk_id, {"title": "Bulk"}
+        )
+
+    # Search
+    def test_search_courses_ranked(self, client: TestClient, session: Session):
+        """Test search matches every term and ranks title matches above description matches"""
+        headers = self._create_auth_user(client, "admin", "search@example.com")
+        described = self._create_course(client, headers, {"title": "Statistics",
+                                                          "description": "Uses linear algebra"}).json()["id"]
+        titled = self._create_course(client, headers, {"title": "Linear Algebra"}).json()["id"]
+        self._create_course(client, headers, {"title": "Linear Programming"})
+
+        response = client.get("/api/v1/courses/search", params={"q": "linear algebra"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [course["id"] for course in data["courses"]] == [titled, described]
+        assert data["has_more"] is False
+        assert data["courses"][0]["rank"] > data["courses"][1]["rank"]
+
+    def test_search_courses_prefix_and_updates(self, client: TestClient, session: Session):
+        """Test the last term matches as a prefix and the index follows updates and deletes"""
+        headers = self._create_auth_user(client, "admin", "typeahead@example.com")
+        course_id = self._create_course(client, headers, {"title": "Calculus"}).json()["id"]
+
+        assert [c["id"] for c in client.get("/api/v1/courses/search?q=calc").json()["courses"]] == [course_id]
+
+        client.patch(f"/api/v1/courses/{course_id}", json={"title": "Geometry"}, headers=headers)
+        assert client.get("/api/v1/courses/search?q=calc").json()["courses"] == []
+        assert len(client.get("/api/v1/courses/search?q=geo").json()["courses"]) == 1
+
+        client.delete(f"/api/v1/courses/{course_id}", headers=headers)
+        assert client.get("/api/v1/courses/search?q=geo").json()["courses"] == []
+
+    def test_search_courses_pagination(self, client: TestClient, session: Session):
+        """Test search pages with limit and offset"""
+        headers = self._create_auth_user(client, "admin", "search_pages@example.com")
+        for number in range(3):
+            self._create_course(client, headers, {"title": f"Physics {number}"})
+
+        first = client.get("/api/v1/courses/search", params={"q": "physics", "limit": 2}).json()
+        assert len(first["courses"]) == 2
+        assert first["has_more"] is True
+        second = client.get("/api/v1/courses/search",
+                            params={"q": "physics", "limit": 2, "offset": first["next_offset"]}).json()
+        assert len(second["courses"]) == 1
+        assert second["has_more"] is False
+        assert second["next_offset"] is None
+
+    def test_search_courses_ignores_operators(self, client: TestClient):
+        """Test punctuation and FTS syntax in the query are not interpreted"""
+        response = client.get("/api/v1/courses/search", params={"q": '"* OR NEAR( -'})
+        assert response.status_code == 200
+        assert response.json()["courses"] == []
+
+    # Date driven status transitions
+    def test_scheduled_status_transitions(self, client: TestClient, session: Session):
+        """Test started drafts are activated and ended courses archived, in batches, with change entries"""
+        from datetime import datetime
+        from app.services.course_schedule_service import CourseScheduleService
+
+        headers = self._create_auth_user(client, "admin", "schedule@example.com")
+        courses = {
+            "started": {"title": "Started", "start_date": "2025-01-01T00:00:00", "end_date": "2025-12-31T00:00:00"},
+            "ended": {"title": "Ended", "status": "active", "start_date": "2024-01-01T00:00:00",
+                      "end_date": "2024-12-31T00:00:00"},
+            "finished_draft": {"title": "Draft past", "start_date": "2024-01-01T00:00:00",
+                               "end_date": "2024-02-01T00:00:00"},
+            "future": {"title": "Future", "start_date": "2026-01-01T00:00:00"},
+            "undated": {"title": "Undated"},
+        }
+        ids = {name: self._create_course(client, headers, data).json()["id"] for name, data in courses.items()}
+        since = client.get("/api/v1/courses/changes").json()["next_cursor"]
+
+        moved = CourseScheduleService.apply_transitions(session, batch_size=1, now=datetime(2025, 6, 1))
+        assert moved == {"active": 2, "archived": 2}
+
+        statuses = {name: client.get(f"/api/v1/courses/{course_id}").json()["status"]
+                    for name, course_id in ids.items()}
+        assert statuses == {"started": "active", "ended": "archived", "finished_draft": "archived",
+                            "future": "draft", "undated": "draft"}
+        changed = {change["entity_id"] for change in
+                   client.get("/api/v1/courses/changes", params={"since": since}).json()["changes"]}
+        assert changed == {ids["started"], ids["ended"], ids["finished_draft"]}
+
+        assert CourseScheduleService.apply_transitions(session, batch_size=1, now=datetime(2025, 6, 1)) == {
+            "active": 0, "archived": 0
+        }
+
+    # Archived courses and archival storage
+    def test_list_courses_skips_archived_by_default(self, client: TestClient, session: Session):
+        """Test listings leave archived courses out unless include_archived is set"""
+        headers = self._create_auth_user(client, "admin", "archived_list@example.com")
+        live = self._create_course(client, headers, {"title": "Live"}).json()["id"]
+        archived = self._create_course(client, headers, {"title": "Old", "status": "archived"}).json()["id"]
+
+        assert [course["id"] for course in client.get("/api/v1/courses/").json()] == [live]
+        everything = client.get("/api/v1/courses/", params={"include_archived": True}).json()
+        assert {course["id"] for course in everything} == {live, archived}
+        sparse = client.get("/api/v1/courses/", params={"fields": "id"}).json()
+        assert sparse == [{"id": live}]
+
+    def test_archival_moves_courses_to_cold_storage(self, client: TestClient, session: Session):
+        """Test the archival batch moves archived courses with their teachers, still readable by id"""
+        from sqlmodel import select
+        from app.models.course import Course
+        from app.models.course_archive import ArchivedCourse, ArchivedCourseTeacher
+        from app.models.course_teacher import CourseTeacher
+        from app.models.user import User
+        from app.core.metrics import active_courses
+        from app.services.course_archive_service import CourseArchiveService
+
+        headers = self._create_auth_user(client, "admin", "archival@example.com")
+        self._create_auth_user(client, "teacher", "archived_teacher@example.com")
+        teacher_id = session.exec(select(User.id).where(User.email == "archived_teacher@example.com")).one()
+        live = self._create_course(client, headers, {"title": "Live"}).json()["id"]
+        old = [self._create_course(client, headers, {"title": f"Old {n}", "status": "archived"}).json()["id"]
+               for n in range(3)]
+        client.post(f"/api/v1/courses/{old[0]}/teachers/", json={"teacher_id": teacher_id, "role": "PRIMARY"},
+                    headers=headers)
+
+        since = client.get("/api/v1/courses/changes").json()["next_cursor"]
+        gauge = active_courses._value.get()
+
+        progress = []
+        moved = CourseArchiveService.archive_courses(session, batch_size=2,
+                                                     on_batch=lambda done, total: progress.append((done, total)))
+        assert moved == 3
+        assert active_courses._value.get() == gauge - 3
+        changes = client.get("/api/v1/courses/changes", params={"since": since}).json()["changes"]
+        assert {(change["entity"], change["operation"]) for change in changes} == {
+            ("course", "delete"), ("course_teacher", "delete")
+        }
+        assert progress == [(2, 3), (3, 3)]
+        assert session.exec(select(Course.id)).all() == [live]
+        assert session.exec(select(CourseTeacher)).all() == []
+        assert len(session.exec(select(ArchivedCourse)).all()) == 3
+        assert len(session.exec(select(ArchivedCourseTeacher)).all()) == 1
+
+        response = client.get(f"/api/v1/courses/{old[0]}", params={"include": "teachers"})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Old 0"
+        assert response.json()["status"] == "archived"
+        assert [teacher["teacher_email"] for teacher in response.json()["teachers"]] == [
+            "archived_teacher@example.com"
+        ]
+        sparse = client.get(f"/api/v1/courses/{old[1]}", params={"fields": "title"}).json()
+        assert sparse == {"title": "Old 1"}
+
+        listed = client.get("/api/v1/courses/", params={"include_archived": True}).json()
+        assert [course["id"] for course in listed] == [live, *old]
+        # Archived ids are never handed out again
+        assert self._create_course(client, headers).json()["id"] > max(old)
+
+    def test_list_courses_from_catalog_snapshot(self, client: TestClient, session: Session, monkeypatch, tmp_path):
+        """Test the unfiltered list is served from the pre-rendered catalog, with ETags"""
+        from app.services.catalog_service import CatalogService, catalog_snapshot
+
+        headers = self._create_auth_user(client, "admin", "catalog_admin@example.com")
+        self._create_course(client, headers, {"title": "Catalogued", "status": "active"})
+        self._create_course(client, headers, {"title": "Old", "status": "archived"})
+        from_db = client.get("/api/v1/courses/").json()
+        with_teachers = client.get("/api/v1/courses/", params={"include": "teachers"}).json()
+
+        monkeypatch.setattr(catalog_snapshot, "directory", str(tmp_path))
+        monkeypatch.setattr(catalog_snapshot, "render", lambda: CatalogService.render(session))
+        monkeypatch.setattr(catalog_snapshot, "_current", None)
+        catalog_snapshot.build()
+        # Not in the snapshot until the next build
+        self._create_course(client, headers, {"title": "Later"})
+        # Read as a client that did not just write
+        client.cookies.clear()
+
+        response = client.get("/api/v1/courses/")
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == from_db
+        assert client.get("/api/v1/courses/", params={"include": "teachers"}).json() == with_teachers
+
+        etag = response.headers["etag"]
+        not_modified = client.get("/api/v1/courses/", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        plain = client.get("/api/v1/courses/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.json() == from_db
+
+        # Filtered lists and batch operations still read the database
+        assert len(client.get("/api/v1/courses/", params={"include_archived": True}).json()) == 3
+        batch = client.post("/api/v1/batch", json={"operations": [{"method": "GET", "path": "/courses/"}]},
+                            headers=headers)
+        assert [course["title"] for course in batch.json()["results"][0]["body"]] == ["Catalogued", "Later"]
+
+    def test_list_courses_reads_own_writes_past_the_snapshot(
+            self, client: TestClient, session: Session, monkeypatch, tmp_path
+    ):
+        """Test a client that just wrote lists from the database, not the stale snapshot"""
+        from app.core.replicas import replicas
+        from app.services.catalog_service import CatalogService, catalog_snapshot
+
+        assert not replicas
+        monkeypatch.setattr(catalog_snapshot, "directory", str(tmp_path))
+        monkeypatch.setattr(catalog_snapshot, "render", lambda: CatalogService.render(session))
+        monkeypatch.setattr(catalog_snapshot, "_current", None)
+        headers = self._create_auth_user(client, "admin", "own_writes_admin@example.com")
+        kept = self._create_course(client, headers, {"title": "Kept"}).json()["id"]
+        removed = self._create_course(client, headers, {"title": "Removed"}).json()["id"]
+        catalog_snapshot.build()
+
+        client.delete(f"/api/v1/courses/{removed}", headers=headers)
+        created = self._create_course(client, headers, {"title": "Fresh"}).json()["id"]
+
+        response = client.get("/api/v1/courses/")
+        assert "content-encoding" not in response.headers
+        assert [course["id"] for course in response.json()] == [kept, created]
+
+    def test_archival_skips_ids_taken_in_archival_storage(self, client: TestClient, session: Session, caplog):
+        """Test a course whose id was reused is left in place instead of failing the batch"""
+        from sqlmodel import select
+        from app.models.course import Course
+        from app.models.course_archive import ArchivedCourse
+        from app.services.course_archive_service import CourseArchiveService
+
+        headers = self._create_auth_user(client, "admin", "reused_ids@example.com")
+        reused, other = [self._create_course(client, headers, {"title": f"Old {n}", "status": "archived"}).json()["id"]
+                         for n in range(2)]
+        # What an older SQLite course table without AUTOINCREMENT leaves behind
+        session.add(ArchivedCourse(id=reused, title="Moved long ago"))
+        session.commit()
+
+        assert CourseArchiveService.archive_courses(session, batch_size=10) == 1
+        assert session.exec(select(Course.id)).all() == [reused]
+        assert session.get(ArchivedCourse, other) is not None
+        assert session.get(ArchivedCourse, reused).title == "Moved long ago"
+        assert f"Not archiving courses [{reused}]" in caplog.text
@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+
+class TestJobRoutes:
+    """Test suite for background job routes"""
+
+    def _create_auth_user(self, client: TestClient, role: str = "admin", email: str = None):
+        """Helper method to create a user and return auth headers"""
+        if email is None:
+            email = f"{role}_jobs@example.com"
+
+        response = client.post(
+            "/api/v1/auth/token/register",
+            json={
+                "email": email,
+                "password": "testpass123",
+                "full_name": f"{role.capitalize()} User",
+                "role": role
+            }
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_submit_job_accepted(self, client: TestClient, session: Session):
+        """Test submitting a job returns 202 with a link to poll"""
+        headers = self._create_auth_user(client)
+
+        response = client.post("/api/v1/jobs/", json={"kind": "repair_course_staffing"}, headers=headers)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert response.headers["Location"] == f"/api/v1/jobs/{job['id']}"
+
+        response = client.get(response.headers["Location"], headers=headers)
+        assert response.status_code == 200
+        assert response.json()["kind"] == "repair_course_staffing"
+
+    def test_submit_job_validation(self, client: TestClient, session: Session):
+        """Test unknown kinds and non-admins are rejected"""
+        admin = self._create_auth_user(client)
+        teacher = self._create_auth_user(client, "teacher")
+
+        assert client.post("/api/v1/jobs/", json={"kind": "nope"}, headers=admin).status_code == 400
+        assert client.post(
+            "/api/v1/jobs/", json={"kind": "repair_course_staffing"}, headers=teacher
+        ).status_code == 403
+        assert client.get("/api/v1/jobs/999", headers=admin).status_code == 404
+
+    def test_cancel_queued_job(self, client: TestClient, session: Session):
+        """Test a queued job is cancelled right away and cannot be cancelled twice"""
+        headers = self._create_auth_user(client)
+        job_id = client.post("/api/v1/jobs/", json={"kind": "compact_change_log"}, headers=headers).json()["id"]
+
+        response = client.post(f"/api/v1/jobs/{job_id}/cancel", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+        assert client.post(f"/api/v1/jobs/{job_id}/cancel", headers=headers).status_code == 409
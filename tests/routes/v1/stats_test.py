@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.stats import StatCounter
+from app.models.user import User
+from app.services.stats_service import StatsService
+
+
+class TestStatsRoutes:
+    """Test suite for aggregated stats routes"""
+
+    def _create_auth_user(self, client: TestClient, role: str = "admin", email: str = None):
+        """Helper method to create a user and return auth headers"""
+        if email is None:
+            email = f"{role}_user@example.com"
+
+        response = client.post(
+            "/api/v1/auth/token/register",
+            json={
+                "email": email,
+                "password": "testpass123",
+                "full_name": f"{role.capitalize()} User",
+                "role": role
+            }
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_stats_follow_changes(self, client: TestClient, session: Session):
+        """Test counters move with course creates, assignments, clones and deletes"""
+        admin = self._create_auth_user(client, "admin", "stats_admin@example.com")
+        self._create_auth_user(client, "teacher", "stats_teacher@example.com")
+        teacher_id = session.exec(select(User.id).where(User.email == "stats_teacher@example.com")).one()
+
+        active = client.post("/api/v1/courses/", json={"title": "Live", "status": "active"}, headers=admin).json()
+        draft = client.post("/api/v1/courses/", json={"title": "Planned"}, headers=admin).json()
+        client.post(f"/api/v1/courses/{active['id']}/teachers/",
+                    json={"teacher_id": teacher_id, "role": "PRIMARY"}, headers=admin)
+        client.post(f"/api/v1/courses/{active['id']}/clone", json={"title": "Copy"}, headers=admin)
+        client.delete(f"/api/v1/courses/{draft['id']}", headers=admin)
+
+        stats = client.get("/api/v1/stats/", headers=admin).json()
+        assert stats["users_by_role"]["admin"] == 1
+        assert stats["users_by_role"]["teacher"] == 1
+        assert stats["total_courses"] == 2
+        assert stats["courses_by_status"]["draft"] == 1
+        assert stats["courses_by_status"]["active"] == 1
+        assert stats["teachers_by_role"]["PRIMARY"] == 2
+        assert stats["total_assignments"] == 2
+        assert stats["average_teachers_per_course"] == 1.0
+        # Nothing drifted, the reconciler has nothing to correct
+        assert StatsService.reconcile(session) == 0
+
+    def test_reconcile_corrects_drift(self, client: TestClient, session: Session):
+        """Test reconciliation rewrites counters that no longer match the tables"""
+        admin = self._create_auth_user(client, "admin", "drift_admin@example.com")
+        client.post("/api/v1/courses/", json={"title": "Counted"}, headers=admin)
+        session.add(StatCounter(name="course.status.ACTIVE", value=5))
+        counter = session.get(StatCounter, "course.status.DRAFT")
+        counter.value = 0
+        session.add(counter)
+        session.commit()
+
+        assert StatsService.reconcile(session) == 2
+
+        stats = client.get("/api/v1/stats/", headers=admin).json()
+        assert stats["courses_by_status"]["draft"] == 1
+        assert stats["courses_by_status"]["active"] == 0
+
+    def test_stats_require_admin(self, client: TestClient):
+        """Test only admins can read the stats"""
+        teacher = self._create_auth_user(client, "teacher", "nosy_teacher@example.com")
+        assert client.get("/api/v1/stats/", headers=teacher).status_code == 403
+
+    def test_reconcile_seeds_existing_rows(self, client: TestClient, session: Session):
+        """Test the startup reconcile counts rows written before the counters existed"""
+        from app.models.course import Course
+
+        admin = self._create_auth_user(client, "admin", "seed_admin@example.com")
+        existing = Course(title="Before the counters")
+        session.add(existing)
+        session.commit()
+        StatsService.reconcile(session)
+
+        client.delete(f"/api/v1/courses/{existing.id}", headers=admin)
+        stats = client.get("/api/v1/stats/", headers=admin).json()
+        assert stats["total_courses"] == 0
+        assert min(stats["courses_by_status"].values()) == 0
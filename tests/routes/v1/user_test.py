@@ -0,0 +1,93 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.user import User
+
+
+class TestUserRoutes:
+    """Test suite for user routes"""
+
+    def _create_auth_user(self, client: TestClient, role: str = "teacher", email: str = None):
+        """Helper method to create a user and return auth headers"""
+        if email is None:
+            email = f"{role}_user@example.com"
+
+        response = client.post(
+            "/api/v1/auth/token/register",
+            json={
+                "email": email,
+                "password": "testpass123",
+                "full_name": f"{role.capitalize()} User",
+                "role": role
+            }
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def _user_id(self, session: Session, email: str) -> int:
+        return session.exec(select(User.id).where(User.email == email)).one()
+
+    def _teaching(self, client: TestClient, admin: dict, teacher_id: int, courses: list) -> list:
+        """Create courses and assign the teacher, courses are (data, role) pairs"""
+        ids = []
+        for data, role in courses:
+            course_id = client.post("/api/v1/courses/", json=data, headers=admin).json()["id"]
+            client.post(f"/api/v1/courses/{course_id}/teachers/",
+                        json={"teacher_id": teacher_id, "role": role}, headers=admin)
+            ids.append(course_id)
+        return ids
+
+    def test_user_courses_keyset_pages(self, client: TestClient, session: Session):
+        """Test a teacher's courses come back in course id order, a page at a time"""
+        admin = self._create_auth_user(client, "admin", "users_admin@example.com")
+        self._create_auth_user(client, "teacher", "paged_teacher@example.com")
+        teacher_id = self._user_id(session, "paged_teacher@example.com")
+        ids = self._teaching(client, admin, teacher_id, [({"title": f"Course {n}"}, "ASSISTANT") for n in range(3)])
+        client.post("/api/v1/courses/", json={"title": "Not taught"}, headers=admin)
+
+        first = client.get(f"/api/v1/users/{teacher_id}/courses", params={"limit": 2}).json()
+        assert [course["id"] for course in first["courses"]] == ids[:2]
+        assert first["has_more"] is True
+        assert first["courses"][0]["role"] == "ASSISTANT"
+
+        second = client.get(f"/api/v1/users/{teacher_id}/courses",
+                            params={"limit": 2, "after": first["next_cursor"]}).json()
+        assert [course["id"] for course in second["courses"]] == ids[2:]
+        assert second["has_more"] is False
+        assert second["next_cursor"] is None
+
+    def test_user_courses_filters(self, client: TestClient, session: Session):
+        """Test filtering a teacher's courses by assignment role and course status"""
+        admin = self._create_auth_user(client, "admin", "filters_admin@example.com")
+        self._create_auth_user(client, "teacher", "filtered_teacher@example.com")
+        teacher_id = self._user_id(session, "filtered_teacher@example.com")
+        primary, assistant = self._teaching(client, admin, teacher_id, [
+            ({"title": "Led", "status": "active"}, "PRIMARY"),
+            ({"title": "Helped", "status": "draft"}, "ASSISTANT"),
+        ])
+
+        by_role = client.get(f"/api/v1/users/{teacher_id}/courses", params={"role": "PRIMARY"}).json()
+        assert [course["id"] for course in by_role["courses"]] == [primary]
+        by_status = client.get(f"/api/v1/users/{teacher_id}/courses", params={"status": "draft"}).json()
+        assert [course["id"] for course in by_status["courses"]] == [assistant]
+
+    def test_my_courses(self, client: TestClient, session: Session):
+        """Test /users/me/courses lists the current user's courses"""
+        admin = self._create_auth_user(client, "admin", "me_admin@example.com")
+        teacher = self._create_auth_user(client, "teacher", "me_teacher@example.com")
+        ids = self._teaching(client, admin, self._user_id(session, "me_teacher@example.com"), [({"title": "Mine"}, "PRIMARY")])
+
+        response = client.get("/api/v1/users/me/courses", headers=teacher)
+        assert response.status_code == 200
+        assert [course["id"] for course in response.json()["courses"]] == ids
+        assert client.get("/api/v1/users/me/courses", headers=admin).json()["courses"] == []
+
+    def test_my_courses_without_auth(self, client: TestClient):
+        """Test /users/me/courses requires authentication"""
+        response = client.get("/api/v1/users/me/courses")
+        assert response.status_code in [401, 403]
+
+    def test_user_courses_unknown_user(self, client: TestClient):
+        """Test an unknown user gives 404"""
+        response = client.get("/api/v1/users/9999/courses")
+        assert response.status_code == 404